@@ -0,0 +1,230 @@
+import threading
+from array import array
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import compress
+
+from backends import errors
+
+
+CATEGORIES = ('Attendance', 'Academic Dishonesty', 'Behavior', 'Bullying', 'Violence', 'Substance', 'Other')
+CATEGORY_CODES = {name: code for code, name in enumerate(CATEGORIES)}
+
+
+class ConductAnalytics:
+    # Read-only columnar copy of conduct_incidents for dashboards. Incidents are held in parallel
+    # typed arrays (incident_id, student_id, severity, category code, date ordinal), and the
+    # per-student and per-severity aggregates are kept up to date as rows are appended, so
+    # distributions, per-student stats, category breakdowns and threshold filters are answered
+    # in memory. refresh() only fetches incidents above the incident_id watermark; if rows below
+    # it have disappeared (delete_student, archiving) it reloads everything.
+    def __init__(self, db, chunk_size=10000):
+        self.db = db
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.incident_ids = array('q')
+        self.student_ids = array('q')
+        self.severities = array('b')
+        self.categories = array('b')
+        self.dates = array('l')
+        self.watermark = 0
+        # Dense per-student slots: aggregates for _slot_students[i] live at index i.
+        self._slots = {}
+        self._slot_students = array('q')
+        self._counts = array('l')
+        self._sums = array('l')
+        self._max = array('b')
+        self._min = array('b')
+        self._category_counts = array('l')
+        self._severity_counts = array('q', [0] * 11)
+        self._students = {}
+        self._student_watermark = 0
+
+    def refresh(self):
+        try:
+            with self._lock, self.db._session('analytics.refresh') as (conn, cursor):
+                cursor.execute("SELECT COUNT(*) as n FROM conduct_incidents WHERE incident_id <= %s",
+                               (self.watermark,))
+                if cursor.fetchone()['n'] != len(self.incident_ids):
+                    self._reset()
+                cursor.execute("SELECT COUNT(*) as n FROM students WHERE student_id <= %s",
+                               (self._student_watermark,))
+                if cursor.fetchone()['n'] != len(self._students):
+                    self._students = {}
+                    self._student_watermark = 0
+
+                cursor.execute(
+                    """SELECT student_id, roll_number, name, grade, class_section FROM students
+                       WHERE student_id > %s ORDER BY student_id""",
+                    (self._student_watermark,)
+                )
+                for rows in self._chunks(cursor):
+                    for row in rows:
+                        self._students[row['student_id']] = row
+                    self._student_watermark = rows[-1]['student_id']
+
+                cursor.execute(
+                    """SELECT incident_id, student_id, severity_score, category, incident_date
+                       FROM conduct_incidents
+                       WHERE incident_id > %s
+                       ORDER BY incident_id""",
+                    (self.watermark,)
+                )
+                added = 0
+                for rows in self._chunks(cursor):
+                    self._append(rows)
+                    added += len(rows)
+                return added
+        except errors.Error as e:
+            print(f"✗ Error refreshing analytics: {e}\n")
+            return None
+
+    def _chunks(self, cursor):
+        while True:
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                break
+            yield rows
+
+    def _append(self, rows):
+        other = CATEGORY_CODES['Other']
+        width = len(CATEGORIES)
+        for row in rows:
+            student_id = row['student_id']
+            severity = row['severity_score']
+            code = CATEGORY_CODES.get(row['category'], other)
+            self.incident_ids.append(row['incident_id'])
+            self.student_ids.append(student_id)
+            self.severities.append(severity)
+            self.categories.append(code)
+            self.dates.append(row['incident_date'].toordinal())
+
+            slot = self._slots.get(student_id)
+            if slot is None:
+                slot = self._slots[student_id] = len(self._slot_students)
+                self._slot_students.append(student_id)
+                self._counts.append(0)
+                self._sums.append(0)
+                self._max.append(severity)
+                self._min.append(severity)
+                self._category_counts.extend([0] * width)
+            self._counts[slot] += 1
+            self._sums[slot] += severity
+            if severity > self._max[slot]:
+                self._max[slot] = severity
+            if severity < self._min[slot]:
+                self._min[slot] = severity
+            self._category_counts[slot * width + code] += 1
+            self._severity_counts[severity] += 1
+        self.watermark = rows[-1]['incident_id']
+
+    def _range_mask(self, start, end):
+        # Half-open [start, end) like get_incidents_between; None leaves that side open. Date
+        # ordinals do not fit in a byte, so unlike the other masks this compares row by row in
+        # Python (a map over range.__contains__ measured slower still).
+        low = self._ordinal(start) if start is not None else None
+        high = self._ordinal(end) if end is not None else None
+        if low is None and high is None:
+            return None
+        low = low if low is not None else date.min.toordinal()
+        high = high if high is not None else date.max.toordinal() + 1
+        return bytes(low <= day < high for day in self.dates)
+
+    @staticmethod
+    def _byte_mask(column, predicate):
+        # One byte per row, 1 where predicate(value) holds; translate() applies it in C.
+        return column.tobytes().translate(bytes(1 if predicate(value) else 0 for value in range(256)))
+
+    @staticmethod
+    def _and(mask, other):
+        # ANDs two byte masks as big integers instead of row by row.
+        if mask is None:
+            return other
+        return (int.from_bytes(mask, 'little') & int.from_bytes(other, 'little')).to_bytes(len(mask), 'little')
+
+    @staticmethod
+    def _ordinal(value):
+        if isinstance(value, str):
+            value = date.fromisoformat(value)
+        elif isinstance(value, datetime):
+            value = value.date()
+        return value.toordinal()
+
+    def severity_distribution(self, start=None, end=None):
+        # Same keys as get_severity_distribution; counts are 0 rather than NULL when empty.
+        with self._lock:
+            mask = self._range_mask(start, end)
+            if mask is None:
+                counts = self._severity_counts
+            else:
+                # Counting bytes runs in C: one pass per severity level over the filtered column.
+                column = bytes(compress(self.severities, mask))
+                counts = [0] + [column.count(level) for level in range(1, 11)]
+            return {'minor': sum(counts[1:4]), 'moderate': sum(counts[4:7]),
+                    'serious': sum(counts[7:10]), 'critical': counts[10]}
+
+    def category_breakdown(self, student_id=None):
+        width = len(CATEGORIES)
+        with self._lock:
+            if student_id is None:
+                column = self.categories.tobytes()
+                counts = [column.count(code) for code in range(width)]
+            else:
+                slot = self._slots.get(student_id)
+                counts = self._category_counts[slot * width:(slot + 1) * width] if slot is not None else []
+            return [{'category': CATEGORIES[code], 'count': count} for code, count in enumerate(counts) if count]
+
+    def student_stats(self, student_id):
+        # Same shape as get_student_stats.
+        with self._lock:
+            slot = self._slots.get(student_id)
+            if slot is None:
+                return {'total_incidents': 0, 'avg_score': 0, 'worst_incident': 0, 'least_severe': 0,
+                        'category_breakdown': []}
+            count = self._counts[slot]
+            stats = {
+                'total_incidents': count,
+                'avg_score': round(Decimal(self._sums[slot]) / count, 2),
+                'worst_incident': self._max[slot],
+                'least_severe': self._min[slot],
+            }
+        stats['category_breakdown'] = self.category_breakdown(student_id)
+        return stats
+
+    def high_risk_students(self, threshold=7):
+        # Same rows and order as get_high_risk_students.
+        with self._lock:
+            slots = sorted(
+                (student_id, count, total)
+                for student_id, count, total in zip(self._slot_students, self._counts, self._sums)
+                if count and total >= threshold * count
+            )
+            students = []
+            for student_id, count, total in slots:
+                info = self._students.get(student_id, {})
+                students.append({
+                    'student_id': student_id,
+                    'roll_number': info.get('roll_number'),
+                    'name': info.get('name'),
+                    'grade': info.get('grade'),
+                    'class_section': info.get('class_section'),
+                    'incident_count': count,
+                    'avg_score': round(Decimal(total) / count, 2),
+                })
+            return students
+
+    def filter_incidents(self, min_severity=None, category=None, start=None, end=None):
+        # incident_ids matching every given condition, in incident_id order.
+        with self._lock:
+            mask = self._range_mask(start, end)
+            if min_severity is not None:
+                mask = self._and(mask, self._byte_mask(self.severities, lambda value: value >= min_severity))
+            if category is not None:
+                code = CATEGORY_CODES[category]
+                mask = self._and(mask, self._byte_mask(self.categories, lambda value: value == code))
+            if mask is None:
+                return list(self.incident_ids)
+            return list(compress(self.incident_ids, mask))
@@ -0,0 +1,441 @@
+import aiomysql
+from aiomysql import Error, IntegrityError
+import asyncio
+from datetime import datetime
+
+from backends import MySQLBackend
+from main import StudentConductDB
+from records import check_shape, compact_fetched
+
+
+class AsyncStudentConductDB:
+    # asyncio counterpart of StudentConductDB on an aiomysql pool. Every call acquires its own
+    # connection, so independent queries can run concurrently with asyncio.gather.
+    # The pool runs in autocommit mode (aiomysql discards connections released inside a
+    # transaction); multi-statement writes open their own transaction with begin().
+    def __init__(self, pool):
+        self.pool = pool
+
+    @classmethod
+    async def connect(cls, host='localhost', user='root', password='', database='student_conduct_db',
+                      pool_size=10):
+        try:
+            pool = await aiomysql.create_pool(
+                host=host,
+                user=user,
+                password=password,
+                db=database,
+                maxsize=pool_size,
+                autocommit=True
+            )
+            print(f"✓ Connected to MySQL database (async pool of {pool_size})\n")
+            return cls(pool)
+        except Error as e:
+            print(f"✗ Connection error: {e}")
+            return None
+
+    async def _fetchall(self, sql, params=()):
+        async with self.pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(sql, params)
+                return await cursor.fetchall()
+
+    async def _fetchone(self, sql, params=()):
+        async with self.pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(sql, params)
+                return await cursor.fetchone()
+
+    async def _fetch_rows(self, sql, params, shape):
+        # Report rows in the caller's shape, as StudentConductDB._rows.
+        if shape == 'dict':
+            return await self._fetchall(sql, params)
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(sql, params)
+                rows = await cursor.fetchall()
+                names = [column[0] for column in cursor.description]
+        return compact_fetched(names, list(rows), shape)
+
+    @staticmethod
+    async def _log_changes(cursor, table, operation, row_ids):
+        # Same as StudentConductDB._log_changes: the lock orders change_ids by commit.
+        rows = [(table, row_id, operation) for row_id in row_ids]
+        if rows:
+            await cursor.execute(StudentConductDB.CHANGE_LOCK_SQL)
+            await cursor.executemany(StudentConductDB.CHANGE_SQL, rows)
+
+    async def _write(self, sql, params=(), change=None):
+        # change=(table, operation, row_id) logs the write for the change feed in the same
+        # transaction; row_id None means the row just inserted.
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                if change is None:
+                    await cursor.execute(sql, params)
+                    return cursor.lastrowid
+                table, operation, row_id = change
+                await conn.begin()
+                await cursor.execute(sql, params)
+                lastrowid = cursor.lastrowid
+                if cursor.rowcount:
+                    await self._log_changes(cursor, table, operation,
+                                            [row_id if row_id is not None else lastrowid])
+                await conn.commit()
+                return lastrowid
+
+    async def add_student(self, roll_number, name, email, phone, grade, class_section, parent_name, parent_phone):
+        try:
+            if not name or len(name.strip()) == 0:
+                print("✗ Student name cannot be empty")
+                return None
+
+            student_id = await self._write(
+                """INSERT INTO students
+                   (roll_number, name, email, phone, grade, class_section, parent_name, parent_phone, enrollment_date)
+                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+                (roll_number, name, email, phone, grade, class_section, parent_name, parent_phone, datetime.now().date()),
+                change=('students', 'insert', None)
+            )
+            print(f"✓ Student '{name}' (Roll: {roll_number}) added successfully (ID: {student_id})\n")
+            return student_id
+        except IntegrityError:
+            print(f"✗ Roll number '{roll_number}' already exists\n")
+            return None
+        except Error as e:
+            print(f"✗ Error adding student: {e}\n")
+            return None
+
+    async def record_incident(self, student_id, incident_type, category, description, severity_score,
+                              location, witnesses, reported_by, action_taken=None):
+        if not (1 <= severity_score <= 10):
+            print("✗ Severity score must be between 1 and 10\n")
+            return False
+
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute("SELECT student_id FROM students WHERE student_id = %s", (student_id,))
+                    if not await cursor.fetchone():
+                        print(f"✗ Student ID {student_id} does not exist\n")
+                        return False
+
+                    incident_date = datetime.now().date()
+                    await conn.begin()
+                    await cursor.execute(
+                        """INSERT INTO conduct_incidents
+                           (student_id, incident_type, category, description, severity_score,
+                            incident_date, incident_time, location, witnesses, reported_by, action_taken)
+                           VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+                        (student_id, incident_type, category, description, severity_score,
+                         incident_date, datetime.now().time(), location, witnesses, reported_by, action_taken)
+                    )
+                    incident_id = cursor.lastrowid
+                    await cursor.executemany(
+                        MySQLBackend.SUMMARY_UPSERT,
+                        StudentConductDB._summary_rows([(student_id, severity_score, incident_date)])
+                    )
+                    await self._log_changes(cursor, 'conduct_incidents', 'insert', [incident_id])
+                    await conn.commit()
+            print(f"✓ Incident recorded for student ID {student_id} with severity {severity_score}/10\n")
+            return incident_id
+        except Error as e:
+            print(f"✗ Error recording incident: {e}\n")
+            return False
+
+    async def add_action_to_incident(self, incident_id, action_type, duration, duration_unit, notes, assigned_by):
+        try:
+            await self._write(
+                """INSERT INTO conduct_actions
+                   (incident_id, action_type, action_duration, duration_unit, notes, action_date, assigned_by)
+                   VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                (incident_id, action_type, duration, duration_unit, notes, datetime.now().date(), assigned_by),
+                change=('conduct_actions', 'insert', None)
+            )
+            print(f"✓ Action '{action_type}' added to incident {incident_id}\n")
+            return True
+        except Error as e:
+            print(f"✗ Error adding action: {e}\n")
+            return False
+
+    async def get_student_record(self, student_id):
+        try:
+            student, incidents = await asyncio.gather(
+                self._fetchone("SELECT * FROM students WHERE student_id = %s", (student_id,)),
+                self._fetchall(
+                    """SELECT * FROM conduct_incidents
+                       WHERE student_id = %s
+                       ORDER BY incident_date DESC""",
+                    (student_id,)
+                )
+            )
+            if not student:
+                print(f"✗ Student ID {student_id} not found\n")
+                return None
+
+            return {'student': student, 'incidents': incidents}
+        except Error as e:
+            print(f"✗ Error retrieving record: {e}\n")
+            return None
+
+    async def get_student_dossier(self, student_id):
+        # Same result as StudentConductDB.get_student_dossier; the two queries run concurrently.
+        try:
+            student, rows = await asyncio.gather(
+                self._fetchone("SELECT * FROM students WHERE student_id = %s", (student_id,)),
+                self._fetchall(StudentConductDB.DOSSIER_INCIDENTS_SQL, (student_id,))
+            )
+            if not student:
+                print(f"✗ Student ID {student_id} not found\n")
+                return None
+
+            incidents = StudentConductDB._group_actions(rows)
+            return {'student': student, 'incidents': incidents,
+                    'stats': StudentConductDB._incident_stats(incidents)}
+        except Error as e:
+            print(f"✗ Error retrieving dossier: {e}\n")
+            return None
+
+    async def get_student_stats(self, student_id):
+        try:
+            result, category_breakdown = await asyncio.gather(
+                self._fetchone(
+                    """SELECT incident_count as total_incidents,
+                              severity_sum / incident_count as avg_score,
+                              max_severity as worst_incident,
+                              min_severity as least_severe
+                       FROM student_conduct_summary
+                       WHERE student_id = %s""",
+                    (student_id,)
+                ),
+                self._fetchall(
+                    """SELECT category, COUNT(*) as count
+                       FROM conduct_incidents
+                       WHERE student_id = %s
+                       GROUP BY category""",
+                    (student_id,)
+                )
+            )
+            if not result or result['total_incidents'] == 0:
+                return {'total_incidents': 0, 'avg_score': 0, 'worst_incident': 0, 'least_severe': 0,
+                        'category_breakdown': []}
+
+            return {
+                'total_incidents': result['total_incidents'],
+                'avg_score': round(result['avg_score'], 2),
+                'worst_incident': result['worst_incident'],
+                'least_severe': result['least_severe'],
+                'category_breakdown': list(category_breakdown)
+            }
+        except Error as e:
+            print(f"✗ Error retrieving stats: {e}\n")
+            return None
+
+    async def list_all_students(self, status='Active', after_id=None, limit=None, shape='dict'):
+        check_shape(shape)
+        try:
+            return await self._fetch_rows(*StudentConductDB._students_query(status, after_id, limit), shape)
+        except Error as e:
+            print(f"✗ Error listing students: {e}\n")
+            return []
+
+    async def get_high_risk_students(self, threshold=7, shape='dict'):
+        check_shape(shape)
+        try:
+            return await self._fetch_rows(StudentConductDB.HIGH_RISK_SQL, (threshold,), shape)
+        except Error as e:
+            print(f"✗ Error retrieving high-risk students: {e}\n")
+            return []
+
+    async def get_incidents_by_category(self, category, after=None, limit=None, shape='dict'):
+        check_shape(shape)
+        try:
+            return await self._fetch_rows(*StudentConductDB._category_query(category, after, limit), shape)
+        except Error as e:
+            print(f"✗ Error retrieving incidents: {e}\n")
+            return []
+
+    async def get_pending_incidents(self, after=None, limit=None, shape='dict'):
+        check_shape(shape)
+        try:
+            return await self._fetch_rows(*StudentConductDB._pending_query(after, limit, MySQLBackend.UNION_ARM_LIMITS),
+                                          shape)
+        except Error as e:
+            print(f"✗ Error retrieving pending incidents: {e}\n")
+            return []
+
+    async def update_incident_status(self, incident_id, status, follow_up_date=None):
+        try:
+            await self._write(
+                "UPDATE conduct_incidents SET status = %s, follow_up_date = %s WHERE incident_id = %s",
+                (status, follow_up_date, incident_id),
+                change=('conduct_incidents', 'update', incident_id)
+            )
+            print(f"✓ Incident {incident_id} status updated to '{status}'\n")
+            return True
+        except Error as e:
+            print(f"✗ Error updating incident: {e}\n")
+            return False
+
+    async def mark_parent_notified(self, incident_id):
+        try:
+            await self._write(
+                "UPDATE conduct_incidents SET parent_notified = TRUE WHERE incident_id = %s",
+                (incident_id,),
+                change=('conduct_incidents', 'update', incident_id)
+            )
+            print(f"✓ Parents marked as notified for incident {incident_id}\n")
+            return True
+        except Error as e:
+            print(f"✗ Error updating notification status: {e}\n")
+            return False
+
+    async def update_student_status(self, student_id, status):
+        try:
+            await self._write(
+                "UPDATE students SET status = %s WHERE student_id = %s",
+                (status, student_id),
+                change=('students', 'update', student_id)
+            )
+            print(f"✓ Student status updated to '{status}'\n")
+            return True
+        except Error as e:
+            print(f"✗ Error updating student status: {e}\n")
+            return False
+
+    async def delete_student(self, student_id):
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.execute("SELECT name FROM students WHERE student_id = %s", (student_id,))
+                    result = await cursor.fetchone()
+
+                    if not result:
+                        print(f"✗ Student ID {student_id} not found\n")
+                        return False
+
+                    await conn.begin()
+                    await cursor.execute(
+                        """DELETE a FROM conduct_actions_archive a
+                           JOIN conduct_incidents_archive c ON a.incident_id = c.incident_id
+                           WHERE c.student_id = %s""",
+                        (student_id,)
+                    )
+                    await cursor.execute("DELETE FROM conduct_incidents_archive WHERE student_id = %s",
+                                         (student_id,))
+                    removed = {}
+                    for table, sql in StudentConductDB.STUDENT_DELETE_ROWS:
+                        await cursor.execute(sql, (student_id,))
+                        removed[table] = [r['row_id'] for r in await cursor.fetchall()]
+                    await cursor.execute("DELETE FROM students WHERE student_id = %s", (student_id,))
+                    for table, row_ids in removed.items():
+                        await self._log_changes(cursor, table, 'delete', row_ids)
+                    await self._log_changes(cursor, 'students', 'delete', [student_id])
+                    await conn.commit()
+            print(f"✓ Student '{result['name']}' and all records deleted\n")
+            return True
+        except Error as e:
+            print(f"✗ Error deleting student: {e}\n")
+            return False
+
+    async def _range_query(self, columns, start, end):
+        archive = await self._fetchone(StudentConductDB.ARCHIVED_UNTIL_SQL)
+        return StudentConductDB._range_sql(columns, start, end, archive['archived_until'])
+
+    async def get_monthly_report(self, month, year, shape='dict'):
+        check_shape(shape)
+        try:
+            start, end = StudentConductDB._month_range(month, year)
+            return await self._fetch_rows(
+                *await self._range_query(StudentConductDB.MONTHLY_REPORT_COLUMNS, start, end), shape)
+        except (Error, ValueError) as e:
+            print(f"✗ Error retrieving monthly report: {e}\n")
+            return []
+
+    async def get_incidents_between(self, start, end, shape='dict'):
+        check_shape(shape)
+        try:
+            return await self._fetch_rows(
+                *await self._range_query(StudentConductDB.RANGE_REPORT_COLUMNS, start, end), shape)
+        except Error as e:
+            print(f"✗ Error retrieving incidents: {e}\n")
+            return []
+
+    async def get_severity_distribution(self):
+        try:
+            return await self._fetchone(
+                """SELECT
+                     SUM(CASE WHEN severity_score <= 3 THEN 1 ELSE 0 END) as minor,
+                     SUM(CASE WHEN severity_score BETWEEN 4 AND 6 THEN 1 ELSE 0 END) as moderate,
+                     SUM(CASE WHEN severity_score BETWEEN 7 AND 9 THEN 1 ELSE 0 END) as serious,
+                     SUM(CASE WHEN severity_score = 10 THEN 1 ELSE 0 END) as critical
+                   FROM conduct_incidents"""
+            )
+        except Error as e:
+            print(f"✗ Error retrieving distribution: {e}\n")
+            return None
+
+    async def _run_in_thread(self, func, *args):
+        # File writing is blocking; keep it off the event loop.
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def export_student_card_csv(self, student_id):
+        try:
+            # The card lists each incident's actions, so it is built from the dossier.
+            dossier = await self.get_student_dossier(student_id)
+            if not dossier:
+                return False
+
+            student = dossier['student']
+            filename = f"{student_id}_{student['roll_number']}.csv"
+            with StudentConductDB._export_file(filename, False) as (filepath, f):
+                await self._run_in_thread(StudentConductDB._write_student_card, f, student,
+                                          dossier['incidents'], dossier['stats'])
+
+            print(f"✓ Student card exported successfully!")
+            print(f"  File saved as: {filepath}\n")
+            return True
+        except (Error, OSError) as e:
+            print(f"✗ Error exporting student card: {e}\n")
+            return False
+
+    async def export_all_students_csv(self, compress=False):
+        try:
+            students = await self._fetchall(
+                """SELECT s.student_id, s.roll_number, s.name, s.grade, s.class_section, s.status,
+                          COALESCE(sm.incident_count, 0) as incident_count,
+                          ROUND(sm.severity_sum / sm.incident_count, 2) as avg_severity
+                   FROM students s
+                   LEFT JOIN student_conduct_summary sm ON s.student_id = sm.student_id
+                   ORDER BY s.student_id ASC"""
+            )
+            filename = f"all_students_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            filepath = await self._run_in_thread(StudentConductDB._write_students_summary,
+                                                 filename, compress, students)
+
+            print(f"✓ All students exported successfully!")
+            print(f"  File saved as: {filepath}\n")
+            return True
+        except (Error, OSError) as e:
+            print(f"✗ Error exporting students: {e}\n")
+            return False
+
+    async def export_monthly_report_csv(self, month, year, compress=False):
+        try:
+            start, end = StudentConductDB._month_range(month, year)
+            incidents = await self._fetchall(
+                *await self._range_query(StudentConductDB.RANGE_REPORT_COLUMNS, start, end))
+            filename = f"monthly_report_{month:02d}_{year}.csv"
+            filepath = await self._run_in_thread(StudentConductDB._write_monthly_report,
+                                                 filename, compress, month, year, incidents)
+
+            print(f"✓ Monthly report exported successfully!")
+            print(f"  File saved as: {filepath}\n")
+            return True
+        except (Error, ValueError, OSError) as e:
+            print(f"✗ Error exporting monthly report: {e}\n")
+            return False
+
+    async def close(self):
+        self.pool.close()
+        await self.pool.wait_closed()
+        print("\n✓ Database connection pool closed")
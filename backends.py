@@ -0,0 +1,719 @@
+import queue
+import re
+import sqlite3
+import threading
+from datetime import datetime, date, time, timedelta
+from decimal import Decimal
+
+
+
+# A backend owns everything StudentConductDB cannot express in portable SQL: connecting and
+# pooling, the DDL of every table, index management, the migration lock and the summary upsert.
+# Both backends hand out connections and cursors that behave like mysql.connector's (dict rows,
+# %s placeholders, mysql.connector exception types), so the queries in main.py run unchanged.
+
+
+class _LazyErrors:
+    # mysql.connector.errors, imported on first attribute access. Importing the driver takes about
+    # 100 ms, which SQLite runs and commands that never reach the server should not pay. An
+    # `except errors.Error` clause is only evaluated once an exception is actually propagating.
+    def __getattr__(self, name):
+        from mysql.connector import errors as module
+        return getattr(module, name)
+
+
+errors = _LazyErrors()
+
+
+class PreparedStatements:
+    # Cursor-like front over one connection's server-side prepared statements. Each distinct SQL
+    # text gets its own MySQLCursorPrepared, which is prepared on first use and then only executed.
+    # The cursor keeps its statement only while it is handed the identical string object, so the
+    # first string seen for each text is the one always passed on.
+    def __init__(self, conn):
+        self.conn = conn
+        self._statements = {}
+        self._current = None
+
+    @property
+    def rowcount(self):
+        return self._current.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._current.lastrowid
+
+    @property
+    def with_rows(self):
+        return self._current.with_rows
+
+    def execute(self, operation, params=()):
+        self._select(operation).execute(self._sql, params)
+
+    def executemany(self, operation, seq_params):
+        self._select(operation).executemany(self._sql, seq_params)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def fetchone(self):
+        return self._current.fetchone()
+
+    def fetchmany(self, size=1):
+        return self._current.fetchmany(size)
+
+    def fetchall(self):
+        return self._current.fetchall()
+
+    def drain(self):
+        # The connection refuses a new command while a result set is unread.
+        if self._current is not None and self._current.with_rows:
+            self._current.fetchall()
+
+    def close(self):
+        self.drain()
+
+    def _select(self, operation):
+        self.drain()
+        entry = self._statements.get(operation)
+        if entry is None:
+            entry = self._statements[operation] = (operation, self.conn.cursor(prepared=True, dictionary=True))
+        self._sql, self._current = entry
+        return self._current
+
+
+class MySQLBackend:
+    label = 'MySQL database'
+
+    def __init__(self, host='localhost', user='root', password='', database='student_conduct_db'):
+        self.params = {'host': host, 'user': user, 'password': password, 'database': database}
+        self._prepared = {}
+
+    def connect(self):
+        import mysql.connector
+        return mysql.connector.connect(**self.params)
+
+    def cursor(self, conn):
+        return conn.cursor(dictionary=True)
+
+    def tuple_cursor(self, conn):
+        return conn.cursor()
+
+    def prepared_cursor(self, conn):
+        # Prepared statements live as long as the server session, so they are cached per
+        # connection_id; a reconnect gets a new id and therefore freshly prepared statements.
+        statements = self._prepared.get(conn.connection_id)
+        if statements is None:
+            if len(self._prepared) >= self.PREPARED_SESSIONS:
+                self._forget_ended_sessions(conn)
+            statements = self._prepared[conn.connection_id] = PreparedStatements(conn)
+        else:
+            # The pool hands out a new wrapper around the same connection on every borrow.
+            statements.conn = conn
+        return statements
+
+    PREPARED_SESSIONS = 64
+
+    def _forget_ended_sessions(self, conn):
+        # Drops the cached statements of sessions that have ended, e.g. before a reconnect. The
+        # server deallocated them with the session, and closing their cursors would send
+        # COM_STMT_CLOSE for ids that may now name statements of the new session. Sessions still
+        # connected keep theirs: dropping those would leave them allocated on the server.
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT ID FROM information_schema.PROCESSLIST")
+            alive = {row[0] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+        for connection_id in list(self._prepared):
+            if connection_id not in alive:
+                self._prepared.pop(connection_id, None)
+
+    def create_pool(self, size, name, reset_session=True):
+        # Resetting the session on return would also deallocate its prepared statements.
+        from mysql.connector import pooling
+        return pooling.MySQLConnectionPool(pool_name=name, pool_size=size, pool_reset_session=reset_session,
+                                           **self.params)
+
+    def close_pool(self, pool):
+        # Closing the sessions deallocates their prepared statements.
+        self._prepared.clear()
+        pool._remove_connections()
+
+    TABLES = {
+        'schema_migrations': ("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                description VARCHAR(200) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """,),
+        'students': ("""
+            CREATE TABLE IF NOT EXISTS students (
+                student_id INT AUTO_INCREMENT PRIMARY KEY,
+                roll_number VARCHAR(20) UNIQUE NOT NULL,
+                name VARCHAR(100) NOT NULL,
+                email VARCHAR(100),
+                phone VARCHAR(15),
+                grade VARCHAR(10),
+                class_section VARCHAR(10),
+                parent_name VARCHAR(100),
+                parent_phone VARCHAR(15),
+                enrollment_date DATE,
+                status ENUM('Active', 'Suspended', 'Expelled') DEFAULT 'Active',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+        """,),
+        'conduct_incidents': ("""
+            CREATE TABLE IF NOT EXISTS conduct_incidents (
+                incident_id INT AUTO_INCREMENT PRIMARY KEY,
+                student_id INT NOT NULL,
+                incident_type VARCHAR(100) NOT NULL,
+                category ENUM('Attendance', 'Academic Dishonesty', 'Behavior', 'Bullying', 'Violence', 'Substance', 'Other') DEFAULT 'Other',
+                description TEXT NOT NULL,
+                severity_score INT CHECK (severity_score >= 1 AND severity_score <= 10),
+                incident_date DATE NOT NULL,
+                incident_time TIME,
+                location VARCHAR(100),
+                witnesses TEXT,
+                reported_by VARCHAR(100),
+                status ENUM('Pending', 'Resolved', 'Escalated') DEFAULT 'Pending',
+                action_taken VARCHAR(500),
+                follow_up_date DATE,
+                parent_notified BOOLEAN DEFAULT FALSE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+                INDEX idx_student_date (student_id, incident_date),
+                INDEX idx_severity (severity_score)
+            )
+        """,),
+        'conduct_actions': ("""
+            CREATE TABLE IF NOT EXISTS conduct_actions (
+                action_id INT AUTO_INCREMENT PRIMARY KEY,
+                incident_id INT NOT NULL,
+                action_type VARCHAR(100),
+                action_duration INT,
+                duration_unit ENUM('Minutes', 'Hours', 'Days') DEFAULT 'Days',
+                notes TEXT,
+                action_date DATE,
+                assigned_by VARCHAR(100),
+                completed BOOLEAN DEFAULT FALSE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (incident_id) REFERENCES conduct_incidents(incident_id) ON DELETE CASCADE
+            )
+        """,),
+        'student_conduct_summary': ("""
+            CREATE TABLE IF NOT EXISTS student_conduct_summary (
+                student_id INT PRIMARY KEY,
+                incident_count INT NOT NULL DEFAULT 0,
+                severity_sum INT NOT NULL DEFAULT 0,
+                max_severity INT,
+                min_severity INT,
+                last_incident_date DATE,
+                FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+            )
+        """,),
+        # LIKE copies columns and indexes but not foreign keys, so archived rows do not depend
+        # on the live tables they were moved out of.
+        'conduct_incidents_archive': ("CREATE TABLE IF NOT EXISTS conduct_incidents_archive LIKE conduct_incidents",),
+        'conduct_actions_archive': ("CREATE TABLE IF NOT EXISTS conduct_actions_archive LIKE conduct_actions",),
+        'conduct_changes': ("""
+            CREATE TABLE IF NOT EXISTS conduct_changes (
+                change_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                table_name VARCHAR(30) NOT NULL,
+                row_id INT NOT NULL,
+                operation ENUM('insert', 'update', 'delete', 'archive') NOT NULL,
+                changed_at TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3)
+            )
+        """, """
+            CREATE TABLE IF NOT EXISTS conduct_change_lock (
+                lock_id INT PRIMARY KEY,
+                version BIGINT NOT NULL DEFAULT 0
+            )
+        """, "INSERT IGNORE INTO conduct_change_lock (lock_id) VALUES (1)"),
+    }
+
+    def create_table(self, cursor, table):
+        for statement in self.TABLES[table]:
+            cursor.execute(statement)
+
+    def has_index(self, cursor, table, index_name):
+        cursor.execute(
+            """SELECT COUNT(*) as found FROM information_schema.statistics
+               WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s""",
+            (table, index_name)
+        )
+        return cursor.fetchone()['found'] > 0
+
+    def add_index_sql(self, table, index_name, columns):
+        # ALGORITHM=INPLACE, LOCK=NONE builds the index online without blocking writes.
+        return f"ALTER TABLE {table} ADD INDEX {index_name} ({columns}), ALGORITHM=INPLACE, LOCK=NONE"
+
+    def drop_index_sql(self, table, index_name):
+        return f"ALTER TABLE {table} DROP INDEX {index_name}, ALGORITHM=INPLACE, LOCK=NONE"
+
+    def explain_index(self, cursor, sql, params, alias):
+        # (index, access description) the optimizer picks for table alias in sql.
+        cursor.execute("EXPLAIN " + sql, params)
+        plan = {row['table']: row for row in cursor.fetchall()}[alias]
+        return plan['key'], f"{plan['type']}, ~{plan['rows']} rows"
+
+    def acquire_migration_lock(self, cursor):
+        cursor.execute("SELECT GET_LOCK('student_conduct_migrations', 60) as locked")
+        return bool(cursor.fetchone()['locked'])
+
+    def release_migration_lock(self, cursor):
+        cursor.execute("SELECT RELEASE_LOCK('student_conduct_migrations')")
+        cursor.fetchall()
+
+    SUMMARY_UPSERT = """INSERT INTO student_conduct_summary
+               (student_id, incident_count, severity_sum, max_severity, min_severity, last_incident_date)
+               VALUES (%s, %s, %s, %s, %s, %s)
+               ON DUPLICATE KEY UPDATE
+                   incident_count = incident_count + VALUES(incident_count),
+                   severity_sum = severity_sum + VALUES(severity_sum),
+                   max_severity = GREATEST(COALESCE(max_severity, VALUES(max_severity)), VALUES(max_severity)),
+                   min_severity = LEAST(COALESCE(min_severity, VALUES(min_severity)), VALUES(min_severity)),
+                   last_incident_date = GREATEST(COALESCE(last_incident_date, VALUES(last_incident_date)),
+                                                 VALUES(last_incident_date))"""
+
+    ANALYZE_SQL = "ANALYZE TABLE students, conduct_incidents, conduct_actions"
+
+    ID_STEP_SQL = "SELECT @@auto_increment_increment as step"
+
+    # MySQL fills a temporary table with the whole UNION before sorting it, so each arm of an
+    # ordered UNION ALL is cut to the page size first.
+    UNION_ARM_LIMITS = True
+
+    def select_for_update(self, conn, cursor, sql, params):
+        # Reads rows the transaction goes on to update, locking them until it commits.
+        cursor.execute(sql + " FOR UPDATE", params)
+
+
+def _time_to_text(value):
+    # MySQL rounds a TIME(0) to the nearest second.
+    seconds = round(value.hour * 3600 + value.minute * 60 + value.second + value.microsecond / 1e6)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def _timedelta_to_text(value):
+    seconds = round(value.total_seconds())
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def _text_to_timedelta(value):
+    hours, minutes, seconds = value.split(':')
+    return timedelta(hours=int(hours), minutes=int(minutes), seconds=float(seconds))
+
+
+# Python values sqlite3 cannot bind, stored in the text formats MySQL would accept.
+_ADAPTERS = {
+    date: date.isoformat,
+    datetime: lambda value: value.isoformat(' ', 'seconds'),
+    time: _time_to_text,
+    timedelta: _timedelta_to_text,
+    Decimal: str,
+}
+
+_CENT = Decimal('0.01')
+
+# SQLite keeps dates and times as text and has no DECIMAL, so result columns are converted by
+# name into the types mysql.connector returns. Every DATE/TIME/TIMESTAMP column and every
+# ROUND(..., 2) alias the queries use is listed here.
+_CONVERTERS = {}
+for _name in ('enrollment_date', 'incident_date', 'follow_up_date', 'action_date', 'last_incident_date',
+              'archived_until', 'action__action_date'):
+    _CONVERTERS[_name] = lambda value: date.fromisoformat(value[:10])
+for _name in ('created_at', 'updated_at', 'applied_at', 'changed_at', 'action__created_at'):
+    _CONVERTERS[_name] = datetime.fromisoformat
+for _name in ('avg_severity', 'avg_score'):
+    _CONVERTERS[_name] = lambda value: Decimal(repr(value)).quantize(_CENT)
+_CONVERTERS['incident_time'] = _text_to_timedelta
+
+
+def _adapt(params):
+    if not params:
+        return ()
+    return tuple(_ADAPTERS[type(value)](value) if type(value) in _ADAPTERS else value for value in params)
+
+
+def _translate(error):
+    message = str(error)
+    if isinstance(error, sqlite3.IntegrityError):
+        return errors.IntegrityError(msg=message)
+    if isinstance(error, sqlite3.OperationalError):
+        return errors.OperationalError(msg=message)
+    if isinstance(error, sqlite3.ProgrammingError):
+        return errors.ProgrammingError(msg=message)
+    if isinstance(error, sqlite3.DataError):
+        return errors.DataError(msg=message)
+    return errors.DatabaseError(msg=message)
+
+
+class SQLiteCursor:
+    def __init__(self, cursor, dictionary=True):
+        self._cursor = cursor
+        self._dictionary = dictionary
+        self._names = None
+        self._converters = ()
+        self.lastrowid = None
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def with_rows(self):
+        return self._cursor.description is not None
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def column_names(self):
+        return tuple(self._names or ())
+
+    def execute(self, operation, params=None):
+        try:
+            self._cursor.execute(operation.replace('%s', '?'), _adapt(params))
+        except sqlite3.Error as e:
+            raise _translate(e) from e
+        self.lastrowid = self._cursor.lastrowid
+        self._describe()
+
+    def executemany(self, operation, seq_params):
+        try:
+            self._cursor.executemany(operation.replace('%s', '?'), [_adapt(params) for params in seq_params])
+        except sqlite3.Error as e:
+            raise _translate(e) from e
+        self.lastrowid = None
+        # mysql.connector sends an executemany INSERT as one multi-row statement and reports the
+        # first new id; rows inserted in one transaction get consecutive ids here as well.
+        if self._cursor.rowcount > 0 and operation.lstrip()[:6].upper() == 'INSERT':
+            last_id = self._cursor.connection.execute("SELECT last_insert_rowid()").fetchone()[0]
+            self.lastrowid = last_id - self._cursor.rowcount + 1
+        self._describe()
+
+    def fetchone(self):
+        values = self._cursor.fetchone()
+        return self._row(values) if values is not None else None
+
+    def fetchmany(self, size=1):
+        return [self._row(values) for values in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(values) for values in self._cursor.fetchall()]
+
+    def close(self):
+        self._cursor.close()
+
+    def _describe(self):
+        description = self._cursor.description
+        if description is None:
+            self._names, self._converters = None, ()
+            return
+        self._names = [column[0] for column in description]
+        if self._dictionary:
+            self._converters = [(name, _CONVERTERS[name]) for name in self._names if name in _CONVERTERS]
+        else:
+            self._converters = [(i, _CONVERTERS[name]) for i, name in enumerate(self._names)
+                                if name in _CONVERTERS]
+
+    def _row(self, values):
+        if not self._dictionary:
+            # Plain tuples, as from mysql.connector's default cursor.
+            if not self._converters:
+                return values
+            values = list(values)
+            for i, convert in self._converters:
+                if values[i] is not None:
+                    values[i] = convert(values[i])
+            return tuple(values)
+        row = dict(zip(self._names, values))
+        for name, convert in self._converters:
+            if row[name] is not None:
+                row[name] = convert(row[name])
+        return row
+
+
+class SQLiteConnection:
+    # mysql.connector connections expose these; SQLite cursors never leave results pending.
+    unread_result = False
+
+    def __init__(self, raw, pool=None):
+        self._raw = raw
+        self._pool = pool
+
+    @property
+    def in_transaction(self):
+        return self._raw.in_transaction
+
+    def cursor(self, dictionary=True):
+        return SQLiteCursor(self._raw.cursor(), dictionary)
+
+    def commit(self):
+        try:
+            self._raw.commit()
+        except sqlite3.Error as e:
+            raise _translate(e) from e
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def consume_results(self):
+        pass
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.release(self._raw)
+        else:
+            self._raw.close()
+
+
+class SQLitePool:
+    # Same contract as MySQLConnectionPool.get_connection(): PoolError when every connection is
+    # out, and close() on the handed-out connection returns it after rolling back.
+    def __init__(self, backend, size):
+        self._backend = backend
+        self._size = size
+        self._opened = 0
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    def get_connection(self):
+        try:
+            raw = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if self._opened >= self._size:
+                    raise errors.PoolError("Failed getting connection; pool exhausted")
+                self._opened += 1
+            raw = self._backend.open(check_same_thread=False)
+        return SQLiteConnection(raw, pool=self)
+
+    def release(self, raw):
+        raw.rollback()
+        self._idle.put(raw)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class SQLiteBackend:
+    # Embedded single-file database for single-node deployments and test runs. WAL lets readers
+    # run alongside the writer, and sqlite3 keeps each connection's statements prepared: main.py
+    # sends the same SQL text on every call, so repeated calls skip the parser.
+
+    def __init__(self, path='student_conduct.db', timeout=30):
+        self.path = path
+        self.timeout = timeout
+        self.label = f"SQLite database ({path})"
+
+    def open(self, check_same_thread=True):
+        try:
+            raw = sqlite3.connect(self.path, timeout=self.timeout, cached_statements=256,
+                                  check_same_thread=check_same_thread)
+            raw.execute("PRAGMA journal_mode = WAL")
+            raw.execute("PRAGMA synchronous = NORMAL")
+            raw.execute("PRAGMA foreign_keys = ON")
+            raw.execute("PRAGMA temp_store = MEMORY")
+            raw.execute("PRAGMA cache_size = -65536")
+            raw.execute("PRAGMA mmap_size = 268435456")
+        except sqlite3.Error as e:
+            raise _translate(e) from e
+        return raw
+
+    def connect(self):
+        return SQLiteConnection(self.open())
+
+    def cursor(self, conn):
+        return conn.cursor()
+
+    def tuple_cursor(self, conn):
+        return conn.cursor(dictionary=False)
+
+    def prepared_cursor(self, conn):
+        # sqlite3 already keeps every statement prepared per connection (cached_statements).
+        return conn.cursor()
+
+    def create_pool(self, size, name, reset_session=True):
+        # Every pooled connection is a separate database when path is ':memory:'.
+        return SQLitePool(self, size)
+
+    def close_pool(self, pool):
+        pool.close()
+
+    # Same tables as MySQLBackend. ENUMs become CHECK constraints, and text columns use NOCASE
+    # to match MySQL's case-insensitive default collation. INTEGER PRIMARY KEY AUTOINCREMENT never
+    # reuses ids, like AUTO_INCREMENT. SQLite does not index foreign keys by itself, so
+    # conduct_actions.incident_id gets an explicit index.
+    TABLES = {
+        'schema_migrations': ("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+            )
+        """,),
+        'students': ("""
+            CREATE TABLE IF NOT EXISTS students (
+                student_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                roll_number TEXT COLLATE NOCASE UNIQUE NOT NULL,
+                name TEXT COLLATE NOCASE NOT NULL,
+                email TEXT COLLATE NOCASE,
+                phone TEXT,
+                grade TEXT COLLATE NOCASE,
+                class_section TEXT COLLATE NOCASE,
+                parent_name TEXT COLLATE NOCASE,
+                parent_phone TEXT,
+                enrollment_date DATE,
+                status TEXT COLLATE NOCASE DEFAULT 'Active' CHECK (status IN ('Active', 'Suspended', 'Expelled')),
+                created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+                updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+            )
+        """, """
+            CREATE TRIGGER IF NOT EXISTS students_updated_at AFTER UPDATE ON students
+            FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+            BEGIN
+                UPDATE students SET updated_at = datetime('now', 'localtime') WHERE student_id = NEW.student_id;
+            END
+        """),
+        'conduct_incidents': ("""
+            CREATE TABLE IF NOT EXISTS conduct_incidents (
+                incident_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                student_id INTEGER NOT NULL REFERENCES students(student_id) ON DELETE CASCADE,
+                incident_type TEXT COLLATE NOCASE NOT NULL,
+                category TEXT COLLATE NOCASE DEFAULT 'Other'
+                    CHECK (category IN ('Attendance', 'Academic Dishonesty', 'Behavior', 'Bullying', 'Violence', 'Substance', 'Other')),
+                description TEXT NOT NULL,
+                severity_score INTEGER CHECK (severity_score >= 1 AND severity_score <= 10),
+                incident_date DATE NOT NULL,
+                incident_time TIME,
+                location TEXT COLLATE NOCASE,
+                witnesses TEXT,
+                reported_by TEXT COLLATE NOCASE,
+                status TEXT COLLATE NOCASE DEFAULT 'Pending' CHECK (status IN ('Pending', 'Resolved', 'Escalated')),
+                action_taken TEXT,
+                follow_up_date DATE,
+                parent_notified BOOLEAN DEFAULT FALSE,
+                created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+            )
+        """,
+            "CREATE INDEX IF NOT EXISTS idx_student_date ON conduct_incidents (student_id, incident_date)",
+            "CREATE INDEX IF NOT EXISTS idx_severity ON conduct_incidents (severity_score)"),
+        'conduct_actions': ("""
+            CREATE TABLE IF NOT EXISTS conduct_actions (
+                action_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                incident_id INTEGER NOT NULL REFERENCES conduct_incidents(incident_id) ON DELETE CASCADE,
+                action_type TEXT COLLATE NOCASE,
+                action_duration INTEGER,
+                duration_unit TEXT COLLATE NOCASE DEFAULT 'Days' CHECK (duration_unit IN ('Minutes', 'Hours', 'Days')),
+                notes TEXT,
+                action_date DATE,
+                assigned_by TEXT COLLATE NOCASE,
+                completed BOOLEAN DEFAULT FALSE,
+                created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+            )
+        """,
+            "CREATE INDEX IF NOT EXISTS idx_actions_incident ON conduct_actions (incident_id)"),
+        # severity_sum is REAL so severity_sum / incident_count divides like MySQL instead of truncating.
+        'student_conduct_summary': ("""
+            CREATE TABLE IF NOT EXISTS student_conduct_summary (
+                student_id INTEGER PRIMARY KEY REFERENCES students(student_id) ON DELETE CASCADE,
+                incident_count INTEGER NOT NULL DEFAULT 0,
+                severity_sum REAL NOT NULL DEFAULT 0,
+                max_severity INTEGER,
+                min_severity INTEGER,
+                last_incident_date DATE
+            )
+        """,),
+        # Same columns in the same order as the live tables (INSERT ... SELECT * relies on it),
+        # without constraints. Index names are per database in SQLite, hence the prefixes.
+        'conduct_incidents_archive': (
+            "CREATE TABLE IF NOT EXISTS conduct_incidents_archive AS SELECT * FROM conduct_incidents WHERE 0",
+            "CREATE INDEX IF NOT EXISTS idx_archive_student_date ON conduct_incidents_archive (student_id, incident_date)",
+            "CREATE INDEX IF NOT EXISTS idx_archive_incident_date ON conduct_incidents_archive (incident_date)"),
+        'conduct_actions_archive': (
+            "CREATE TABLE IF NOT EXISTS conduct_actions_archive AS SELECT * FROM conduct_actions WHERE 0",
+            "CREATE INDEX IF NOT EXISTS idx_archive_actions_incident ON conduct_actions_archive (incident_id)"),
+        # AUTOINCREMENT so change_ids are never reused, even after the newest entries are pruned.
+        'conduct_changes': ("""
+            CREATE TABLE IF NOT EXISTS conduct_changes (
+                change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                operation TEXT NOT NULL CHECK (operation IN ('insert', 'update', 'delete', 'archive')),
+                changed_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+            )
+        """, """
+            CREATE TABLE IF NOT EXISTS conduct_change_lock (
+                lock_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        """, "INSERT OR IGNORE INTO conduct_change_lock (lock_id) VALUES (1)"),
+    }
+
+    def create_table(self, cursor, table):
+        for statement in self.TABLES[table]:
+            cursor.execute(statement)
+
+    def has_index(self, cursor, table, index_name):
+        cursor.execute(
+            "SELECT COUNT(*) as found FROM sqlite_master WHERE type = 'index' AND tbl_name = %s AND name = %s",
+            (table, index_name)
+        )
+        return cursor.fetchone()['found'] > 0
+
+    def add_index_sql(self, table, index_name, columns):
+        return f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({columns})"
+
+    def drop_index_sql(self, table, index_name):
+        return f"DROP INDEX IF EXISTS {index_name}"
+
+    def explain_index(self, cursor, sql, params, alias):
+        # Plan steps read "SEARCH c USING INDEX name (...)" or "SCAN c".
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        for row in cursor.fetchall():
+            words = row['detail'].split()
+            if len(words) > 1 and words[1] == alias:
+                match = re.search(r'USING (?:COVERING )?INDEX (\w+)', row['detail'])
+                return (match.group(1) if match else None), row['detail']
+        return None, None
+
+    def acquire_migration_lock(self, cursor):
+        # SQLite serialises writers itself and every migration step is idempotent.
+        return True
+
+    def release_migration_lock(self, cursor):
+        pass
+
+    SUMMARY_UPSERT = """INSERT INTO student_conduct_summary
+               (student_id, incident_count, severity_sum, max_severity, min_severity, last_incident_date)
+               VALUES (%s, %s, %s, %s, %s, %s)
+               ON CONFLICT (student_id) DO UPDATE SET
+                   incident_count = incident_count + excluded.incident_count,
+                   severity_sum = severity_sum + excluded.severity_sum,
+                   max_severity = MAX(COALESCE(max_severity, excluded.max_severity), excluded.max_severity),
+                   min_severity = MIN(COALESCE(min_severity, excluded.min_severity), excluded.min_severity),
+                   last_incident_date = MAX(COALESCE(last_incident_date, excluded.last_incident_date),
+                                            excluded.last_incident_date)"""
+
+    ANALYZE_SQL = "ANALYZE"
+
+    ID_STEP_SQL = "SELECT 1 as step"
+
+    # SQLite merges ordered UNION ALL arms as it reads them and stops at the outer LIMIT.
+    UNION_ARM_LIMITS = False
+
+    def select_for_update(self, conn, cursor, sql, params):
+        # SQLite has no row locks, and sqlite3 only opens a transaction at the first write. BEGIN
+        # IMMEDIATE takes the database's write lock before the read instead.
+        if not conn.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(sql, params)
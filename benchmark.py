@@ -0,0 +1,825 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from backends import SQLiteBackend
+from main import QueryInstrumentation, StudentConductDB
+
+
+def make_students(count, prefix):
+    for i in range(count):
+        yield (f"{prefix}{i:06d}", f"Student {i}", f"student{i}@school.com", "9876543210",
+               str(9 + i % 4), "ABCD"[i % 4], f"Parent {i}", "9876543210")
+
+
+def bench_bulk_add(db, args):
+    run = int(time.time()) % 100000
+    rows = list(make_students(args.rows, f"P{run}-"))
+    start = time.perf_counter()
+    for row in rows:
+        db.add_student(*row)
+    per_row = time.perf_counter() - start
+
+    rows = list(make_students(args.rows, f"B{run}-"))
+    start = time.perf_counter()
+    db.bulk_add_students(rows, batch_size=args.batch_size)
+    bulk = time.perf_counter() - start
+
+    print(f"add_student x{args.rows}:        {per_row:.3f}s ({args.rows / per_row:.0f} rows/s)")
+    print(f"bulk_add_students x{args.rows}:  {bulk:.3f}s ({args.rows / bulk:.0f} rows/s)")
+    print(f"Speedup: {per_row / bulk:.1f}x")
+
+
+def make_incidents(count, student_ids):
+    categories = ['Attendance', 'Academic Dishonesty', 'Behavior', 'Bullying', 'Violence', 'Substance', 'Other']
+    for i in range(count):
+        yield {
+            'student_id': student_ids[i % len(student_ids)],
+            'incident_type': f"Incident {i}",
+            'category': categories[i % len(categories)],
+            'description': "Synthetic benchmark incident",
+            'severity_score': 1 + i % 10,
+            'location': "Classroom",
+            'witnesses': "N/A",
+            'reported_by': "Benchmark",
+            'action_taken': None
+        }
+
+
+def bench_bulk_incidents(db, args):
+    run = int(time.time()) % 100000
+    db.bulk_add_students(make_students(50, f"I{run}-"))
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT student_id FROM students WHERE roll_number LIKE %s", (f"I{run}-%",))
+        student_ids = [r['student_id'] for r in cursor.fetchall()]
+
+    incidents = list(make_incidents(args.rows, student_ids))
+    start = time.perf_counter()
+    for incident in incidents:
+        db.record_incident(**incident)
+    per_row = time.perf_counter() - start
+
+    start = time.perf_counter()
+    db.record_incidents_bulk(incidents, batch_size=args.batch_size)
+    bulk = time.perf_counter() - start
+
+    print(f"record_incident x{args.rows}:        {per_row:.3f}s ({args.rows / per_row:.0f} rows/s)")
+    print(f"record_incidents_bulk x{args.rows}:  {bulk:.3f}s ({args.rows / bulk:.0f} rows/s)")
+    print(f"Speedup: {per_row / bulk:.1f}x")
+
+
+def bench_monthly_report(db, args):
+    run = int(time.time()) % 100000
+    db.bulk_add_students(make_students(200, f"M{run}-"))
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT student_id FROM students WHERE roll_number LIKE %s", (f"M{run}-%",))
+        student_ids = [r['student_id'] for r in cursor.fetchall()]
+
+    # Spread incidents over three years so one month is a small slice of the table.
+    first_day = date.today() - timedelta(days=3 * 365)
+    incidents = list(make_incidents(args.rows, student_ids))
+    for i, incident in enumerate(incidents):
+        incident['incident_date'] = first_day + timedelta(days=i % (3 * 365))
+    db.record_incidents_bulk(incidents, batch_size=args.batch_size)
+
+    month, year = date.today().month, date.today().year
+    start, end = db._month_range(month, year)
+    with db._session() as (conn, cursor):
+        cursor.execute(db.backend.ANALYZE_SQL)
+        cursor.fetchall()
+        index, access = db.backend.explain_index(
+            cursor,
+            """SELECT c.incident_id FROM conduct_incidents c
+               JOIN students s ON c.student_id = s.student_id
+               WHERE c.incident_date >= %s AND c.incident_date < %s""",
+            (start, end), 'c'
+        )
+    assert index == 'idx_incident_date', f"monthly report does not use idx_incident_date: {access}"
+    print(f"EXPLAIN: conduct_incidents accessed via {index} ({access})")
+
+    start_time = time.perf_counter()
+    for _ in range(20):
+        report = db.get_monthly_report(month, year)
+    elapsed = (time.perf_counter() - start_time) / 20
+    print(f"get_monthly_report({month}, {year}): {elapsed * 1000:.2f} ms, {len(report)} rows")
+
+
+def bench_async_throughput(db, args):
+    from async_db import AsyncStudentConductDB
+
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT student_id FROM students ORDER BY student_id LIMIT %s", (args.rows,))
+        student_ids = [r['student_id'] for r in cursor.fetchall()]
+    if not student_ids:
+        print("No students to read; run bulk_add first.")
+        return
+
+    start = time.perf_counter()
+    for student_id in student_ids:
+        db.get_student_record(student_id)
+        db.get_student_stats(student_id)
+    sync_elapsed = time.perf_counter() - start
+
+    async def run():
+        adb = await AsyncStudentConductDB.connect(args.host, args.user, args.password, args.database,
+                                                  pool_size=args.concurrency)
+        limit = asyncio.Semaphore(args.concurrency)
+
+        async def fetch(student_id):
+            async with limit:
+                await asyncio.gather(adb.get_student_record(student_id), adb.get_student_stats(student_id))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(fetch(student_id) for student_id in student_ids))
+        elapsed = time.perf_counter() - start
+        await adb.close()
+        return elapsed
+
+    async_elapsed = asyncio.run(run())
+    calls = len(student_ids)
+    print(f"sync record+stats x{calls}:   {sync_elapsed:.3f}s ({calls / sync_elapsed:.0f} students/s)")
+    print(f"async record+stats x{calls}:  {async_elapsed:.3f}s ({calls / async_elapsed:.0f} students/s, "
+          f"concurrency {args.concurrency})")
+
+
+def time_call(func, repeat=5):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rows = func()
+    return (time.perf_counter() - start) / repeat, len(rows)
+
+
+def bench_covering_indexes(db, args):
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT COUNT(*) as n FROM conduct_incidents")
+        existing = cursor.fetchone()['n']
+    if existing < args.rows:
+        run = int(time.time()) % 100000
+        db.bulk_add_students(make_students(2000, f"X{run}-"))
+        with db._session() as (conn, cursor):
+            cursor.execute("SELECT student_id FROM students WHERE roll_number LIKE %s", (f"X{run}-%",))
+            student_ids = [r['student_id'] for r in cursor.fetchall()]
+        first_day = date.today() - timedelta(days=3 * 365)
+        statuses = ['Resolved'] * 8 + ['Pending', 'Escalated']
+        remaining = args.rows - existing
+        while remaining > 0:
+            chunk = list(make_incidents(min(remaining, 50000), student_ids))
+            for i, incident in enumerate(chunk):
+                incident['incident_date'] = first_day + timedelta(days=i % (3 * 365))
+            result = db.record_incidents_bulk(chunk, batch_size=args.batch_size)
+            with db._session() as (conn, cursor):
+                cursor.executemany(
+                    "UPDATE conduct_incidents SET status = %s WHERE incident_id = %s",
+                    [(statuses[i % len(statuses)], incident_id)
+                     for i, incident_id in enumerate(result['incident_ids']) if incident_id]
+                )
+                conn.commit()
+            remaining -= len(chunk)
+
+    queries = {
+        'get_incidents_by_category (all)': lambda: db.get_incidents_by_category('Bullying'),
+        'get_incidents_by_category (page)': lambda: db.get_incidents_by_category('Bullying', limit=20),
+        'get_pending_incidents (all)': lambda: db.get_pending_incidents(),
+        'get_pending_incidents (page)': lambda: db.get_pending_incidents(limit=20),
+    }
+    indexes = {'idx_category_date': 'category, incident_date',
+               'idx_status_severity_date': 'status, severity_score DESC, incident_date, incident_id'}
+
+    with db._session() as (conn, cursor):
+        for name in indexes:
+            cursor.execute(db.backend.drop_index_sql('conduct_incidents', name))
+    without = {label: time_call(func) for label, func in queries.items()}
+
+    with db._session() as (conn, cursor):
+        for name, columns in indexes.items():
+            db._ensure_index(cursor, 'conduct_incidents', name, columns)
+    with_indexes = {label: time_call(func) for label, func in queries.items()}
+
+    print(f"{'Query':<36} {'Rows':>8} {'No index (ms)':>15} {'Indexed (ms)':>14}")
+    for label in queries:
+        print(f"{label:<36} {with_indexes[label][1]:>8} {without[label][0] * 1000:>15.2f} "
+              f"{with_indexes[label][0] * 1000:>14.2f}")
+
+
+CATEGORY_WEIGHTS = {'Attendance': 35, 'Behavior': 25, 'Academic Dishonesty': 12, 'Bullying': 10,
+                    'Other': 8, 'Violence': 6, 'Substance': 4}
+SEVERITY_WEIGHTS = [20, 18, 15, 12, 10, 8, 6, 5, 4, 2]
+INCIDENT_STATUS_WEIGHTS = {'Resolved': 80, 'Pending': 14, 'Escalated': 6}
+STUDENT_STATUS_WEIGHTS = {'Active': 94, 'Suspended': 5, 'Expelled': 1}
+ACTION_TYPES = ['Warning', 'Detention', 'Parent Meeting', 'Counseling', 'Suspension']
+
+
+def seed_dataset(db, args, rng):
+    # Skewed like a real school: a tenth of the students account for about a third of incidents, minor categories and
+    # low severities dominate, incidents fall on school days over three years, and serious
+    # incidents are the ones that get follow-up actions.
+    run = int(time.time()) % 100000
+    prefix = f"S{run}-"
+    timings = {}
+
+    start = time.perf_counter()
+    db.bulk_add_students(make_students(args.students, prefix), batch_size=args.batch_size)
+    timings['bulk_add_students'] = time.perf_counter() - start
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT student_id FROM students WHERE roll_number LIKE %s ORDER BY student_id",
+                       (f"{prefix}%",))
+        student_ids = [r['student_id'] for r in cursor.fetchall()]
+        statuses = rng.choices(list(STUDENT_STATUS_WEIGHTS), list(STUDENT_STATUS_WEIGHTS.values()),
+                               k=len(student_ids))
+        cursor.executemany("UPDATE students SET status = %s WHERE student_id = %s",
+                           [(status, student_id) for status, student_id in zip(statuses, student_ids)
+                            if status != 'Active'])
+        conn.commit()
+
+    student_weights = [rng.paretovariate(2.0) for _ in student_ids]
+    first_day = date.today() - timedelta(days=3 * 365)
+    incidents = []
+    for i, student_id in enumerate(rng.choices(student_ids, student_weights, k=args.rows)):
+        day = first_day + timedelta(days=rng.randrange(3 * 365))
+        if day.weekday() >= 5:
+            day -= timedelta(days=day.weekday() - 4)
+        incidents.append({
+            'student_id': student_id,
+            'incident_type': f"Incident {i}",
+            'category': rng.choices(list(CATEGORY_WEIGHTS), list(CATEGORY_WEIGHTS.values()))[0],
+            'description': "Synthetic benchmark incident",
+            'severity_score': rng.choices(range(1, 11), SEVERITY_WEIGHTS)[0],
+            'incident_date': day,
+            'location': rng.choice(['Classroom', 'Playground', 'Corridor', 'Cafeteria', 'Bus']),
+            'witnesses': "N/A",
+            'reported_by': "Benchmark",
+            'action_taken': None
+        })
+
+    start = time.perf_counter()
+    incident_ids = db.record_incidents_bulk(incidents, batch_size=args.batch_size)['incident_ids']
+    timings['record_incidents_bulk'] = time.perf_counter() - start
+
+    statuses, actions = [], []
+    for incident, incident_id in zip(incidents, incident_ids):
+        if not incident_id:
+            continue
+        status = rng.choices(list(INCIDENT_STATUS_WEIGHTS), list(INCIDENT_STATUS_WEIGHTS.values()))[0]
+        if status != 'Pending':
+            statuses.append((status, incident_id))
+        for _ in range(rng.choices([0, 1, 2], [10 - incident['severity_score'], incident['severity_score'], 2])[0]):
+            actions.append((incident_id, rng.choice(ACTION_TYPES), rng.randint(1, 5), 'Days', "Synthetic action",
+                            incident['incident_date'], "Benchmark", rng.random() < 0.7))
+    with db._session() as (conn, cursor):
+        for i in range(0, len(statuses), args.batch_size):
+            cursor.executemany("UPDATE conduct_incidents SET status = %s WHERE incident_id = %s",
+                               statuses[i:i + args.batch_size])
+        for i in range(0, len(actions), args.batch_size):
+            cursor.executemany(
+                """INSERT INTO conduct_actions
+                   (incident_id, action_type, action_duration, duration_unit, notes, action_date, assigned_by, completed)
+                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
+                actions[i:i + args.batch_size]
+            )
+        conn.commit()
+        cursor.execute(db.backend.ANALYZE_SQL)
+        cursor.fetchall()
+
+    return {'prefix': prefix, 'student_ids': student_ids,
+            'incident_ids': [incident_id for incident_id in incident_ids if incident_id],
+            'actions': len(actions), 'timings': timings}
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def count_rows(result):
+    if isinstance(result, dict):
+        return len(result.get('incidents', ())) + 1 if 'student' in result else 1
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    return 1
+
+
+def count_table(db, table):
+    with db._session() as (conn, cursor):
+        cursor.execute(f"SELECT COUNT(*) as n FROM {table}")
+        return cursor.fetchone()['n']
+
+
+def bench_suite(db, args):
+    # Times every public StudentConductDB method against a freshly seeded, skewed dataset and
+    # writes p50/p95 latency and rows/s to JSON so runs can be compared across versions.
+    rng = random.Random(args.seed)
+    print(f"Seeding {args.students} students and {args.rows} incidents...")
+    data = seed_dataset(db, args, rng)
+    student_ids, incident_ids = data['student_ids'], data['incident_ids']
+    # The busiest student is the interesting case for per-student reads.
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT student_id FROM student_conduct_summary WHERE student_id BETWEEN %s AND %s "
+                       "ORDER BY incident_count DESC LIMIT 1", (student_ids[0], student_ids[-1]))
+        heavy = cursor.fetchone()
+    heavy_id = heavy['student_id'] if heavy else student_ids[0]
+    today = date.today()
+    added = []
+
+    def add_student():
+        roll = f"{data['prefix']}A{len(added):06d}"
+        db.add_student(roll, "Bench Student", f"{roll}@school.com", "9876543210", "10", "A",
+                       "Bench Parent", "9876543210")
+        added.append(roll)
+
+    def delete_student():
+        with db._session() as (conn, cursor):
+            cursor.execute("SELECT student_id FROM students WHERE roll_number LIKE %s LIMIT 1",
+                           (f"{data['prefix']}A%",))
+            row = cursor.fetchone()
+        return db.delete_student(row['student_id']) if row else None
+
+    # (method, call, heavy) - heavy cases run a fifth as many times.
+    cases = [
+        ('add_student', add_student, False),
+        ('record_incident', lambda: db.record_incident(rng.choice(student_ids), "Bench incident", 'Behavior',
+                                                       "Synthetic", rng.randint(1, 10), "Classroom", "N/A",
+                                                       "Benchmark", None), False),
+        ('add_action_to_incident', lambda: db.add_action_to_incident(rng.choice(incident_ids), 'Warning', 1,
+                                                                     'Days', "Synthetic", "Benchmark"), False),
+        ('get_student_record', lambda: db.get_student_record(heavy_id), False),
+        ('get_student_stats', lambda: db.get_student_stats(heavy_id), False),
+        ('get_student_dossier', lambda: db.get_student_dossier(heavy_id), False),
+        ('list_all_students', lambda: db.list_all_students(), True),
+        ('list_all_students (page)', lambda: db.list_all_students(limit=20), False),
+        ('get_high_risk_students', lambda: db.get_high_risk_students(), True),
+        ('get_incidents_by_category', lambda: db.get_incidents_by_category('Bullying'), True),
+        ('get_incidents_by_category (page)', lambda: db.get_incidents_by_category('Bullying', limit=20), False),
+        ('get_pending_incidents', lambda: db.get_pending_incidents(), True),
+        ('get_pending_incidents (page)', lambda: db.get_pending_incidents(limit=20), False),
+        ('get_monthly_report', lambda: db.get_monthly_report(today.month, today.year), False),
+        ('get_incidents_between', lambda: db.get_incidents_between(today - timedelta(days=365), today), True),
+        ('get_severity_distribution', lambda: db.get_severity_distribution(), True),
+        ('update_incident_status', lambda: db.update_incident_status(rng.choice(incident_ids), 'Resolved'), False),
+        ('mark_parent_notified', lambda: db.mark_parent_notified(rng.choice(incident_ids)), False),
+        ('update_student_status', lambda: db.update_student_status(rng.choice(student_ids), 'Active'), False),
+        ('export_student_card_csv', lambda: db.export_student_card_csv(heavy_id), False),
+        ('export_all_students_csv', lambda: db.export_all_students_csv(stream=True), True),
+        ('export_monthly_report_csv', lambda: db.export_monthly_report_csv(today.month, today.year, stream=True),
+         False),
+        ('export_all_student_cards', lambda: db.export_all_student_cards(as_zip=True), True),
+        ('rebuild_summaries', lambda: db.rebuild_summaries(), True),
+        ('delete_student', delete_student, False),
+    ]
+    # These report a filename, True or a count rather than rows; count what they wrote instead.
+    exported_rows = {
+        'export_all_students_csv': lambda: count_table(db, "students"),
+        'export_monthly_report_csv': lambda: len(db.get_monthly_report(today.month, today.year)),
+        'export_all_student_cards': lambda: count_table(db, "students"),
+        'rebuild_summaries': lambda: count_table(db, "student_conduct_summary"),
+    }
+
+    results = {}
+    workdir = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            for name, call, is_heavy in cases:
+                repeat = max(1, args.repeat // 5) if is_heavy else args.repeat
+                samples = []
+                with contextlib.redirect_stdout(io.StringIO()):
+                    rows = count_rows(call())
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        call()
+                        samples.append(time.perf_counter() - start)
+                    if name in exported_rows:
+                        rows = exported_rows[name]()
+                p50, p95 = percentile(samples, 0.5), percentile(samples, 0.95)
+                results[name] = {'runs': repeat, 'rows': rows, 'p50_ms': round(p50 * 1000, 3),
+                                 'p95_ms': round(p95 * 1000, 3),
+                                 'rows_per_s': round(rows / p50, 1) if p50 else None}
+                print(f"{name:<36} {rows:>9} rows  p50 {p50 * 1000:>10.2f} ms  p95 {p95 * 1000:>10.2f} ms")
+        finally:
+            os.chdir(workdir)
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'database': args.database,
+        'seed': args.seed,
+        'scale': {'students': args.students, 'incidents': args.rows, 'actions': data['actions']},
+        'seeding_s': {name: round(elapsed, 3) for name, elapsed in data['timings'].items()},
+        'methods': results,
+    }
+    output = args.output or f"bench_suite_{args.rows}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+def bench_instrumentation(db, args):
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT student_id FROM students ORDER BY student_id LIMIT %s", (args.rows,))
+        student_ids = [r['student_id'] for r in cursor.fetchall()]
+    if not student_ids:
+        print("No students to read; run bulk_add first.")
+        return
+
+    def read_all():
+        for student_id in student_ids:
+            db.get_student_record(student_id)
+
+    db.instrumentation = None
+    off = min(time_call(lambda: read_all() or [], repeat=3)[0] for _ in range(3))
+    db.instrumentation = QueryInstrumentation()
+    on = min(time_call(lambda: read_all() or [], repeat=3)[0] for _ in range(3))
+    stats = db.instrumentation.stats()
+    db.instrumentation = None
+
+    calls = len(student_ids)
+    print(f"get_student_record x{calls}, instrumentation off: {off * 1000:.1f} ms")
+    print(f"get_student_record x{calls}, instrumentation on:  {on * 1000:.1f} ms ({(on / off - 1) * 100:+.1f}%)")
+    for row in stats:
+        print(f"  {row['method']}: {row['calls']} calls, {row['rows']} rows, {row['seconds'] * 1000:.1f} ms | "
+              f"{row['fingerprint']}")
+
+
+def bench_analytics(db, args):
+    from analytics import ConductAnalytics
+
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT student_id FROM student_conduct_summary ORDER BY incident_count DESC LIMIT 50")
+        student_ids = [r['student_id'] for r in cursor.fetchall()]
+    if not student_ids:
+        print("No incidents to analyse; run suite or bulk_incidents first.")
+        return
+
+    def sql_dashboard():
+        db.get_severity_distribution()
+        db.get_high_risk_students()
+        return [db.get_student_stats(student_id) for student_id in student_ids]
+
+    analytics = ConductAnalytics(db)
+    start = time.perf_counter()
+    loaded = analytics.refresh()
+    load_time = time.perf_counter() - start
+
+    def columnar_dashboard():
+        analytics.refresh()
+        analytics.severity_distribution()
+        analytics.high_risk_students()
+        return [analytics.student_stats(student_id) for student_id in student_ids]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        sql_time = time_call(sql_dashboard)[0]
+        columnar_time = time_call(columnar_dashboard)[0]
+    print(f"Initial load: {loaded} incidents in {load_time * 1000:.1f} ms")
+    print(f"Dashboard (distribution + high risk + {len(student_ids)} student stats):")
+    print(f"  SQL aggregates:         {sql_time * 1000:.2f} ms")
+    print(f"  ConductAnalytics:       {columnar_time * 1000:.2f} ms (including incremental refresh)")
+
+
+def bench_prepared(db, args):
+    # Per-call latency of the hot path with plain cursors vs prepared statements, on the same
+    # connection and rows. Statements are prepared by a warm-up pass before timing.
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT incident_id, student_id FROM conduct_incidents ORDER BY incident_id LIMIT %s",
+                       (args.rows,))
+        rows = cursor.fetchall()
+    if not rows:
+        print("No incidents to read; run suite or bulk_incidents first.")
+        return
+    incident_ids = [r['incident_id'] for r in rows]
+    student_ids = sorted({r['student_id'] for r in rows})
+    calls = {
+        'get_student_record': (db.get_student_record, student_ids),
+        'get_student_stats': (db.get_student_stats, student_ids),
+        'get_student_dossier': (db.get_student_dossier, student_ids),
+        'update_incident_status': (lambda incident_id: db.update_incident_status(incident_id, 'Pending'),
+                                   incident_ids),
+        'mark_parent_notified': (db.mark_parent_notified, incident_ids),
+    }
+    cache, db.cache = db.cache, None
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for prepared in (False, True):
+            db.prepared = prepared
+            for method, (func, targets) in calls.items():
+                for target in targets[:10]:
+                    func(target)
+                samples = []
+                for target in targets:
+                    start = time.perf_counter()
+                    func(target)
+                    samples.append(time.perf_counter() - start)
+                results[method, prepared] = samples
+    db.prepared = False
+    db.cache = cache
+
+    print(f"{'method':<24} {'plain p50/p95 (ms)':>20} {'prepared p50/p95 (ms)':>23} {'p50 change':>11}")
+    for method in calls:
+        plain, prepared = results[method, False], results[method, True]
+        print(f"{method:<24} {percentile(plain, 0.5) * 1000:>9.3f} / {percentile(plain, 0.95) * 1000:<8.3f}"
+              f" {percentile(prepared, 0.5) * 1000:>10.3f} / {percentile(prepared, 0.95) * 1000:<10.3f}"
+              f" {(percentile(prepared, 0.5) / percentile(plain, 0.5) - 1) * 100:>+10.1f}%")
+
+
+def import_times(statement):
+    # Runs `python -X importtime -c statement` and returns {module: cumulative seconds} for the
+    # modules imported at top level (the ones the statement itself pulled in).
+    here = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=here,
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name[1:].startswith(' '):
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def bench_startup(db, args):
+    # Import cost of main.py as measured by -X importtime, what the deferred modules add when a
+    # command does need them (modules something else already imported cost nothing and are not
+    # listed), and the wall-clock time of a scripted command.
+    runs = min(args.repeat, 10)
+    samples = [import_times("import main")['main'] for _ in range(runs)]
+    connector = import_times("import mysql.connector")['mysql.connector']
+    deferred = ['tabulate', 'csv', 'gzip', 'json', 'zipfile', 'concurrent.futures', 'argparse']
+    eager = import_times("import main, " + ", ".join(deferred))
+    print(f"import main: p50 {percentile(samples, 0.5) * 1000:.1f} ms over {runs} runs")
+    print(f"  mysql.connector on first connect or error: {connector * 1000:.1f} ms")
+    print(f"  deferred until used: {sum(eager.get(name, 0) for name in deferred) * 1000:.1f} ms "
+          f"({', '.join(name for name in deferred if name in eager)})")
+
+    connection = ['--sqlite', args.sqlite] if args.sqlite else [
+        '--host', args.host, '--user', args.user, '--password', args.password, '--database', args.database]
+    today = date.today()
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py'), *connection,
+               'export-monthly', str(today.month), str(today.year)]
+    with tempfile.TemporaryDirectory() as workdir:
+        wall = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=workdir, capture_output=True, check=True)
+            wall.append(time.perf_counter() - start)
+    print(f"main.py export-monthly {today.month} {today.year}: p50 {percentile(wall, 0.5) * 1000:.1f} ms, "
+          f"p95 {percentile(wall, 0.95) * 1000:.1f} ms end to end")
+
+
+NAME_SYLLABLES = ['an', 'ar', 'ka', 'ri', 'mo', 'la', 'ne', 'sh', 'ta', 'vi', 'el', 'jo', 'ma', 'ra', 'li',
+                  'sa', 'de', 'no', 'pa', 'go', 'ha', 'be', 'tr', 'is', 'on', 'ue', 'ch', 'ya', 'ze', 'fu']
+
+
+def make_named_students(count, prefix, rng):
+    # Like make_students, but with varied names: a few thousand first names and surnames, the
+    # common ones much more frequent, and parents sharing the student's surname.
+    firsts = sorted({''.join(rng.choices(NAME_SYLLABLES, k=rng.randint(2, 3))).title() for _ in range(3000)})
+    lasts = sorted({''.join(rng.choices(NAME_SYLLABLES, k=rng.randint(2, 4))).title() for _ in range(5000)})
+    first_weights = [1 / rank for rank in range(1, len(firsts) + 1)]
+    last_weights = [1 / rank for rank in range(1, len(lasts) + 1)]
+    for i in range(count):
+        first, parent = rng.choices(firsts, first_weights, k=2)
+        last = rng.choices(lasts, last_weights)[0]
+        yield (f"{prefix}{i:06d}", f"{first} {last}", None, None, str(9 + i % 4), "ABCD"[i % 4],
+               f"{parent} {last}", None)
+
+
+def typo(word, rng):
+    i = rng.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def bench_search(db, args):
+    # search_students latency over prefix, typo, full-name and roll-number queries, against the
+    # LIKE '%...%' scan staff use today.
+    rng = random.Random(args.seed)
+    prefix = f"N{int(time.time()) % 100000}-"
+    print(f"Seeding {args.students} students...")
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.bulk_add_students(make_named_students(args.students, prefix, rng), batch_size=args.batch_size)
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT name, roll_number FROM students WHERE roll_number LIKE %s", (f"{prefix}%",))
+        students = cursor.fetchall()
+
+    start = time.perf_counter()
+    db.search_students('warm up')
+    print(f"Index built over {len(db.search_index)} students in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    queries = []
+    for student in rng.sample(students, min(len(students), args.repeat * 10)):
+        first, last = student['name'].split()
+        queries.append(rng.choice([
+            first[:rng.randint(2, 5)],
+            typo(last, rng),
+            student['name'],
+            f"{first} {last[:3]}",
+            student['roll_number'][:len(prefix) + 4],
+        ]))
+    index_only, end_to_end = [], []
+    for query in queries:
+        start = time.perf_counter()
+        db.search_index.search(query)
+        index_only.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        db.search_students(query)
+        end_to_end.append(time.perf_counter() - start)
+    like = []
+    with db._session() as (conn, cursor):
+        for query in queries[:args.repeat]:
+            start = time.perf_counter()
+            cursor.execute("SELECT student_id FROM students WHERE name LIKE %s OR roll_number LIKE %s "
+                           "OR parent_name LIKE %s LIMIT 10", (f"%{query}%",) * 3)
+            cursor.fetchall()
+            like.append(time.perf_counter() - start)
+
+    print(f"{len(queries)} queries (prefix, one-typo surname, full name, first name + surname prefix, roll prefix):")
+    print(f"  index lookup:          p50 {percentile(index_only, 0.5) * 1000:.2f} ms, "
+          f"p95 {percentile(index_only, 0.95) * 1000:.2f} ms")
+    print(f"  search_students():     p50 {percentile(end_to_end, 0.5) * 1000:.2f} ms, "
+          f"p95 {percentile(end_to_end, 0.95) * 1000:.2f} ms (refresh check and row fetch included)")
+    print(f"  LIKE '%...%' scan:     p50 {percentile(like, 0.5) * 1000:.2f} ms, "
+          f"p95 {percentile(like, 0.95) * 1000:.2f} ms (exact substrings only)")
+
+
+def bench_changes(db, args):
+    # A consumer that needs the incidents updated since its last poll: re-reading the pending
+    # list and diffing it against the previous copy, versus reading the change feed.
+    run = int(time.time()) % 100000
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.bulk_add_students(make_students(args.students, f"C{run}-"), batch_size=args.batch_size)
+        with db._session() as (conn, cursor):
+            cursor.execute("SELECT student_id FROM students WHERE roll_number LIKE %s", (f"C{run}-%",))
+            student_ids = [r['student_id'] for r in cursor.fetchall()]
+        incident_ids = db.record_incidents_bulk(make_incidents(args.rows, student_ids),
+                                                batch_size=args.batch_size)['incident_ids']
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT MAX(change_id) as last_id FROM conduct_changes")
+        cursor_id = cursor.fetchone()['last_id']
+    previous = {r['incident_id']: r['status'] for r in db.get_pending_incidents()}
+
+    updated = random.Random(args.seed).sample(incident_ids, min(args.repeat, len(incident_ids)))
+    with contextlib.redirect_stdout(io.StringIO()):
+        for incident_id in updated:
+            db.update_incident_status(incident_id, 'Escalated')
+    # MySQL only returns changes older than a second, so concurrent commits cannot be skipped.
+    time.sleep(1.1)
+
+    start = time.perf_counter()
+    current = {r['incident_id']: r['status'] for r in db.get_pending_incidents()}
+    rescanned = [i for i, status in current.items() if previous.get(i) != status]
+    rescan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    feed = db.get_changes(since=cursor_id, tables=['conduct_incidents'])
+    delta_time = time.perf_counter() - start
+
+    print(f"{len(updated)} incidents updated among {len(current)} pending:")
+    print(f"  re-read + diff:         {rescan_time * 1000:.2f} ms ({len(rescanned)} changed rows found)")
+    print(f"  get_changes(since):     {delta_time * 1000:.2f} ms ({len(feed['changes'])} changes, rows attached)")
+
+
+def bench_notify(db, args):
+    # One message at a time followed by mark_parent_notified, versus NotificationDispatcher with
+    # --concurrency workers and one UPDATE per batch, through a stub transport that takes 20 ms
+    # per message like an SMS gateway round trip.
+    from notifications import NotificationDispatcher
+
+    class GatewayStub:
+        def send(self, message):
+            time.sleep(0.02)
+
+    run = int(time.time()) % 100000
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.bulk_add_students(make_students(max(1, args.rows // 10), f"N{run}-"), batch_size=args.batch_size)
+        with db._session() as (conn, cursor):
+            cursor.execute("SELECT student_id FROM students WHERE roll_number LIKE %s", (f"N{run}-%",))
+            student_ids = [r['student_id'] for r in cursor.fetchall()]
+            # Only this run's incidents should be pending.
+            cursor.execute("UPDATE conduct_incidents SET parent_notified = TRUE WHERE parent_notified = FALSE")
+            conn.commit()
+        incident_ids = db.record_incidents_bulk(make_incidents(args.rows, student_ids),
+                                                batch_size=args.batch_size)['incident_ids']
+    dispatcher = NotificationDispatcher(db, GatewayStub(), workers=args.concurrency, rate=None)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for row in dispatcher.pending(limit=args.rows):
+            dispatcher.transport.send(dispatcher.render(row))
+            db.mark_parent_notified(row['incident_id'])
+    sequential = time.perf_counter() - start
+
+    with db._session() as (conn, cursor):
+        cursor.executemany("UPDATE conduct_incidents SET parent_notified = FALSE WHERE incident_id = %s",
+                           [(incident_id,) for incident_id in incident_ids])
+        conn.commit()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = dispatcher.run()
+    dispatched = time.perf_counter() - start
+
+    print(f"{args.rows} notifications through a 20 ms gateway stub:")
+    print(f"  one at a time + UPDATE each:  {sequential:.2f}s ({args.rows / sequential:.0f} msgs/s)")
+    print(f"  NotificationDispatcher:       {dispatched:.2f}s ({result['sent'] / dispatched:.0f} msgs/s, "
+          f"{args.concurrency} workers)")
+
+
+def bench_memory(db, args):
+    # Memory held by large report results in each row shape, measured with tracemalloc: what the
+    # result keeps alive, and the peak while it is being built.
+    import tracemalloc
+
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT COUNT(*) as n FROM conduct_incidents")
+        existing = cursor.fetchone()['n']
+    if existing < args.rows:
+        run = int(time.time()) % 100000
+        print(f"Seeding {args.rows - existing} incidents over {args.students} students...")
+        with contextlib.redirect_stdout(io.StringIO()):
+            db.bulk_add_students(make_students(args.students, f"Y{run}-"), batch_size=args.batch_size)
+            with db._session() as (conn, cursor):
+                cursor.execute("SELECT student_id FROM students WHERE roll_number LIKE %s", (f"Y{run}-%",))
+                student_ids = [r['student_id'] for r in cursor.fetchall()]
+            first_day = date.today() - timedelta(days=365)
+            incidents = list(make_incidents(args.rows - existing, student_ids))
+            for i, incident in enumerate(incidents):
+                incident['incident_date'] = first_day + timedelta(days=i % 365)
+            db.record_incidents_bulk(incidents, batch_size=args.batch_size)
+
+    reports = [
+        ('list_all_students', lambda shape: db.list_all_students(shape=shape)),
+        ('get_incidents_between', lambda shape: db.get_incidents_between(date(1970, 1, 1), date(2100, 1, 1),
+                                                                          shape=shape)),
+    ]
+    for name, report in reports:
+        print(f"{name}:")
+        for shape in ('dict', 'record', 'columns'):
+            report(shape)
+            tracemalloc.start()
+            start = time.perf_counter()
+            result = report(shape)
+            elapsed = time.perf_counter() - start
+            retained, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            rows = len(result) if isinstance(result, list) else len(next(iter(result.values()), []))
+            del result
+            print(f"  {shape:8} {rows} rows: {retained / 1e6:7.1f} MB held ({retained / max(rows, 1):.0f} B/row), "
+                  f"peak {peak / 1e6:7.1f} MB, {elapsed:.2f}s")
+
+
+BENCHMARKS = {
+    'bulk_add': bench_bulk_add,
+    'bulk_incidents': bench_bulk_incidents,
+    'monthly_report': bench_monthly_report,
+    'async_throughput': bench_async_throughput,
+    'covering_indexes': bench_covering_indexes,
+    'suite': bench_suite,
+    'instrumentation': bench_instrumentation,
+    'analytics': bench_analytics,
+    'prepared': bench_prepared,
+    'startup': bench_startup,
+    'search': bench_search,
+    'changes': bench_changes,
+    'notify': bench_notify,
+    'memory': bench_memory,
+}
+# Benchmarks that talk to a MySQL server themselves, whatever backend the sync class uses.
+MYSQL_ONLY = {'async_throughput'}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for StudentConductDB (run against a scratch database)")
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--database', default='student_conduct_bench')
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--sqlite', metavar='PATH', help="run against an SQLite file instead of MySQL")
+    parser.add_argument('--students', type=int, help="students to seed for 'suite' (default: rows / 10)")
+    parser.add_argument('--repeat', type=int, default=20, help="timed runs per method for 'suite'")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="JSON results file for 'suite'")
+    args = parser.parse_args()
+    args.students = args.students or max(1, args.rows // 10)
+    if args.sqlite and args.benchmark in MYSQL_ONLY:
+        parser.error(f"{args.benchmark} compares against the aiomysql class and needs MySQL; drop --sqlite")
+
+    db = StudentConductDB(host=args.host, user=args.user, password=args.password, database=args.database,
+                          backend=SQLiteBackend(args.sqlite) if args.sqlite else None)
+    if db.connected:
+        db.migrate()
+        BENCHMARKS[args.benchmark](db, args)
+        db.close()
+    else:
+        print("Failed to connect to database.")
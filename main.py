@@ -1,90 +1,538 @@
-import mysql.connector
-from mysql.connector import Error
-from datetime import datetime
-from tabulate import tabulate
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
 import os
-import csv
+import re
+import sys
+import time
+import threading
+import io
+from collections import OrderedDict
+from functools import lru_cache
+from decimal import Decimal
 
+from backends import MySQLBackend, SQLiteBackend, errors
+from records import check_shape, compact_rows
+
+# csv, gzip, json, zipfile, concurrent.futures and tabulate are imported by the code that uses
+# them, so scripted commands (see cli below) only pay for what they run.
+
+
+def tabulate(*args, **kwargs):
+    from tabulate import tabulate as render
+    return render(*args, **kwargs)
+
+
+class ExportCancelled(Exception):
+    # Raised from an export's progress callback to stop it; the export removes its partial file.
+    pass
+
+
+class RecordCache:
+    # Thread-safe LRU cache with a TTL for per-student reads. Entries are dropped explicitly by
+    # the writes that change them; the TTL only bounds staleness from writers in other processes.
+    def __init__(self, max_size=256, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._incident_owner = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        # Returns (value, token); value is None on a miss and token must be passed to put().
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], self._generation
+            if entry:
+                self._drop(key)
+            self.misses += 1
+            return None, self._generation
+
+    def put(self, key, value, token, incident_ids=()):
+        with self._lock:
+            # Something was invalidated while the caller was querying; its result may be stale.
+            if token != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value, tuple(incident_ids))
+            self._entries.move_to_end(key)
+            for incident_id in incident_ids:
+                self._incident_owner[incident_id] = key[1]
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_student(self, student_id):
+        with self._lock:
+            self._generation += 1
+            for kind in ('record', 'stats', 'dossier'):
+                self._drop((kind, student_id))
+
+    def invalidate_incident(self, incident_id):
+        # Only a cached record or dossier can contain the incident, so its owner is known without a query.
+        with self._lock:
+            self._generation += 1
+            student_id = self._incident_owner.get(incident_id)
+            if student_id is not None:
+                self._drop(('record', student_id))
+                self._drop(('dossier', student_id))
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._incident_owner.clear()
+
+    def info(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'size': len(self._entries), 'max_size': self.max_size}
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry and entry[2]:
+            # A record and a dossier of the same student share owner entries; keep them while either is cached.
+            if any(other in self._entries for other in (('record', key[1]), ('dossier', key[1]))):
+                return
+            for incident_id in entry[2]:
+                self._incident_owner.pop(incident_id, None)
+
+
+
+@lru_cache(maxsize=1024)
+def fingerprint_sql(sql):
+    # Normalises a statement so calls that differ only in literals or list lengths group together.
+    sql = re.sub(r"\s+", " ", sql.strip())
+    sql = re.sub(r"'(?:[^'\\]|\\.|'')*'", "?", sql)
+    sql = re.sub(r"%s|\b\d+(?:\.\d+)?\b", "?", sql)
+    sql = re.sub(r"\(\?(?:, ?\?)*\)(?:, ?\(\?(?:, ?\?)*\))*", "(...)", sql)
+    return sql
+
+
+class QueryInstrumentation:
+    # Collects one event per statement run through StudentConductDB: the public method that ran it,
+    # its SQL fingerprint, latency (execute plus fetches), rows and any error. Events update in-process
+    # counters, go to the slow-query log when at or above slow_query_threshold seconds, and are passed
+    # to every hook added with add_hook(). Only fingerprints are logged, never parameters.
+    def __init__(self, slow_query_threshold=None, slow_query_log=None):
+        self.slow_query_threshold = slow_query_threshold
+        self.slow_query_log = slow_query_log
+        self._hooks = []
+        self._counters = {}
+        self._slow_queries = 0
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook):
+        self._hooks.append(hook)
+
+    def trace(self, cursor, method):
+        return TracedCursor(cursor, method, self)
+
+    def record(self, event):
+        slow = self.slow_query_threshold is not None and event['seconds'] >= self.slow_query_threshold
+        with self._lock:
+            counter = self._counters.setdefault((event['method'], event['fingerprint']),
+                                                {'calls': 0, 'errors': 0, 'rows': 0, 'seconds': 0.0,
+                                                 'max_seconds': 0.0})
+            counter['calls'] += 1
+            counter['errors'] += event['error'] is not None
+            counter['rows'] += event['rows']
+            counter['seconds'] += event['seconds']
+            counter['max_seconds'] = max(counter['max_seconds'], event['seconds'])
+            if slow:
+                self._slow_queries += 1
+                if self.slow_query_log:
+                    with open(self.slow_query_log, 'a', encoding='utf-8') as f:
+                        f.write(f"{datetime.now().isoformat(timespec='seconds')} {event['seconds'] * 1000:.1f}ms "
+                                f"rows={event['rows']} method={event['method']} | {event['fingerprint']}\n")
+        for hook in self._hooks:
+            hook(event)
+
+    def stats(self):
+        with self._lock:
+            return [dict(counter, method=method, fingerprint=fingerprint)
+                    for (method, fingerprint), counter in self._counters.items()]
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._slow_queries = 0
+
+    def prometheus(self):
+        # Prometheus text exposition format, one series per (method, fingerprint).
+        metrics = (('student_conduct_queries_total', 'calls', 'Statements executed.'),
+                   ('student_conduct_query_errors_total', 'errors', 'Statements that raised an error.'),
+                   ('student_conduct_query_rows_total', 'rows', 'Rows fetched or affected.'),
+                   ('student_conduct_query_seconds_total', 'seconds', 'Time spent executing and fetching.'))
+        stats = self.stats()
+        lines = []
+        for name, field, help_text in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for row in stats:
+                labels = f'method="{self._label(row["method"])}",query="{self._label(row["fingerprint"])}"'
+                lines.append(f"{name}{{{labels}}} {row[field]}")
+        lines.append("# HELP student_conduct_slow_queries_total Statements at or above the slow-query threshold.")
+        lines.append("# TYPE student_conduct_slow_queries_total counter")
+        lines.append(f"student_conduct_slow_queries_total {self._slow_queries}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _label(value):
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class TracedCursor:
+    # Wraps a cursor for one _session(). A statement's event is emitted when the next statement
+    # starts or the session ends, so rows fetched from unbuffered results are counted too.
+    def __init__(self, cursor, method, instrumentation):
+        self._cursor = cursor
+        self._method = method
+        self._instrumentation = instrumentation
+        self._pending = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        return self._run(self._cursor.execute, operation, params, *args, **kwargs)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        return self._run(self._cursor.executemany, operation, seq_params, *args, **kwargs)
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._fetch(self._cursor.fetchmany, *args, **kwargs)
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+    def finish(self):
+        if self._pending:
+            event, self._pending = self._pending, None
+            self._instrumentation.record(event)
+
+    def _run(self, call, operation, *args, **kwargs):
+        self.finish()
+        event = {'method': self._method, 'fingerprint': fingerprint_sql(operation), 'seconds': 0.0,
+                 'rows': 0, 'error': None}
+        start = time.perf_counter()
+        try:
+            result = call(operation, *args, **kwargs)
+        except errors.Error as e:
+            event['seconds'] = time.perf_counter() - start
+            event['error'] = str(e)
+            self._instrumentation.record(event)
+            raise
+        event['seconds'] = time.perf_counter() - start
+        if not self._cursor.with_rows:
+            event['rows'] = max(self._cursor.rowcount, 0)
+        self._pending = event
+        return result
+
+    def _fetch(self, call, *args, **kwargs):
+        start = time.perf_counter()
+        result = call(*args, **kwargs)
+        if self._pending:
+            self._pending['seconds'] += time.perf_counter() - start
+            if isinstance(result, list):
+                self._pending['rows'] += len(result)
+            elif result is not None:
+                self._pending['rows'] += 1
+        return result
 
 class StudentConductDB:
-    def __init__(self, host='localhost', user='root', password='', database='student_conduct_db'):
+    def __init__(self, host='localhost', user='root', password='', database='student_conduct_db',
+                 pool_size=None, pool_timeout=10, cache_size=0, cache_ttl=60, instrumentation=None,
+                 backend=None, prepared=False):
+        # backend defaults to MySQL on host/database; pass SQLiteBackend(path) to run embedded.
+        # With pool_size set, every method borrows its own connection and cursor from a
+        # connection pool, so one instance can be shared between threads.
+        # cache_size > 0 keeps that many student records/stats/dossiers in an in-process RecordCache.
+        # instrumentation (a QueryInstrumentation) times every statement; None costs nothing.
+        # prepared=True runs the hot per-student lookups and writes as server-side prepared
+        # statements, parsed once per connection instead of on every call.
+        self.conn = None
+        self.pool = None
+        self.pool_timeout = pool_timeout
+        self.cache = RecordCache(cache_size, cache_ttl) if cache_size else None
+        self.instrumentation = instrumentation
+        # Built by the first search_students() call.
+        self.search_index = None
+        # auto_increment_increment, read by the first bulk incident insert.
+        self._id_step = None
+        self.backend = backend or MySQLBackend(host, user, password, database)
+        self.prepared = prepared
         try:
-            self.conn = mysql.connector.connect(
-                host=host,
-                user=user,
-                password=password,
-                database=database
-            )
-            self.cursor = self.conn.cursor(dictionary=True)
-            print("✓ Connected to MySQL database\n")
-        except Error as e:
+            if pool_size:
+                # Prepared statements must survive the connection going back to the pool, so the
+                # pool does not reset sessions; _session() rolls back instead.
+                self.pool = self.backend.create_pool(pool_size, f"student_conduct_{id(self)}",
+                                                     reset_session=not prepared)
+                print(f"✓ Connected to {self.backend.label} (pool of {pool_size})\n")
+            else:
+                self.conn = self.backend.connect()
+                self.cursor = self.backend.cursor(self.conn)
+                print(f"✓ Connected to {self.backend.label}\n")
+        except errors.Error as e:
             print(f"✗ Connection error: {e}")
             self.conn = None
+            self.pool = None
+
+    @property
+    def connected(self):
+        return self.conn is not None or self.pool is not None
+
+    @contextmanager
+    def _session(self, method='other', prepared=False, tuples=False):
+        # method labels the session's statements for instrumentation (the public method's name).
+        # prepared=True (honoured when the instance was created with prepared=True) hands out the
+        # connection's prepared-statement cursor instead of a plain one. tuples=True hands out a
+        # cursor returning plain tuples, for the compact row shapes (see _rows).
+        pooled = self.pool is not None
+        if not pooled:
+            conn, cursor = self.conn, self.cursor
+        else:
+            # get_connection() pings the connection it hands out and reconnects it if the
+            # server dropped it; it raises PoolError at once when all connections are busy.
+            deadline = time.monotonic() + self.pool_timeout
+            while True:
+                try:
+                    conn = self.pool.get_connection()
+                    break
+                except errors.PoolError:
+                    if time.monotonic() >= deadline:
+                        raise
+                    time.sleep(0.05)
+            cursor = self.backend.cursor(conn)
+        statements = self.backend.prepared_cursor(conn) if prepared and self.prepared else None
+        plain = self.backend.tuple_cursor(conn) if tuples else None
+        traced = None
+        if self.instrumentation is not None:
+            traced = self.instrumentation.trace(statements or plain or cursor, method)
+        failed = False
+        try:
+            yield conn, traced or statements or plain or cursor
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            if traced:
+                traced.finish()
+            if statements:
+                statements.close()
+            if plain:
+                if conn.unread_result:
+                    conn.consume_results()
+                plain.close()
+            # A streamed export that stopped early leaves rows on the connection.
+            if conn.unread_result:
+                conn.consume_results()
+            if failed:
+                # Undo whatever the method wrote before it failed. On the shared connection the
+                # next method's commit would otherwise publish it.
+                try:
+                    conn.rollback()
+                except errors.Error:
+                    pass
+            if pooled:
+                # Returning the connection resets its session, rolling back anything uncommitted;
+                # a pool that keeps sessions for prepared statements is rolled back explicitly.
+                if self.prepared and not failed:
+                    conn.rollback()
+                cursor.close()
+                conn.close()
 
     def create_tables(self):
+        # Kept for existing callers; the schema is now owned by the migrations below.
+        return self.migrate()
+
+    # Ordered schema migrations. Each entry is (version, description, method name); applied
+    # versions are recorded in schema_migrations. MySQL commits DDL implicitly, so every step
+    # must be safe to re-run if it was interrupted before its version was recorded. The DDL
+    # itself comes from the backend.
+    MIGRATIONS = (
+        (1, 'Create students, conduct_incidents and conduct_actions', '_migrate_base_tables'),
+        (2, 'Index conduct_incidents.incident_date for date-range reports', '_migrate_incident_date_index'),
+        (3, 'Add student_conduct_summary', '_migrate_conduct_summary'),
+        (4, 'Composite indexes for category and pending-incident queries', '_migrate_listing_indexes'),
+        (5, 'Archive tables for incidents and actions from closed years', '_migrate_archive_tables'),
+        (6, 'Change log for the change feed', '_migrate_change_log'),
+        (7, 'Index incidents awaiting parent notification', '_migrate_notification_index'),
+    )
+    SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+    def migrate(self):
+        # Most launches find the schema current; one SELECT then replaces the DDL and the lock.
+        if self.schema_version() == self.SCHEMA_VERSION:
+            print(f"✓ Database schema is up to date (version {self.SCHEMA_VERSION})\n")
+            return True
         try:
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS students (
-                    student_id INT AUTO_INCREMENT PRIMARY KEY,
-                    roll_number VARCHAR(20) UNIQUE NOT NULL,
-                    name VARCHAR(100) NOT NULL,
-                    email VARCHAR(100),
-                    phone VARCHAR(15),
-                    grade VARCHAR(10),
-                    class_section VARCHAR(10),
-                    parent_name VARCHAR(100),
-                    parent_phone VARCHAR(15),
-                    enrollment_date DATE,
-                    status ENUM('Active', 'Suspended', 'Expelled') DEFAULT 'Active',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                )
-            """)
-
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS conduct_incidents (
-                    incident_id INT AUTO_INCREMENT PRIMARY KEY,
-                    student_id INT NOT NULL,
-                    incident_type VARCHAR(100) NOT NULL,
-                    category ENUM('Attendance', 'Academic Dishonesty', 'Behavior', 'Bullying', 'Violence', 'Substance', 'Other') DEFAULT 'Other',
-                    description TEXT NOT NULL,
-                    severity_score INT CHECK (severity_score >= 1 AND severity_score <= 10),
-                    incident_date DATE NOT NULL,
-                    incident_time TIME,
-                    location VARCHAR(100),
-                    witnesses TEXT,
-                    reported_by VARCHAR(100),
-                    status ENUM('Pending', 'Resolved', 'Escalated') DEFAULT 'Pending',
-                    action_taken VARCHAR(500),
-                    follow_up_date DATE,
-                    parent_notified BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
-                    INDEX idx_student_date (student_id, incident_date),
-                    INDEX idx_severity (severity_score)
-                )
-            """)
-
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS conduct_actions (
-                    action_id INT AUTO_INCREMENT PRIMARY KEY,
-                    incident_id INT NOT NULL,
-                    action_type VARCHAR(100),
-                    action_duration INT,
-                    duration_unit ENUM('Minutes', 'Hours', 'Days') DEFAULT 'Days',
-                    notes TEXT,
-                    action_date DATE,
-                    assigned_by VARCHAR(100),
-                    completed BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (incident_id) REFERENCES conduct_incidents(incident_id) ON DELETE CASCADE
+            with self._session('migrate') as (conn, cursor):
+                self.backend.create_table(cursor, 'schema_migrations')
+                # Serialise concurrent startups so each step runs once.
+                if not self.backend.acquire_migration_lock(cursor):
+                    print("✗ Timed out waiting for another process to finish migrating\n")
+                    return False
+                try:
+                    cursor.execute("SELECT version FROM schema_migrations")
+                    applied = {row['version'] for row in cursor.fetchall()}
+                    pending = [m for m in self.MIGRATIONS if m[0] not in applied]
+                    for version, description, method in pending:
+                        print(f"  Applying migration {version}: {description}...")
+                        getattr(self, method)(cursor)
+                        cursor.execute(
+                            "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                            (version, description)
+                        )
+                        conn.commit()
+                finally:
+                    self.backend.release_migration_lock(cursor)
+                if pending:
+                    print(f"✓ Database schema migrated to version {self.SCHEMA_VERSION}\n")
+                else:
+                    print(f"✓ Database schema is up to date (version {self.SCHEMA_VERSION})\n")
+                return True
+        except errors.Error as e:
+            print(f"✗ Error migrating database: {e}\n")
+            return False
+
+    def schema_version(self):
+        try:
+            with self._session('schema_version') as (conn, cursor):
+                cursor.execute("SELECT MAX(version) as version FROM schema_migrations")
+                return cursor.fetchone()['version'] or 0
+        except errors.Error:
+            return 0
+
+    def _migrate_base_tables(self, cursor):
+        for table in ('students', 'conduct_incidents', 'conduct_actions'):
+            self.backend.create_table(cursor, table)
+
+    def _migrate_incident_date_index(self, cursor):
+        self._ensure_index(cursor, 'conduct_incidents', 'idx_incident_date', 'incident_date')
+
+    def _migrate_conduct_summary(self, cursor):
+        self.backend.create_table(cursor, 'student_conduct_summary')
+        self._rebuild_summaries(cursor)
+
+    def _migrate_listing_indexes(self, cursor):
+        self._ensure_index(cursor, 'conduct_incidents', 'idx_category_date', 'category, incident_date')
+        # In get_pending_incidents order within each status, so the listing reads it without sorting.
+        self._ensure_index(cursor, 'conduct_incidents', 'idx_status_severity_date',
+                           'status, severity_score DESC, incident_date, incident_id')
+
+    def _migrate_change_log(self, cursor):
+        self.backend.create_table(cursor, 'conduct_changes')
+
+    def _migrate_notification_index(self, cursor):
+        self._ensure_index(cursor, 'conduct_incidents', 'idx_parent_notified', 'parent_notified, incident_id')
+
+    def _migrate_archive_tables(self, cursor):
+        # Archived rows have no foreign keys, so they do not depend on the live tables they
+        # were moved out of.
+        self.backend.create_table(cursor, 'conduct_incidents_archive')
+        self.backend.create_table(cursor, 'conduct_actions_archive')
+
+    def _ensure_index(self, cursor, table, index_name, columns):
+        # Adds an index unless it already exists (databases created by older releases may or may
+        # not have it).
+        if not self.backend.has_index(cursor, table, index_name):
+            print(f"  Adding index {index_name} on {table} ({columns})...")
+            cursor.execute(self.backend.add_index_sql(table, index_name, columns))
+
+    # Change log behind get_changes(). Every method that writes students, conduct_incidents or
+    # conduct_actions adds (table, row_id, operation) entries in the same transaction, so the
+    # feed never shows a change that was rolled back.
+    CHANGE_SQL = "INSERT INTO conduct_changes (table_name, row_id, operation) VALUES (%s, %s, %s)"
+    # InnoDB hands out change_ids at insert time, so two writers logging at once could commit
+    # them out of order and a reader could pass an id that becomes visible later. Writers take
+    # this row lock before logging and keep it until they commit, which makes ids visible in
+    # commit order. Logging is the last statement before each commit, so the lock is only held
+    # across the commit itself and a writer never waits for anything else while holding it.
+    CHANGE_LOCK_SQL = "UPDATE conduct_change_lock SET version = version + 1 WHERE lock_id = 1"
+    CHANGE_TABLES = {'students': 'student_id', 'conduct_incidents': 'incident_id', 'conduct_actions': 'action_id'}
+    # Incidents and actions removed with a student by ON DELETE CASCADE are logged as well. Their
+    # ids are read before the delete and logged after it, with the other changes.
+    STUDENT_DELETE_ROWS = (
+        ('conduct_actions', """SELECT a.action_id as row_id FROM conduct_actions a
+                               JOIN conduct_incidents c ON a.incident_id = c.incident_id
+                               WHERE c.student_id = %s"""),
+        ('conduct_incidents', "SELECT incident_id as row_id FROM conduct_incidents WHERE student_id = %s"),
+    )
+
+    def _log_changes(self, cursor, table, operation, row_ids):
+        rows = [(table, row_id, operation) for row_id in row_ids]
+        if rows:
+            cursor.execute(self.CHANGE_LOCK_SQL)
+            cursor.executemany(self.CHANGE_SQL, rows)
+
+    def get_changes(self, since=0, limit=1000, tables=None, with_rows=True):
+        # Change feed: log entries after change_id `since`, oldest first, with the cursor to pass
+        # on the next call. With with_rows each entry also carries its row as it is now (None
+        # once deleted), read with one query per table, so a consumer's work is proportional to
+        # the changes rather than to the tables.
+        try:
+            where, params = '', (since,)
+            if tables:
+                where = f" AND table_name IN ({', '.join(['%s'] * len(tables))})"
+                params += tuple(tables)
+            with self._session('get_changes') as (conn, cursor):
+                cursor.execute(
+                    f"""SELECT change_id, table_name, row_id, operation, changed_at
+                        FROM conduct_changes
+                        WHERE change_id > %s{where}
+                        ORDER BY change_id
+                        LIMIT %s""",
+                    params + (limit,)
                 )
-            """)
+                changes = cursor.fetchall()
+                if with_rows:
+                    row_ids = {}
+                    for change in changes:
+                        row_ids.setdefault(change['table_name'], set()).add(change['row_id'])
+                    current = {}
+                    for table, ids in row_ids.items():
+                        key = self.CHANGE_TABLES[table]
+                        cursor.execute(f"SELECT * FROM {table} WHERE {key} IN ({', '.join(['%s'] * len(ids))})",
+                                       tuple(ids))
+                        current[table] = {row[key]: row for row in cursor.fetchall()}
+                    for change in changes:
+                        change['row'] = current[change['table_name']].get(change['row_id'])
+            return {'changes': changes, 'cursor': changes[-1]['change_id'] if changes else since}
+        except errors.Error as e:
+            print(f"✗ Error reading change feed: {e}\n")
+            return None
 
-            self.conn.commit()
-            print("✓ All tables created successfully\n")
-        except Error as e:
-            print(f"✗ Error creating tables: {e}\n")
+    def prune_changes(self, older_than_days=30):
+        # The log only has to reach back as far as the slowest consumer's cursor. The delete
+        # goes by primary key range so it does not lock rows that writers are appending.
+        try:
+            cutoff = datetime.now() - timedelta(days=older_than_days)
+            with self._session('prune_changes') as (conn, cursor):
+                cursor.execute("SELECT MAX(change_id) as last_id FROM conduct_changes WHERE changed_at < %s",
+                               (cutoff,))
+                last_id = cursor.fetchone()['last_id']
+                pruned = 0
+                if last_id is not None:
+                    cursor.execute("DELETE FROM conduct_changes WHERE change_id <= %s", (last_id,))
+                    pruned = cursor.rowcount
+                    conn.commit()
+            print(f"✓ {pruned} change log entries older than {older_than_days} days pruned\n")
+            return pruned
+        except errors.Error as e:
+            print(f"✗ Error pruning change log: {e}\n")
+            return None
 
     def add_student(self, roll_number, name, email, phone, grade, class_section, parent_name, parent_phone):
         try:
@@ -92,23 +540,131 @@ class StudentConductDB:
                 print("✗ Student name cannot be empty")
                 return None
             
-            self.cursor.execute(
-                """INSERT INTO students 
-                   (roll_number, name, email, phone, grade, class_section, parent_name, parent_phone, enrollment_date)
-                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-                (roll_number, name, email, phone, grade, class_section, parent_name, parent_phone, datetime.now().date())
-            )
-            self.conn.commit()
-            student_id = self.cursor.lastrowid
-            print(f"✓ Student '{name}' (Roll: {roll_number}) added successfully (ID: {student_id})\n")
-            return student_id
-        except mysql.connector.errors.IntegrityError:
+            with self._session('add_student', prepared=True) as (conn, cursor):
+                cursor.execute(
+                    """INSERT INTO students 
+                       (roll_number, name, email, phone, grade, class_section, parent_name, parent_phone, enrollment_date)
+                       VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+                    (roll_number, name, email, phone, grade, class_section, parent_name, parent_phone, datetime.now().date())
+                )
+                student_id = cursor.lastrowid
+                self._log_changes(cursor, 'students', 'insert', [student_id])
+                conn.commit()
+                print(f"✓ Student '{name}' (Roll: {roll_number}) added successfully (ID: {student_id})\n")
+                return student_id
+        except errors.IntegrityError:
             print(f"✗ Roll number '{roll_number}' already exists\n")
             return None
-        except Error as e:
+        except errors.Error as e:
             print(f"✗ Error adding student: {e}\n")
             return None
 
+    STUDENT_FIELDS = ('roll_number', 'name', 'email', 'phone', 'grade',
+                      'class_section', 'parent_name', 'parent_phone')
+
+    def bulk_add_students(self, students, batch_size=1000):
+        # students may hold dicts keyed by STUDENT_FIELDS or tuples in add_student order.
+        # Rows are sent through executemany (multi-row VALUES) with one commit per batch;
+        # bad rows are reported individually instead of aborting their batch.
+        result = {'inserted': 0, 'rejected': []}
+        batch = []
+        try:
+            with self._session('bulk_add_students') as (conn, cursor):
+                for row_number, student in enumerate(students, start=1):
+                    if not isinstance(student, dict):
+                        student = dict(zip(self.STUDENT_FIELDS, student))
+                    row = tuple((student.get(field) or None) for field in self.STUDENT_FIELDS)
+                    if not row[0]:
+                        result['rejected'].append((row_number, row[0], 'Missing roll number'))
+                        continue
+                    if not row[1] or len(str(row[1]).strip()) == 0:
+                        result['rejected'].append((row_number, row[0], 'Student name cannot be empty'))
+                        continue
+                    batch.append((row_number, row))
+                    if len(batch) >= batch_size:
+                        self._insert_student_batch(conn, cursor, batch, result)
+                        batch = []
+                if batch:
+                    self._insert_student_batch(conn, cursor, batch, result)
+        except errors.Error as e:
+            print(f"✗ Error adding students: {e}\n")
+            return None
+
+        print(f"✓ Bulk import finished: {result['inserted']} added, {len(result['rejected'])} rejected\n")
+        return result
+
+    def _insert_student_batch(self, conn, cursor, batch, result):
+        pending = batch
+        try:
+            roll_numbers = [row[0] for _, row in batch]
+            placeholders = ', '.join(['%s'] * len(roll_numbers))
+            cursor.execute(
+                f"SELECT roll_number FROM students WHERE roll_number IN ({placeholders})",
+                roll_numbers
+            )
+            taken = {r['roll_number'] for r in cursor.fetchall()}
+
+            enrollment_date = datetime.now().date()
+            values = []
+            for row_number, row in batch:
+                if row[0] in taken:
+                    result['rejected'].append((row_number, row[0], 'Roll number already exists'))
+                    continue
+                taken.add(row[0])
+                values.append((row_number, row + (enrollment_date,)))
+
+            pending = values
+            if not values:
+                return
+            sql = """INSERT INTO students
+                     (roll_number, name, email, phone, grade, class_section, parent_name, parent_phone, enrollment_date)
+                     VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)"""
+            try:
+                cursor.executemany(sql, [row for _, row in values])
+                # The new ids are read back by roll number rather than derived from lastrowid:
+                # with auto_increment_increment > 1 (group replication) they are not consecutive.
+                roll_numbers = [row[0] for _, row in values]
+                cursor.execute(
+                    f"SELECT student_id FROM students WHERE roll_number IN ({', '.join(['%s'] * len(roll_numbers))})",
+                    roll_numbers
+                )
+                self._log_changes(cursor, 'students', 'insert', [r['student_id'] for r in cursor.fetchall()])
+                conn.commit()
+                result['inserted'] += len(values)
+            except errors.IntegrityError:
+                # Lost a race with another writer: fall back to row-by-row inserts so
+                # only the offending rows are rejected, still committing once.
+                conn.rollback()
+                inserted = []
+                for row_number, row in values:
+                    try:
+                        cursor.execute(sql, row)
+                        inserted.append(cursor.lastrowid)
+                    except errors.IntegrityError:
+                        result['rejected'].append((row_number, row[0], 'Roll number already exists'))
+                self._log_changes(cursor, 'students', 'insert', inserted)
+                conn.commit()
+                result['inserted'] += len(inserted)
+        except errors.Error as e:
+            conn.rollback()
+            for row_number, row in pending:
+                result['rejected'].append((row_number, row[0], str(e)))
+
+    def import_students_file(self, filepath, batch_size=1000):
+        # Streams a .csv (header row with STUDENT_FIELDS) or .jsonl file into bulk_add_students.
+        import csv
+        import json
+        try:
+            with open(filepath, newline='', encoding='utf-8') as f:
+                if filepath.lower().endswith('.jsonl'):
+                    rows = (json.loads(line) for line in f if line.strip())
+                else:
+                    rows = csv.DictReader(f)
+                return self.bulk_add_students(rows, batch_size)
+        except (OSError, ValueError) as e:
+            print(f"✗ Error importing students: {e}\n")
+            return None
+
     def record_incident(self, student_id, incident_type, category, description, severity_score, 
                        location, witnesses, reported_by, action_taken=None):
         if not (1 <= severity_score <= 10):
@@ -116,446 +672,1296 @@ class StudentConductDB:
             return False
         
         try:
-            self.cursor.execute("SELECT student_id FROM students WHERE student_id = %s", (student_id,))
-            if not self.cursor.fetchone():
-                print(f"✗ Student ID {student_id} does not exist\n")
-                return False
+            with self._session('record_incident', prepared=True) as (conn, cursor):
+                cursor.execute("SELECT student_id FROM students WHERE student_id = %s", (student_id,))
+                if not cursor.fetchone():
+                    print(f"✗ Student ID {student_id} does not exist\n")
+                    return False
 
-            self.cursor.execute(
-                """INSERT INTO conduct_incidents 
-                   (student_id, incident_type, category, description, severity_score, 
-                    incident_date, incident_time, location, witnesses, reported_by, action_taken)
-                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-                (student_id, incident_type, category, description, severity_score, 
-                 datetime.now().date(), datetime.now().time(), location, witnesses, reported_by, action_taken)
-            )
-            self.conn.commit()
-            print(f"✓ Incident recorded for student ID {student_id} with severity {severity_score}/10\n")
-            return self.cursor.lastrowid
-        except Error as e:
+                incident_date = datetime.now().date()
+                cursor.execute(
+                    """INSERT INTO conduct_incidents 
+                       (student_id, incident_type, category, description, severity_score, 
+                        incident_date, incident_time, location, witnesses, reported_by, action_taken)
+                       VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+                    (student_id, incident_type, category, description, severity_score, 
+                     incident_date, datetime.now().time(), location, witnesses, reported_by, action_taken)
+                )
+                incident_id = cursor.lastrowid
+                self._add_to_summary(cursor, [(student_id, severity_score, incident_date)])
+                self._log_changes(cursor, 'conduct_incidents', 'insert', [incident_id])
+                conn.commit()
+                if self.cache:
+                    self.cache.invalidate_student(student_id)
+                print(f"✓ Incident recorded for student ID {student_id} with severity {severity_score}/10\n")
+                return incident_id
+        except errors.Error as e:
             print(f"✗ Error recording incident: {e}\n")
             return False
 
-    def add_action_to_incident(self, incident_id, action_type, duration, duration_unit, notes, assigned_by):
+    INCIDENT_FIELDS = ('student_id', 'incident_type', 'category', 'description', 'severity_score',
+                       'incident_date', 'incident_time', 'location', 'witnesses', 'reported_by',
+                       'action_taken')
+
+    def record_incidents_bulk(self, incidents, batch_size=500):
+        # incidents holds dicts keyed like record_incident's arguments; incident_date and
+        # incident_time default to now, so tablet-captured rows can keep their own timestamps.
+        # Returns incident_ids aligned with the input (None for rejected rows) and the
+        # rejected rows as (row_number, reason).
+        result = {'incident_ids': [], 'rejected': []}
+        batch = []
         try:
-            self.cursor.execute(
-                """INSERT INTO conduct_actions 
-                   (incident_id, action_type, action_duration, duration_unit, notes, action_date, assigned_by)
-                   VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                (incident_id, action_type, duration, duration_unit, notes, datetime.now().date(), assigned_by)
+            with self._session('record_incidents_bulk') as (conn, cursor):
+                for row_number, incident in enumerate(incidents, start=1):
+                    result['incident_ids'].append(None)
+                    now = datetime.now()
+                    row = tuple(incident.get(field) for field in self.INCIDENT_FIELDS)
+                    severity = row[4]
+                    if not isinstance(severity, int) or not (1 <= severity <= 10):
+                        result['rejected'].append((row_number, 'Severity score must be between 1 and 10'))
+                        continue
+                    # Dates become date objects here, so the summary deltas compare like with like.
+                    incident_date = self._as_date(row[5]) if row[5] else now.date()
+                    if incident_date is None:
+                        result['rejected'].append((row_number, f"Invalid incident date '{row[5]}'"))
+                        continue
+                    row = row[:5] + (incident_date, row[6] or now.time()) + row[7:]
+                    batch.append((row_number, row))
+                    if len(batch) >= batch_size:
+                        self._insert_incident_batch(conn, cursor, batch, result)
+                        batch = []
+                if batch:
+                    self._insert_incident_batch(conn, cursor, batch, result)
+        except errors.Error as e:
+            print(f"✗ Error recording incidents: {e}\n")
+            return None
+
+        recorded = len(result['incident_ids']) - len(result['rejected'])
+        print(f"✓ {recorded} incidents recorded, {len(result['rejected'])} rejected\n")
+        return result
+
+    @staticmethod
+    def _as_date(value):
+        # date, datetime or ISO 'YYYY-MM-DD' string -> date; None if it is none of those.
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        try:
+            return date.fromisoformat(value)
+        except (TypeError, ValueError):
+            return None
+
+    def _insert_incident_batch(self, conn, cursor, batch, result):
+        pending = batch
+        try:
+            student_ids = list({row[0] for _, row in batch})
+            placeholders = ', '.join(['%s'] * len(student_ids))
+            cursor.execute(
+                f"SELECT student_id FROM students WHERE student_id IN ({placeholders})",
+                student_ids
             )
-            self.conn.commit()
-            print(f"✓ Action '{action_type}' added to incident {incident_id}\n")
-            return True
-        except Error as e:
+            existing = {r['student_id'] for r in cursor.fetchall()}
+
+            values = []
+            for row_number, row in batch:
+                if row[0] not in existing:
+                    result['rejected'].append((row_number, f"Student ID {row[0]} does not exist"))
+                    continue
+                values.append((row_number, row))
+
+            pending = values
+            if not values:
+                return
+            sql = """INSERT INTO conduct_incidents
+                     (student_id, incident_type, category, description, severity_score,
+                      incident_date, incident_time, location, witnesses, reported_by, action_taken)
+                     VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"""
+            if not self._consecutive_ids(cursor):
+                self._insert_incident_rows(conn, cursor, sql, values, result)
+                return
+            try:
+                cursor.executemany(sql, [row for _, row in values])
+                # executemany sends a single multi-row INSERT; InnoDB hands such a statement a
+                # consecutive block of ids and lastrowid reports the first one.
+                first_id = cursor.lastrowid
+                self._add_to_summary(cursor, [(row[0], row[4], row[5]) for _, row in values])
+                self._log_changes(cursor, 'conduct_incidents', 'insert', range(first_id, first_id + len(values)))
+                conn.commit()
+                self._invalidate_students({row[0] for _, row in values})
+                for offset, (row_number, _) in enumerate(values):
+                    result['incident_ids'][row_number - 1] = first_id + offset
+            except errors.Error:
+                # One row failed the multi-row INSERT: a student deleted after the existence
+                # check, or (MySQL strict mode) a value that does not fit its column. Retry row by
+                # row so only the offending incidents are rejected.
+                conn.rollback()
+                self._insert_incident_rows(conn, cursor, sql, values, result)
+        except errors.Error as e:
+            conn.rollback()
+            for row_number, _ in pending:
+                result['incident_ids'][row_number - 1] = None
+                result['rejected'].append((row_number, str(e)))
+
+    def _insert_incident_rows(self, conn, cursor, sql, values, result):
+        # One INSERT per row, each id taken from its own lastrowid; still one commit. Integrity
+        # and data errors only undo their own statement; anything else fails the whole batch.
+        inserted = []
+        for row_number, row in values:
+            try:
+                cursor.execute(sql, row)
+                result['incident_ids'][row_number - 1] = cursor.lastrowid
+                inserted.append((row[0], row[4], row[5]))
+            except (errors.IntegrityError, errors.DataError) as e:
+                result['rejected'].append((row_number, self._incident_row_error(cursor, row, e)))
+        self._add_to_summary(cursor, inserted)
+        self._log_changes(cursor, 'conduct_incidents', 'insert',
+                          [result['incident_ids'][row_number - 1] for row_number, _ in values
+                           if result['incident_ids'][row_number - 1] is not None])
+        conn.commit()
+        self._invalidate_students({row[0] for row in inserted})
+
+    @staticmethod
+    def _incident_row_error(cursor, row, error):
+        # The foreign key failure is reported the way the up-front check reports it; every
+        # other error keeps the server's own message.
+        if isinstance(error, errors.IntegrityError):
+            cursor.execute("SELECT student_id FROM students WHERE student_id = %s", (row[0],))
+            if not cursor.fetchall():
+                return f"Student ID {row[0]} does not exist"
+        return str(error)
+
+    def _consecutive_ids(self, cursor):
+        # A multi-row INSERT only gets first_id, first_id + 1, ... when auto_increment_increment
+        # is 1; group replication and multi-primary setups raise it. Checked once per instance.
+        if self._id_step is None:
+            cursor.execute(self.backend.ID_STEP_SQL)
+            self._id_step = cursor.fetchone()['step']
+        return self._id_step == 1
+
+    def _add_to_summary(self, cursor, incidents):
+        # Folds (student_id, severity_score, incident_date) rows into student_conduct_summary
+        # inside the caller's transaction, one upsert row per student.
+        rows = self._summary_rows(incidents)
+        if rows:
+            cursor.executemany(self.backend.SUMMARY_UPSERT, rows)
+
+    @staticmethod
+    def _summary_rows(incidents):
+        per_student = {}
+        for student_id, severity, incident_date in incidents:
+            entry = per_student.get(student_id)
+            if entry is None:
+                per_student[student_id] = [1, severity, severity, severity, incident_date]
+            else:
+                entry[0] += 1
+                entry[1] += severity
+                entry[2] = max(entry[2], severity)
+                entry[3] = min(entry[3], severity)
+                entry[4] = max(entry[4], incident_date)
+        return [(student_id, *entry) for student_id, entry in per_student.items()]
+
+    def _rebuild_summaries(self, cursor, student_ids=None):
+        # Recomputes summary rows from conduct_incidents, for all students or just student_ids.
+        # Used after anything that removes incidents, since MIN/MAX cannot be undone incrementally.
+        where = ''
+        params = ()
+        if student_ids is not None:
+            if not student_ids:
+                return 0
+            where = f"WHERE student_id IN ({', '.join(['%s'] * len(student_ids))})"
+            params = tuple(student_ids)
+        cursor.execute(f"DELETE FROM student_conduct_summary {where}", params)
+        cursor.execute(
+            f"""INSERT INTO student_conduct_summary
+                (student_id, incident_count, severity_sum, max_severity, min_severity, last_incident_date)
+                SELECT student_id, COUNT(*), SUM(severity_score), MAX(severity_score),
+                       MIN(severity_score), MAX(incident_date)
+                FROM conduct_incidents
+                {where}
+                GROUP BY student_id""",
+            params
+        )
+        return cursor.rowcount
+
+    def _invalidate_students(self, student_ids):
+        if self.cache:
+            for student_id in student_ids:
+                self.cache.invalidate_student(student_id)
+
+    def cache_info(self):
+        return self.cache.info() if self.cache else None
+
+    def rebuild_summaries(self):
+        try:
+            with self._session('rebuild_summaries') as (conn, cursor):
+                count = self._rebuild_summaries(cursor)
+                conn.commit()
+                if self.cache:
+                    self.cache.clear()
+                print(f"✓ Conduct summaries rebuilt for {count} students\n")
+                return count
+        except errors.Error as e:
+            print(f"✗ Error rebuilding summaries: {e}\n")
+            return None
+
+    def archive_incidents_before(self, cutoff, batch_size=1000):
+        # Moves incidents dated before cutoff (e.g. the first day of the current academic year),
+        # with their actions, into the archive tables. Each batch is its own short transaction
+        # selected through idx_incident_date, so the live table is never locked for long.
+        # Summaries of the affected students are recomputed from the remaining live incidents:
+        # per-student views cover the open year, and only date-range reports read the archive.
+        archived = 0
+        try:
+            with self._session('archive_incidents_before') as (conn, cursor):
+                while True:
+                    cursor.execute(
+                        """SELECT incident_id, student_id FROM conduct_incidents
+                           WHERE incident_date < %s
+                           ORDER BY incident_date, incident_id
+                           LIMIT %s""",
+                        (cutoff, batch_size)
+                    )
+                    rows = cursor.fetchall()
+                    if not rows:
+                        break
+                    incident_ids = [r['incident_id'] for r in rows]
+                    student_ids = {r['student_id'] for r in rows}
+                    placeholders = ', '.join(['%s'] * len(incident_ids))
+
+                    cursor.execute(f"SELECT action_id FROM conduct_actions WHERE incident_id IN ({placeholders})",
+                                   incident_ids)
+                    action_ids = [r['action_id'] for r in cursor.fetchall()]
+
+                    cursor.execute(f"INSERT INTO conduct_incidents_archive SELECT * FROM conduct_incidents "
+                                   f"WHERE incident_id IN ({placeholders})", incident_ids)
+                    cursor.execute(f"INSERT INTO conduct_actions_archive SELECT * FROM conduct_actions "
+                                   f"WHERE incident_id IN ({placeholders})", incident_ids)
+                    cursor.execute(f"DELETE FROM conduct_incidents WHERE incident_id IN ({placeholders})",
+                                   incident_ids)
+                    self._rebuild_summaries(cursor, list(student_ids))
+                    # Archived rows leave the live tables but are not gone, so the feed tells
+                    # them apart from deletes.
+                    self._log_changes(cursor, 'conduct_actions', 'archive', action_ids)
+                    self._log_changes(cursor, 'conduct_incidents', 'archive', incident_ids)
+                    conn.commit()
+                    self._invalidate_students(student_ids)
+                    archived += len(incident_ids)
+            print(f"✓ {archived} incidents dated before {cutoff} moved to the archive\n")
+            return archived
+        except errors.Error as e:
+            print(f"✗ Error archiving incidents: {e}\n")
+            return None
+
+    def add_action_to_incident(self, incident_id, action_type, duration, duration_unit, notes, assigned_by):
+        try:
+            with self._session('add_action_to_incident', prepared=True) as (conn, cursor):
+                cursor.execute(
+                    """INSERT INTO conduct_actions 
+                       (incident_id, action_type, action_duration, duration_unit, notes, action_date, assigned_by)
+                       VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                    (incident_id, action_type, duration, duration_unit, notes, datetime.now().date(), assigned_by)
+                )
+                self._log_changes(cursor, 'conduct_actions', 'insert', [cursor.lastrowid])
+                conn.commit()
+                if self.cache:
+                    self.cache.invalidate_incident(incident_id)
+                print(f"✓ Action '{action_type}' added to incident {incident_id}\n")
+                return True
+        except errors.Error as e:
             print(f"✗ Error adding action: {e}\n")
             return False
 
     def get_student_record(self, student_id):
+        if self.cache:
+            record, token = self.cache.get(('record', student_id))
+            if record:
+                return record
         try:
-            self.cursor.execute("SELECT * FROM students WHERE student_id = %s", (student_id,))
-            student = self.cursor.fetchone()
+            with self._session('get_student_record', prepared=True) as (conn, cursor):
+                cursor.execute("SELECT * FROM students WHERE student_id = %s", (student_id,))
+                student = cursor.fetchone()
             
-            if not student:
-                print(f"✗ Student ID {student_id} not found\n")
-                return None
+                if not student:
+                    print(f"✗ Student ID {student_id} not found\n")
+                    return None
             
-            self.cursor.execute(
-                """SELECT * FROM conduct_incidents 
-                   WHERE student_id = %s 
-                   ORDER BY incident_date DESC""",
-                (student_id,)
-            )
-            incidents = self.cursor.fetchall()
+                cursor.execute(
+                    """SELECT * FROM conduct_incidents 
+                       WHERE student_id = %s 
+                       ORDER BY incident_date DESC""",
+                    (student_id,)
+                )
+                incidents = cursor.fetchall()
             
-            return {'student': student, 'incidents': incidents}
-        except Error as e:
+                record = {'student': student, 'incidents': incidents}
+                if self.cache:
+                    self.cache.put(('record', student_id), record, token,
+                                   [i['incident_id'] for i in incidents])
+                return record
+        except errors.Error as e:
             print(f"✗ Error retrieving record: {e}\n")
             return None
 
     def get_student_stats(self, student_id):
+        if self.cache:
+            stats, token = self.cache.get(('stats', student_id))
+            if stats:
+                return stats
         try:
-            self.cursor.execute(
-                """SELECT COUNT(*) as total_incidents, 
-                          AVG(severity_score) as avg_score,
-                          MAX(severity_score) as worst_incident,
-                          MIN(severity_score) as least_severe
-                   FROM conduct_incidents 
-                   WHERE student_id = %s""",
-                (student_id,)
-            )
-            result = self.cursor.fetchone()
+            with self._session('get_student_stats', prepared=True) as (conn, cursor):
+                cursor.execute(
+                    """SELECT incident_count as total_incidents, severity_sum,
+                              max_severity as worst_incident,
+                              min_severity as least_severe
+                       FROM student_conduct_summary
+                       WHERE student_id = %s""",
+                    (student_id,)
+                )
+                result = cursor.fetchone()
             
-            if result['total_incidents'] == 0:
-                return {'total_incidents': 0, 'avg_score': 0, 'worst': 0, 'least': 0}
+                if not result or result['total_incidents'] == 0:
+                    return {'total_incidents': 0, 'avg_score': 0, 'worst_incident': 0, 'least_severe': 0,
+                            'category_breakdown': []}
             
-            self.cursor.execute(
-                """SELECT category, COUNT(*) as count
-                   FROM conduct_incidents
-                   WHERE student_id = %s
-                   GROUP BY category""",
-                (student_id,)
-            )
-            category_breakdown = self.cursor.fetchall()
+                cursor.execute(
+                    """SELECT category, COUNT(*) as count
+                       FROM conduct_incidents
+                       WHERE student_id = %s
+                       GROUP BY category""",
+                    (student_id,)
+                )
+                category_breakdown = cursor.fetchall()
             
-            return {
-                'total_incidents': result['total_incidents'],
-                'avg_score': round(result['avg_score'], 2),
-                'worst_incident': result['worst_incident'],
-                'least_severe': result['least_severe'],
-                'category_breakdown': category_breakdown
-            }
-        except Error as e:
+                stats = {
+                    'total_incidents': result['total_incidents'],
+                    'avg_score': round(Decimal(result['severity_sum']) / result['total_incidents'], 2),
+                    'worst_incident': result['worst_incident'],
+                    'least_severe': result['least_severe'],
+                    'category_breakdown': category_breakdown
+                }
+                if self.cache:
+                    self.cache.put(('stats', student_id), stats, token)
+                return stats
+        except errors.Error as e:
             print(f"✗ Error retrieving stats: {e}\n")
             return None
 
-    def list_all_students(self, status='Active'):
+    ACTION_FIELDS = ('action_id', 'action_type', 'action_duration', 'duration_unit', 'notes',
+                     'action_date', 'assigned_by', 'completed', 'created_at')
+    # Action columns are prefixed so they don't collide with the incident's own columns.
+    INCIDENT_ACTION_COLUMNS = "c.*, " + ", ".join(f"a.{field} as action__{field}" for field in ACTION_FIELDS)
+
+    DOSSIER_INCIDENTS_SQL = f"""SELECT {INCIDENT_ACTION_COLUMNS}
+                                FROM conduct_incidents c
+                                LEFT JOIN conduct_actions a ON c.incident_id = a.incident_id
+                                WHERE c.student_id = %s
+                                ORDER BY c.incident_date DESC, c.incident_id DESC, a.action_id ASC"""
+
+    def get_student_dossier(self, student_id):
+        # Student, incidents with their actions, and stats in two round trips. The stats are
+        # computed from the incident rows instead of another pass over the tables.
+        try:
+            dossier = self._load_dossier(student_id)
+            if not dossier:
+                print(f"✗ Student ID {student_id} not found\n")
+            return dossier
+        except errors.Error as e:
+            print(f"✗ Error retrieving dossier: {e}\n")
+            return None
+
+    def _load_dossier(self, student_id):
+        # get_student_dossier without the messages: None for an unknown student, errors raised.
+        if self.cache:
+            dossier, token = self.cache.get(('dossier', student_id))
+            if dossier:
+                return dossier
+        with self._session('get_student_dossier', prepared=True) as (conn, cursor):
+            cursor.execute("SELECT * FROM students WHERE student_id = %s", (student_id,))
+            student = cursor.fetchone()
+            if not student:
+                return None
+
+            cursor.execute(self.DOSSIER_INCIDENTS_SQL, (student_id,))
+            incidents = self._group_actions(cursor.fetchall())
+
+            dossier = {'student': student, 'incidents': incidents, 'stats': self._incident_stats(incidents)}
+            if self.cache:
+                self.cache.put(('dossier', student_id), dossier, token,
+                               [i['incident_id'] for i in incidents])
+            return dossier
+
+    @classmethod
+    def _group_actions(cls, rows):
+        # Folds incident x action join rows (ordered by incident) into incidents with an 'actions' list.
+        incidents = []
+        for row in rows:
+            action = {field: row.pop(f"action__{field}") for field in cls.ACTION_FIELDS}
+            if not incidents or incidents[-1]['incident_id'] != row['incident_id']:
+                row['actions'] = []
+                incidents.append(row)
+            if action['action_id'] is not None:
+                incidents[-1]['actions'].append(action)
+        return incidents
+
+    @staticmethod
+    def _incident_stats(incidents):
+        # Same shape as get_student_stats.
+        if not incidents:
+            return {'total_incidents': 0, 'avg_score': 0, 'worst_incident': 0, 'least_severe': 0,
+                    'category_breakdown': []}
+        scores = [i['severity_score'] for i in incidents]
+        categories = {}
+        for incident in incidents:
+            categories[incident['category']] = categories.get(incident['category'], 0) + 1
+        return {
+            'total_incidents': len(scores),
+            'avg_score': round(Decimal(sum(scores)) / len(scores), 2),
+            'worst_incident': max(scores),
+            'least_severe': min(scores),
+            'category_breakdown': [{'category': c, 'count': n} for c, n in categories.items()]
+        }
+
+    @staticmethod
+    def _page_clause(limit):
+        return (" LIMIT %s", (limit,)) if limit else ("", ())
+
+    def search_students(self, query, limit=10):
+        # Finds students by name, roll number or parent name, tolerating a typo per word and
+        # matching the last word as a prefix (see search.py). The index is loaded on first use
+        # and brought up to date incrementally on every call; rows come back best match first.
+        from search import StudentSearchIndex
+        if self.search_index is None:
+            self.search_index = StudentSearchIndex(self)
+        if self.search_index.refresh() is None:
+            return []
+        student_ids = self.search_index.search(query, limit)
+        if not student_ids:
+            return []
         try:
-            self.cursor.execute(
-                """SELECT s.student_id, s.roll_number, s.name, s.grade, s.class_section,
-                          s.status, COUNT(c.incident_id) as incident_count,
-                          ROUND(AVG(c.severity_score), 2) as avg_severity
+            placeholders = ', '.join(['%s'] * len(student_ids))
+            with self._session('search_students') as (conn, cursor):
+                cursor.execute(
+                    f"""SELECT s.student_id, s.roll_number, s.name, s.grade, s.class_section, s.parent_name,
+                               s.status, COALESCE(sm.incident_count, 0) as incident_count
+                        FROM students s
+                        LEFT JOIN student_conduct_summary sm ON s.student_id = sm.student_id
+                        WHERE s.student_id IN ({placeholders})""",
+                    student_ids
+                )
+                rows = {row['student_id']: row for row in cursor.fetchall()}
+            return [rows[student_id] for student_id in student_ids if student_id in rows]
+        except errors.Error as e:
+            print(f"✗ Error searching students: {e}\n")
+            return []
+
+    def _rows(self, cursor, shape):
+        # Result of a report query in the caller's shape: 'dict' (one dict per row, the default),
+        # 'record' (namedtuples) or 'columns' ({column: values}); see records.py. The compact
+        # shapes need the cursor from _session(tuples=True). Callers validate shape with
+        # check_shape() before querying.
+        if shape == 'dict':
+            return cursor.fetchall()
+        return compact_rows(cursor, shape)
+
+    # Report queries as (sql, params), shared with AsyncStudentConductDB.
+    @classmethod
+    def _students_query(cls, status, after_id, limit):
+        keyset = " AND s.student_id > %s" if after_id is not None else ""
+        params = (status,) + ((after_id,) if after_id is not None else ())
+        page, page_params = cls._page_clause(limit)
+        return (f"""SELECT s.student_id, s.roll_number, s.name, s.grade, s.class_section,
+                          s.status, COALESCE(sm.incident_count, 0) as incident_count,
+                          ROUND(sm.severity_sum / sm.incident_count, 2) as avg_severity
                    FROM students s
-                   LEFT JOIN conduct_incidents c ON s.student_id = c.student_id
-                   WHERE s.status = %s
-                   GROUP BY s.student_id
-                   ORDER BY s.student_id ASC""",
-                (status,)
-            )
-            students = self.cursor.fetchall()
-            return students
-        except Error as e:
+                   LEFT JOIN student_conduct_summary sm ON s.student_id = sm.student_id
+                   WHERE s.status = %s{keyset}
+                   ORDER BY s.student_id ASC{page}""", params + page_params)
+
+    HIGH_RISK_SQL = """SELECT s.student_id, s.roll_number, s.name, s.grade, s.class_section,
+                              sm.incident_count,
+                              ROUND(sm.severity_sum / sm.incident_count, 2) as avg_score
+                       FROM students s
+                       JOIN student_conduct_summary sm ON s.student_id = sm.student_id
+                       WHERE sm.incident_count > 0 AND sm.severity_sum >= %s * sm.incident_count
+                       ORDER BY s.student_id ASC"""
+
+    @classmethod
+    def _category_query(cls, category, after, limit):
+        # after is (incident_date, incident_id) of the last row on the previous page.
+        keyset = ""
+        params = (category,)
+        if after is not None:
+            keyset = " AND (c.incident_date < %s OR (c.incident_date = %s AND c.incident_id < %s))"
+            params += (after[0], after[0], after[1])
+        page, page_params = cls._page_clause(limit)
+        return (f"""SELECT c.incident_id, s.student_id, s.name, c.incident_type, c.severity_score, 
+                          c.incident_date, c.status
+                   FROM conduct_incidents c
+                   JOIN students s ON c.student_id = s.student_id
+                   WHERE c.category = %s{keyset}
+                   ORDER BY c.incident_date DESC, c.incident_id DESC{page}""", params + page_params)
+
+    PENDING_STATUSES = ('Pending', 'Escalated')
+
+    @classmethod
+    def _pending_query(cls, after, limit, arm_limits):
+        # after is (severity_score, incident_date, incident_id) of the last row on the previous page.
+        # One UNION ALL arm per status, each read in order from idx_status_severity_date; with
+        # status IN (...) the rows of both statuses would have to be sorted together. arm_limits
+        # is the backend's UNION_ARM_LIMITS.
+        keyset = ""
+        params = ()
+        if after is not None:
+            severity, incident_date, incident_id = after
+            keyset = """ AND (c.severity_score < %s
+                              OR (c.severity_score = %s AND c.incident_date > %s)
+                              OR (c.severity_score = %s AND c.incident_date = %s AND c.incident_id > %s))"""
+            params = (severity, severity, incident_date, severity, incident_date, incident_id)
+        page, page_params = cls._page_clause(limit)
+        arms = []
+        arm_params = ()
+        for status in cls.PENDING_STATUSES:
+            arm = f"""SELECT c.incident_id, s.student_id, s.name, c.incident_type, c.severity_score,
+                             c.incident_date, c.status
+                      FROM conduct_incidents c
+                      JOIN students s ON c.student_id = s.student_id
+                      WHERE c.status = %s{keyset}"""
+            arm_params += (status,) + params
+            if arm_limits and page:
+                arm = (f"SELECT * FROM ({arm} ORDER BY c.severity_score DESC, c.incident_date ASC, "
+                       f"c.incident_id ASC{page}) AS {status.lower()}")
+                arm_params += page_params
+            arms.append(arm)
+        return (" UNION ALL ".join(arms) +
+                f" ORDER BY severity_score DESC, incident_date ASC, incident_id ASC{page}",
+                arm_params + page_params)
+
+    def list_all_students(self, status='Active', after_id=None, limit=None, shape='dict'):
+        # Keyset pagination: pass the last student_id of the previous page as after_id, so
+        # every page is an index range scan no matter how deep it is.
+        check_shape(shape)
+        try:
+            with self._session('list_all_students', tuples=shape != 'dict') as (conn, cursor):
+                cursor.execute(*self._students_query(status, after_id, limit))
+                return self._rows(cursor, shape)
+        except errors.Error as e:
             print(f"✗ Error listing students: {e}\n")
             return []
 
-    def get_high_risk_students(self, threshold=7):
+    def get_high_risk_students(self, threshold=7, shape='dict'):
+        check_shape(shape)
         try:
-            self.cursor.execute(
-                """SELECT s.student_id, s.roll_number, s.name, s.grade, s.class_section,
-                          COUNT(c.incident_id) as incident_count,
-                          ROUND(AVG(c.severity_score), 2) as avg_score
-                   FROM students s
-                   JOIN conduct_incidents c ON s.student_id = c.student_id
-                   GROUP BY s.student_id
-                   HAVING AVG(c.severity_score) >= %s
-                   ORDER BY s.student_id ASC""",
-                (threshold,)
-            )
-            return self.cursor.fetchall()
-        except Error as e:
+            with self._session('get_high_risk_students', tuples=shape != 'dict') as (conn, cursor):
+                cursor.execute(self.HIGH_RISK_SQL, (threshold,))
+                return self._rows(cursor, shape)
+        except errors.Error as e:
             print(f"✗ Error retrieving high-risk students: {e}\n")
             return []
 
-    def get_incidents_by_category(self, category):
+    def get_incidents_by_category(self, category, after=None, limit=None, shape='dict'):
+        # after is (incident_date, incident_id) of the last row on the previous page.
+        check_shape(shape)
         try:
-            self.cursor.execute(
-                """SELECT c.incident_id, s.student_id, s.name, c.incident_type, c.severity_score, 
-                          c.incident_date, c.status
-                   FROM conduct_incidents c
-                   JOIN students s ON c.student_id = s.student_id
-                   WHERE c.category = %s
-                   ORDER BY c.incident_date DESC""",
-                (category,)
-            )
-            return self.cursor.fetchall()
-        except Error as e:
+            with self._session('get_incidents_by_category', tuples=shape != 'dict') as (conn, cursor):
+                cursor.execute(*self._category_query(category, after, limit))
+                return self._rows(cursor, shape)
+        except errors.Error as e:
             print(f"✗ Error retrieving incidents: {e}\n")
             return []
 
-    def get_pending_incidents(self):
+    def get_pending_incidents(self, after=None, limit=None, shape='dict'):
+        # after is (severity_score, incident_date, incident_id) of the last row on the previous page.
+        check_shape(shape)
         try:
-            self.cursor.execute(
-                """SELECT c.incident_id, s.student_id, s.name, c.incident_type, c.severity_score,
-                          c.incident_date, c.status
-                   FROM conduct_incidents c
-                   JOIN students s ON c.student_id = s.student_id
-                   WHERE c.status IN ('Pending', 'Escalated')
-                   ORDER BY c.severity_score DESC, c.incident_date ASC"""
-            )
-            return self.cursor.fetchall()
-        except Error as e:
+            with self._session('get_pending_incidents', tuples=shape != 'dict') as (conn, cursor):
+                cursor.execute(*self._pending_query(after, limit, self.backend.UNION_ARM_LIMITS))
+                return self._rows(cursor, shape)
+        except errors.Error as e:
             print(f"✗ Error retrieving pending incidents: {e}\n")
             return []
 
     def update_incident_status(self, incident_id, status, follow_up_date=None):
         try:
-            self.cursor.execute(
-                "UPDATE conduct_incidents SET status = %s, follow_up_date = %s WHERE incident_id = %s",
-                (status, follow_up_date, incident_id)
-            )
-            self.conn.commit()
-            print(f"✓ Incident {incident_id} status updated to '{status}'\n")
-            return True
-        except Error as e:
+            with self._session('update_incident_status', prepared=True) as (conn, cursor):
+                cursor.execute(
+                    "UPDATE conduct_incidents SET status = %s, follow_up_date = %s WHERE incident_id = %s",
+                    (status, follow_up_date, incident_id)
+                )
+                if cursor.rowcount:
+                    self._log_changes(cursor, 'conduct_incidents', 'update', [incident_id])
+                conn.commit()
+                if self.cache:
+                    self.cache.invalidate_incident(incident_id)
+                print(f"✓ Incident {incident_id} status updated to '{status}'\n")
+                return True
+        except errors.Error as e:
             print(f"✗ Error updating incident: {e}\n")
             return False
 
     def mark_parent_notified(self, incident_id):
         try:
-            self.cursor.execute(
-                "UPDATE conduct_incidents SET parent_notified = TRUE WHERE incident_id = %s",
-                (incident_id,)
-            )
-            self.conn.commit()
-            print(f"✓ Parents marked as notified for incident {incident_id}\n")
-            return True
-        except Error as e:
+            with self._session('mark_parent_notified', prepared=True) as (conn, cursor):
+                cursor.execute(
+                    "UPDATE conduct_incidents SET parent_notified = TRUE WHERE incident_id = %s",
+                    (incident_id,)
+                )
+                if cursor.rowcount:
+                    self._log_changes(cursor, 'conduct_incidents', 'update', [incident_id])
+                conn.commit()
+                if self.cache:
+                    self.cache.invalidate_incident(incident_id)
+                print(f"✓ Parents marked as notified for incident {incident_id}\n")
+                return True
+        except errors.Error as e:
             print(f"✗ Error updating notification status: {e}\n")
             return False
 
+    def mark_parents_notified(self, incident_ids):
+        # Batched form of mark_parent_notified for the notification dispatcher: one UPDATE and
+        # one commit for the whole list. Returns the number of incidents marked. Only incidents
+        # that were still unmarked are updated and logged; they are locked first so a concurrent
+        # run cannot mark them in between.
+        incident_ids = list(incident_ids)
+        if not incident_ids:
+            return 0
+        try:
+            placeholders = ', '.join(['%s'] * len(incident_ids))
+            with self._session('mark_parents_notified') as (conn, cursor):
+                self.backend.select_for_update(
+                    conn, cursor,
+                    f"""SELECT incident_id FROM conduct_incidents
+                        WHERE incident_id IN ({placeholders}) AND parent_notified = FALSE""",
+                    incident_ids
+                )
+                marked_ids = [row['incident_id'] for row in cursor.fetchall()]
+                if marked_ids:
+                    placeholders = ', '.join(['%s'] * len(marked_ids))
+                    cursor.execute(
+                        f"UPDATE conduct_incidents SET parent_notified = TRUE WHERE incident_id IN ({placeholders})",
+                        marked_ids
+                    )
+                    self._log_changes(cursor, 'conduct_incidents', 'update', marked_ids)
+                conn.commit()
+            marked = len(marked_ids)
+            if self.cache:
+                for incident_id in marked_ids:
+                    self.cache.invalidate_incident(incident_id)
+            print(f"✓ Parents marked as notified for {marked} incidents\n")
+            return marked
+        except errors.Error as e:
+            print(f"✗ Error updating notification status: {e}\n")
+            return None
+
     def update_student_status(self, student_id, status):
         try:
-            self.cursor.execute(
-                "UPDATE students SET status = %s WHERE student_id = %s",
-                (status, student_id)
-            )
-            self.conn.commit()
-            print(f"✓ Student status updated to '{status}'\n")
-            return True
-        except Error as e:
+            with self._session('update_student_status') as (conn, cursor):
+                cursor.execute(
+                    "UPDATE students SET status = %s WHERE student_id = %s",
+                    (status, student_id)
+                )
+                if cursor.rowcount:
+                    self._log_changes(cursor, 'students', 'update', [student_id])
+                conn.commit()
+                if self.cache:
+                    self.cache.invalidate_student(student_id)
+                print(f"✓ Student status updated to '{status}'\n")
+                return True
+        except errors.Error as e:
             print(f"✗ Error updating student status: {e}\n")
             return False
 
     def delete_student(self, student_id):
         try:
-            self.cursor.execute("SELECT name FROM students WHERE student_id = %s", (student_id,))
-            result = self.cursor.fetchone()
+            with self._session('delete_student') as (conn, cursor):
+                cursor.execute("SELECT name FROM students WHERE student_id = %s", (student_id,))
+                result = cursor.fetchone()
             
-            if not result:
-                print(f"✗ Student ID {student_id} not found\n")
-                return False
+                if not result:
+                    print(f"✗ Student ID {student_id} not found\n")
+                    return False
             
-            self.cursor.execute("DELETE FROM students WHERE student_id = %s", (student_id,))
-            self.conn.commit()
-            print(f"✓ Student '{result['name']}' and all records deleted\n")
-            return True
-        except Error as e:
+                # Live incidents, actions and the summary row go with it via ON DELETE CASCADE;
+                # archived history has no foreign keys and is removed explicitly.
+                cursor.execute(
+                    """DELETE FROM conduct_actions_archive
+                       WHERE incident_id IN (SELECT incident_id FROM conduct_incidents_archive
+                                             WHERE student_id = %s)""",
+                    (student_id,)
+                )
+                cursor.execute("DELETE FROM conduct_incidents_archive WHERE student_id = %s", (student_id,))
+                removed = {}
+                for table, sql in self.STUDENT_DELETE_ROWS:
+                    cursor.execute(sql, (student_id,))
+                    removed[table] = [r['row_id'] for r in cursor.fetchall()]
+                cursor.execute("DELETE FROM students WHERE student_id = %s", (student_id,))
+                for table, row_ids in removed.items():
+                    self._log_changes(cursor, table, 'delete', row_ids)
+                self._log_changes(cursor, 'students', 'delete', [student_id])
+                conn.commit()
+                if self.cache:
+                    self.cache.invalidate_student(student_id)
+                if self.search_index:
+                    self.search_index.remove(student_id)
+                print(f"✓ Student '{result['name']}' and all records deleted\n")
+                return True
+        except errors.Error as e:
             print(f"✗ Error deleting student: {e}\n")
             return False
 
-    def get_monthly_report(self, month, year):
+    @staticmethod
+    def _month_range(month, year):
+        start = date(year, month, 1)
+        end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        return start, end
+
+    def _range_query(self, cursor, columns, start, end):
+        # Builds the date-range report query. When the range reaches back into archived years
+        # the archive table is read too, so reports work the same before and after archiving.
+        cursor.execute(self.ARCHIVED_UNTIL_SQL)
+        row = cursor.fetchone()
+        archived_until = row['archived_until'] if isinstance(row, dict) else row[0]
+        return self._range_sql(columns, start, end, archived_until)
+
+    ARCHIVED_UNTIL_SQL = "SELECT MAX(incident_date) as archived_until FROM conduct_incidents_archive"
+
+    @staticmethod
+    def _range_sql(columns, start, end, archived_until):
+        if isinstance(start, str):
+            start = date.fromisoformat(start)
+        elif isinstance(start, datetime):
+            start = start.date()
+        select = f"""SELECT {columns}
+                     FROM {{table}} c
+                     JOIN students s ON c.student_id = s.student_id
+                     WHERE c.incident_date >= %s AND c.incident_date < %s"""
+        if archived_until is None or archived_until < start:
+            return select.format(table='conduct_incidents') + " ORDER BY c.incident_date DESC", (start, end)
+        return (select.format(table='conduct_incidents') + " UNION ALL " +
+                select.format(table='conduct_incidents_archive') + " ORDER BY incident_date DESC",
+                (start, end, start, end))
+
+    MONTHLY_REPORT_COLUMNS = """c.incident_id, s.student_id, s.name, c.incident_type, c.category,
+                                c.severity_score, c.incident_date"""
+    RANGE_REPORT_COLUMNS = """c.incident_id, s.student_id, s.roll_number, s.name,
+                              c.incident_type, c.category, c.severity_score, c.incident_date,
+                              c.location, c.reported_by, c.status"""
+
+    def get_monthly_report(self, month, year, shape='dict'):
+        check_shape(shape)
         try:
-            self.cursor.execute(
-                """SELECT c.incident_id, s.student_id, s.name, c.incident_type, c.category, 
-                          c.severity_score, c.incident_date
-                   FROM conduct_incidents c
-                   JOIN students s ON c.student_id = s.student_id
-                   WHERE MONTH(c.incident_date) = %s AND YEAR(c.incident_date) = %s
-                   ORDER BY c.incident_date DESC""",
-                (month, year)
-            )
-            return self.cursor.fetchall()
-        except Error as e:
+            start, end = self._month_range(month, year)
+            with self._session('get_monthly_report', tuples=shape != 'dict') as (conn, cursor):
+                cursor.execute(*self._range_query(cursor, self.MONTHLY_REPORT_COLUMNS, start, end))
+                return self._rows(cursor, shape)
+        except (errors.Error, ValueError) as e:
             print(f"✗ Error retrieving monthly report: {e}\n")
             return []
 
+    def get_incidents_between(self, start, end, shape='dict'):
+        # Half-open range [start, end) on the bare incident_date column, served by idx_incident_date.
+        check_shape(shape)
+        try:
+            with self._session('get_incidents_between', tuples=shape != 'dict') as (conn, cursor):
+                cursor.execute(*self._range_query(cursor, self.RANGE_REPORT_COLUMNS, start, end))
+                return self._rows(cursor, shape)
+        except errors.Error as e:
+            print(f"✗ Error retrieving incidents: {e}\n")
+            return []
+
     def get_severity_distribution(self):
         try:
-            self.cursor.execute(
-                """SELECT 
-                     SUM(CASE WHEN severity_score <= 3 THEN 1 ELSE 0 END) as minor,
-                     SUM(CASE WHEN severity_score BETWEEN 4 AND 6 THEN 1 ELSE 0 END) as moderate,
-                     SUM(CASE WHEN severity_score BETWEEN 7 AND 9 THEN 1 ELSE 0 END) as serious,
-                     SUM(CASE WHEN severity_score = 10 THEN 1 ELSE 0 END) as critical
-                   FROM conduct_incidents"""
-            )
-            return self.cursor.fetchone()
-        except Error as e:
+            with self._session('get_severity_distribution') as (conn, cursor):
+                cursor.execute(
+                    """SELECT 
+                         SUM(CASE WHEN severity_score <= 3 THEN 1 ELSE 0 END) as minor,
+                         SUM(CASE WHEN severity_score BETWEEN 4 AND 6 THEN 1 ELSE 0 END) as moderate,
+                         SUM(CASE WHEN severity_score BETWEEN 7 AND 9 THEN 1 ELSE 0 END) as serious,
+                         SUM(CASE WHEN severity_score = 10 THEN 1 ELSE 0 END) as critical
+                       FROM conduct_incidents"""
+                )
+                return cursor.fetchone()
+        except errors.Error as e:
             print(f"✗ Error retrieving distribution: {e}\n")
             return None
 
-    def export_student_card_csv(self, student_id):
+    def export_student_card_csv(self, student_id, progress=None):
+        # Returns the path written, or False. progress(done, total) is called before and after
+        # the card is written, and may raise ExportCancelled to stop the export.
         try:
-            record = self.get_student_record(student_id)
-            if not record:
-                print(f"✗ Student ID {student_id} not found\n")
-                return False
-            
-            student = record['student']
-            incidents = record['incidents']
-            stats = self.get_student_stats(student_id)
-            
-            filename = f"{student_id}_{student['roll_number']}.csv"
-            filepath = os.path.join('student_cards', filename)
-            
-            os.makedirs('student_cards', exist_ok=True)
-            
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                
-                writer.writerow(['STUDENT CONDUCT RECORD CARD'])
-                writer.writerow([])
-                
-                writer.writerow(['STUDENT DETAILS'])
-                writer.writerow(['Student ID', student['student_id']])
-                writer.writerow(['Roll Number', student['roll_number']])
-                writer.writerow(['Name', student['name']])
-                writer.writerow(['Email', student['email']])
-                writer.writerow(['Phone', student['phone']])
-                writer.writerow(['Grade', student['grade']])
-                writer.writerow(['Class Section', student['class_section']])
-                writer.writerow(['Parent Name', student['parent_name']])
-                writer.writerow(['Parent Phone', student['parent_phone']])
-                writer.writerow(['Status', student['status']])
-                writer.writerow(['Enrollment Date', student['enrollment_date']])
-                writer.writerow(['Export Date', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
-                writer.writerow([])
-                
-                writer.writerow(['CONDUCT STATISTICS'])
-                writer.writerow(['Total Incidents', stats['total_incidents']])
-                writer.writerow(['Average Severity Score', f"{stats['avg_score']}/10"])
-                writer.writerow(['Worst Incident Score', f"{stats['worst_incident']}/10"])
-                writer.writerow(['Least Severe Score', f"{stats['least_severe']}/10"])
-                writer.writerow([])
-                
-                if stats['category_breakdown']:
-                    writer.writerow(['INCIDENTS BY CATEGORY'])
-                    for item in stats['category_breakdown']:
-                        writer.writerow([item['category'], item['count']])
-                    writer.writerow([])
-                
-                writer.writerow(['DETAILED INCIDENT RECORDS'])
-                writer.writerow(['Incident ID', 'Date', 'Time', 'Type', 'Category', 'Description', 
-                                'Severity', 'Location', 'Reported By', 'Status', 'Action Taken', 
-                                'Parent Notified'])
-                
-                for incident in incidents:
-                    writer.writerow([
-                        incident['incident_id'],
-                        incident['incident_date'],
-                        incident['incident_time'] or 'N/A',
-                        incident['incident_type'],
-                        incident['category'],
-                        incident['description'][:100] if incident['description'] else 'N/A',
-                        incident['severity_score'],
-                        incident['location'] or 'N/A',
-                        incident['reported_by'] or 'N/A',
-                        incident['status'],
-                        incident['action_taken'] or 'N/A',
-                        'Yes' if incident['parent_notified'] else 'No'
-                    ])
-            
+            filepath = self._export_student_card(student_id, progress)
             print(f"✓ Student card exported successfully!")
             print(f"  File saved as: {filepath}\n")
-            return True
+            return filepath
             
-        except Error as e:
+        except ExportCancelled:
+            print(f"✗ Student card export for student {student_id} cancelled\n")
+            return False
+        except (errors.Error, LookupError) as e:
             print(f"✗ Error exporting student card: {e}\n")
             return False
 
-    def export_all_students_csv(self):
+    def _export_student_card(self, student_id, progress=None):
+        # The export itself, for export_student_card_csv and ExportJobs: returns the path and
+        # raises instead of printing.
+        if progress:
+            progress(0, 1)
+        dossier = self._load_dossier(student_id)
+        if not dossier:
+            raise LookupError(f"Student ID {student_id} not found")
+        
+        student = dossier['student']
+        filename = f"{student_id}_{student['roll_number']}.csv"
+        filepath = os.path.join('student_cards', filename)
+        
+        os.makedirs('student_cards', exist_ok=True)
+        
+        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+            self._write_student_card(f, student, dossier['incidents'], dossier['stats'])
+        if progress:
+            progress(1, 1)
+        return filepath
+
+    @staticmethod
+    def _write_student_card(f, student, incidents, stats):
+        import csv
+        writer = csv.writer(f)
+        
+        writer.writerow(['STUDENT CONDUCT RECORD CARD'])
+        writer.writerow([])
+        
+        writer.writerow(['STUDENT DETAILS'])
+        writer.writerow(['Student ID', student['student_id']])
+        writer.writerow(['Roll Number', student['roll_number']])
+        writer.writerow(['Name', student['name']])
+        writer.writerow(['Email', student['email']])
+        writer.writerow(['Phone', student['phone']])
+        writer.writerow(['Grade', student['grade']])
+        writer.writerow(['Class Section', student['class_section']])
+        writer.writerow(['Parent Name', student['parent_name']])
+        writer.writerow(['Parent Phone', student['parent_phone']])
+        writer.writerow(['Status', student['status']])
+        writer.writerow(['Enrollment Date', student['enrollment_date']])
+        writer.writerow(['Export Date', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
+        writer.writerow([])
+        
+        writer.writerow(['CONDUCT STATISTICS'])
+        writer.writerow(['Total Incidents', stats['total_incidents']])
+        writer.writerow(['Average Severity Score', f"{stats['avg_score']}/10"])
+        writer.writerow(['Worst Incident Score', f"{stats['worst_incident']}/10"])
+        writer.writerow(['Least Severe Score', f"{stats['least_severe']}/10"])
+        writer.writerow([])
+        
+        if stats['category_breakdown']:
+            writer.writerow(['INCIDENTS BY CATEGORY'])
+            for item in stats['category_breakdown']:
+                writer.writerow([item['category'], item['count']])
+            writer.writerow([])
+        
+        writer.writerow(['DETAILED INCIDENT RECORDS'])
+        writer.writerow(['Incident ID', 'Date', 'Time', 'Type', 'Category', 'Description', 
+                        'Severity', 'Location', 'Reported By', 'Status', 'Action Taken', 
+                        'Parent Notified'])
+        
+        for incident in incidents:
+            writer.writerow([
+                incident['incident_id'],
+                incident['incident_date'],
+                incident['incident_time'] or 'N/A',
+                incident['incident_type'],
+                incident['category'],
+                incident['description'][:100] if incident['description'] else 'N/A',
+                incident['severity_score'],
+                incident['location'] or 'N/A',
+                incident['reported_by'] or 'N/A',
+                incident['status'],
+                incident['action_taken'] or 'N/A',
+                'Yes' if incident['parent_notified'] else 'No'
+            ])
+        
+        actions = [(incident['incident_id'], action) for incident in incidents for action in incident['actions']]
+        if actions:
+            writer.writerow([])
+            writer.writerow(['ACTIONS TAKEN'])
+            writer.writerow(['Incident ID', 'Action ID', 'Date', 'Type', 'Duration', 'Assigned By',
+                            'Completed', 'Notes'])
+            for incident_id, action in actions:
+                writer.writerow([
+                    incident_id,
+                    action['action_id'],
+                    action['action_date'],
+                    action['action_type'],
+                    f"{action['action_duration']} {action['duration_unit']}" if action['action_duration'] else 'N/A',
+                    action['assigned_by'] or 'N/A',
+                    'Yes' if action['completed'] else 'No',
+                    action['notes'] or 'N/A'
+                ])
+
+    def export_all_student_cards(self, output_dir='student_cards', workers=4, as_zip=False, chunk_size=500):
+        # Loads students and their incidents and actions with two set-based queries per chunk of
+        # chunk_size students, then renders and writes the cards from a thread pool.
+        # as_zip=True packs every card into {output_dir}.zip instead of loose files.
+        import zipfile
+        from concurrent.futures import ThreadPoolExecutor
+        written = 0
         try:
-            self.cursor.execute(
-                """SELECT s.student_id, s.roll_number, s.name, s.grade, s.class_section, s.status,
-                          COUNT(c.incident_id) as incident_count,
-                          ROUND(AVG(c.severity_score), 2) as avg_severity
-                   FROM students s
-                   LEFT JOIN conduct_incidents c ON s.student_id = c.student_id
-                   GROUP BY s.student_id
-                   ORDER BY s.student_id ASC"""
+            if not as_zip:
+                os.makedirs(output_dir, exist_ok=True)
+            archive = zipfile.ZipFile(f"{output_dir}.zip", 'w', zipfile.ZIP_DEFLATED) if as_zip else None
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    after_id = 0
+                    while True:
+                        cards = self._load_student_cards(after_id, chunk_size)
+                        if not cards:
+                            break
+                        after_id = cards[-1][0]['student_id']
+                        if archive:
+                            # ZipFile is not thread-safe: workers render, this thread writes.
+                            rendered = executor.map(lambda card: self._render_student_card(*card), cards)
+                            for filename, content in rendered:
+                                archive.writestr(filename, content)
+                        else:
+                            list(executor.map(lambda card: self._save_student_card(output_dir, *card), cards))
+                        written += len(cards)
+            finally:
+                if archive:
+                    archive.close()
+            if archive:
+                print(f"✓ {written} student cards exported to {output_dir}.zip\n")
+            else:
+                print(f"✓ {written} student cards exported to {output_dir}/\n")
+            return written
+        except (errors.Error, OSError) as e:
+            print(f"✗ Error exporting student cards: {e}\n")
+            return None
+
+    def _load_student_cards(self, after_id, limit):
+        with self._session('export_all_student_cards') as (conn, cursor):
+            cursor.execute(
+                """SELECT * FROM students
+                   WHERE student_id > %s
+                   ORDER BY student_id ASC
+                   LIMIT %s""",
+                (after_id, limit)
             )
-            students = self.cursor.fetchall()
-            
-            filename = f"all_students_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            filepath = os.path.join('student_cards', filename)
-            
-            os.makedirs('student_cards', exist_ok=True)
-            
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                
-                writer.writerow(['STUDENT CONDUCT SUMMARY REPORT'])
-                writer.writerow(['Export Date', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
-                writer.writerow([])
-                
-                writer.writerow(['Student ID', 'Roll Number', 'Name', 'Grade', 'Section', 
-                                'Status', 'Total Incidents', 'Average Severity Score'])
-                
-                for student in students:
-                    writer.writerow([
-                        student['student_id'],
-                        student['roll_number'],
-                        student['name'],
-                        student['grade'],
-                        student['class_section'],
-                        student['status'],
-                        student['incident_count'] or 0,
-                        student['avg_severity'] or 'N/A'
-                    ])
-            
+            students = cursor.fetchall()
+            if not students:
+                return []
+            first_id, last_id = students[0]['student_id'], students[-1]['student_id']
+
+            cursor.execute(
+                f"""SELECT {self.INCIDENT_ACTION_COLUMNS}
+                    FROM conduct_incidents c
+                    LEFT JOIN conduct_actions a ON c.incident_id = a.incident_id
+                    WHERE c.student_id BETWEEN %s AND %s
+                    ORDER BY c.student_id, c.incident_date DESC, c.incident_id DESC, a.action_id ASC""",
+                (first_id, last_id)
+            )
+            incidents = {}
+            for incident in self._group_actions(cursor.fetchall()):
+                incidents.setdefault(incident['student_id'], []).append(incident)
+
+        cards = []
+        for student in students:
+            student_incidents = incidents.get(student['student_id'], [])
+            cards.append((student, student_incidents, self._incident_stats(student_incidents)))
+        return cards
+
+    def _render_student_card(self, student, incidents, stats):
+        buffer = io.StringIO(newline='')
+        self._write_student_card(buffer, student, incidents, stats)
+        return f"{student['student_id']}_{student['roll_number']}.csv", buffer.getvalue()
+
+    def _save_student_card(self, output_dir, student, incidents, stats):
+        filepath = os.path.join(output_dir, f"{student['student_id']}_{student['roll_number']}.csv")
+        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+            self._write_student_card(f, student, incidents, stats)
+
+    @staticmethod
+    def _iter_rows(cursor, chunk_size):
+        # Pulls an unbuffered result set from the server chunk by chunk.
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+
+    @staticmethod
+    def _open_export(filename, compress):
+        os.makedirs('student_cards', exist_ok=True)
+        filepath = os.path.join('student_cards', filename)
+        if compress:
+            import gzip
+            filepath += '.gz'
+            return filepath, gzip.open(filepath, 'wt', newline='', encoding='utf-8')
+        return filepath, open(filepath, 'w', newline='', encoding='utf-8')
+
+    @staticmethod
+    @contextmanager
+    def _export_file(filename, compress):
+        # Like _open_export, but a failed or cancelled export does not leave a partial file behind.
+        filepath, f = StudentConductDB._open_export(filename, compress)
+        try:
+            with f:
+                yield filepath, f
+        except BaseException:
+            os.remove(filepath)
+            raise
+
+    @staticmethod
+    def _with_progress(rows, total, progress, every):
+        # Passes rows through to a writer, reporting progress(done, total) every `every` rows.
+        done = 0
+        for row in rows:
+            yield row
+            done += 1
+            if done % every == 0:
+                progress(done, total)
+        progress(done, total)
+
+    def export_all_students_csv(self, stream=False, compress=False, chunk_size=1000, progress=None):
+        # stream=True writes rows while they are still arriving from the server, so memory
+        # stays flat however many students there are; compress=True writes a .csv.gz file.
+        # Returns the path written, or False. progress(done, total) is called every chunk_size
+        # rows and may raise ExportCancelled, which removes the partial file.
+        try:
+            filepath = self._export_all_students(stream, compress, chunk_size, progress)
             print(f"✓ All students exported successfully!")
             print(f"  File saved as: {filepath}\n")
-            return True
+            return filepath
             
-        except Error as e:
+        except ExportCancelled:
+            print("✗ All students export cancelled\n")
+            return False
+        except (errors.Error, OSError) as e:
             print(f"✗ Error exporting students: {e}\n")
             return False
 
-    def export_monthly_report_csv(self, month, year):
-        try:
-            self.cursor.execute(
-                """SELECT c.incident_id, s.student_id, s.roll_number, s.name, 
-                          c.incident_type, c.category, c.severity_score, c.incident_date,
-                          c.location, c.reported_by, c.status
-                   FROM conduct_incidents c
-                   JOIN students s ON c.student_id = s.student_id
-                   WHERE MONTH(c.incident_date) = %s AND YEAR(c.incident_date) = %s
-                   ORDER BY c.incident_date DESC""",
-                (month, year)
+    def _export_all_students(self, stream=False, compress=False, chunk_size=1000, progress=None):
+        filename = f"all_students_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        with self._session('export_all_students_csv') as (conn, cursor):
+            if progress:
+                cursor.execute("SELECT COUNT(*) as n FROM students")
+                total = cursor.fetchone()['n']
+                progress(0, total)
+            cursor.execute(
+                """SELECT s.student_id, s.roll_number, s.name, s.grade, s.class_section, s.status,
+                          COALESCE(sm.incident_count, 0) as incident_count,
+                          ROUND(sm.severity_sum / sm.incident_count, 2) as avg_severity
+                   FROM students s
+                   LEFT JOIN student_conduct_summary sm ON s.student_id = sm.student_id
+                   ORDER BY s.student_id ASC"""
             )
-            incidents = self.cursor.fetchall()
-            
-            filename = f"monthly_report_{month:02d}_{year}.csv"
-            filepath = os.path.join('student_cards', filename)
+            students = self._iter_rows(cursor, chunk_size) if stream else cursor.fetchall()
+            if progress:
+                students = self._with_progress(students, total, progress, chunk_size)
+            if stream:
+                return self._write_students_summary(filename, compress, students)
+        return self._write_students_summary(filename, compress, students)
+
+    @staticmethod
+    def _write_students_summary(filename, compress, students):
+        import csv
+        with StudentConductDB._export_file(filename, compress) as (filepath, f):
+            writer = csv.writer(f)
             
-            os.makedirs('student_cards', exist_ok=True)
+            writer.writerow(['STUDENT CONDUCT SUMMARY REPORT'])
+            writer.writerow(['Export Date', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
+            writer.writerow([])
             
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                
-                writer.writerow(['MONTHLY INCIDENT REPORT'])
-                writer.writerow([f'Month: {month}/{year}'])
-                writer.writerow(['Export Date', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
-                writer.writerow([])
-                
-                writer.writerow(['Incident ID', 'Student ID', 'Roll Number', 'Student Name', 
-                                'Incident Type', 'Category', 'Severity', 'Date', 'Location', 
-                                'Reported By', 'Status'])
-                
-                for incident in incidents:
-                    writer.writerow([
-                        incident['incident_id'],
-                        incident['student_id'],
-                        incident['roll_number'],
-                        incident['name'],
-                        incident['incident_type'],
-                        incident['category'],
-                        incident['severity_score'],
-                        incident['incident_date'],
-                        incident['location'] or 'N/A',
-                        incident['reported_by'] or 'N/A',
-                        incident['status']
-                    ])
+            writer.writerow(['Student ID', 'Roll Number', 'Name', 'Grade', 'Section', 
+                            'Status', 'Total Incidents', 'Average Severity Score'])
             
+            writer.writerows([
+                student['student_id'],
+                student['roll_number'],
+                student['name'],
+                student['grade'],
+                student['class_section'],
+                student['status'],
+                student['incident_count'] or 0,
+                student['avg_severity'] or 'N/A'
+            ] for student in students)
+        return filepath
+
+    def export_monthly_report_csv(self, month, year, stream=False, compress=False, chunk_size=1000,
+                                  progress=None):
+        # Returns the path written, or False; progress works as in export_all_students_csv.
+        try:
+            filepath = self._export_monthly_report(month, year, stream, compress, chunk_size, progress)
             print(f"✓ Monthly report exported successfully!")
             print(f"  File saved as: {filepath}\n")
-            return True
+            return filepath
             
-        except Error as e:
+        except ExportCancelled:
+            print(f"✗ Monthly report export for {month:02d}/{year} cancelled\n")
+            return False
+        except (errors.Error, ValueError, OSError) as e:
             print(f"✗ Error exporting monthly report: {e}\n")
             return False
 
+    def _export_monthly_report(self, month, year, stream=False, compress=False, chunk_size=1000, progress=None):
+        start, end = self._month_range(month, year)
+        filename = f"monthly_report_{month:02d}_{year}.csv"
+        with self._session('export_monthly_report_csv') as (conn, cursor):
+            sql, params = self._range_query(cursor, self.RANGE_REPORT_COLUMNS, start, end)
+            if progress:
+                cursor.execute(f"SELECT COUNT(*) as n FROM ({sql}) report", params)
+                total = cursor.fetchone()['n']
+                progress(0, total)
+            cursor.execute(sql, params)
+            incidents = self._iter_rows(cursor, chunk_size) if stream else cursor.fetchall()
+            if progress:
+                incidents = self._with_progress(incidents, total, progress, chunk_size)
+            if stream:
+                return self._write_monthly_report(filename, compress, month, year, incidents)
+        return self._write_monthly_report(filename, compress, month, year, incidents)
+
+    @staticmethod
+    def _write_monthly_report(filename, compress, month, year, incidents):
+        import csv
+        with StudentConductDB._export_file(filename, compress) as (filepath, f):
+            writer = csv.writer(f)
+            
+            writer.writerow(['MONTHLY INCIDENT REPORT'])
+            writer.writerow([f'Month: {month}/{year}'])
+            writer.writerow(['Export Date', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
+            writer.writerow([])
+            
+            writer.writerow(['Incident ID', 'Student ID', 'Roll Number', 'Student Name', 
+                            'Incident Type', 'Category', 'Severity', 'Date', 'Location', 
+                            'Reported By', 'Status'])
+            
+            writer.writerows([
+                incident['incident_id'],
+                incident['student_id'],
+                incident['roll_number'],
+                incident['name'],
+                incident['incident_type'],
+                incident['category'],
+                incident['severity_score'],
+                incident['incident_date'],
+                incident['location'] or 'N/A',
+                incident['reported_by'] or 'N/A',
+                incident['status']
+            ] for incident in incidents)
+        return filepath
+
     def close(self):
         if self.conn:
             self.cursor.close()
             self.conn.close()
+            self.conn = None
             print("\n✓ Database connection closed")
+        elif self.pool:
+            self.backend.close_pool(self.pool)
+            self.pool = None
+            print("\n✓ Database connection pool closed")
+
+
+class ExportJobs:
+    # Runs the CSV exports on background worker threads so the menu stays usable while large
+    # files are written. A dedicated connection can only serve one thread, so unless the
+    # application's instance is pooled the workers get a pooled instance of their own.
+    # Jobs report rows written and can be cancelled while queued or between chunks.
+    # Workers never print: the outcome is only reported through the job's status and error.
+    ACTIVE = ('Queued', 'Running')
+    # The menu-facing exports print their outcome, so the workers run the quiet versions.
+    EXPORTS = {
+        'export_student_card_csv': '_export_student_card',
+        'export_all_students_csv': '_export_all_students',
+        'export_monthly_report_csv': '_export_monthly_report',
+    }
+
+    def __init__(self, db, workers=1):
+        self.db = db
+        self.workers = workers
+        self.jobs = {}
+        self._futures = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._executor = None
+        self._worker_db = None
+
+    def submit(self, description, export, *args, **kwargs):
+        # export names one of the StudentConductDB export methods in EXPORTS.
+        if export not in self.EXPORTS:
+            raise ValueError(f"Unknown export: {export}")
+        with self._lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='export')
+                self._worker_db = self.db if self.db.pool else StudentConductDB(
+                    backend=self.db.backend, pool_size=self.workers, prepared=self.db.prepared)
+            job_id = self._next_id
+            self._next_id += 1
+            job = self.jobs[job_id] = {
+                'job_id': job_id, 'description': description, 'status': 'Queued',
+                'done': 0, 'total': None, 'file': None, 'error': None,
+                'submitted': datetime.now(), 'finished': None, 'cancel_requested': False,
+            }
+            self._futures[job_id] = self._executor.submit(self._run, job, export, args, kwargs)
+        return job_id
+
+    def _run(self, job, export, args, kwargs):
+        with self._lock:
+            job['status'] = 'Running'
+
+        def progress(done, total):
+            job['done'], job['total'] = done, total
+            if job['cancel_requested']:
+                raise ExportCancelled()
+
+        status, result, error = 'Done', None, None
+        try:
+            result = getattr(self._worker_db, self.EXPORTS[export])(*args, progress=progress, **kwargs)
+        except ExportCancelled:
+            status = 'Cancelled'
+        except Exception as e:
+            status, error = 'Failed', str(e)
+        with self._lock:
+            job['status'], job['file'], job['error'] = status, result, error
+            job['finished'] = datetime.now()
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job['status'] not in self.ACTIVE:
+                return False
+            job['cancel_requested'] = True
+            # A job that has not started is simply dropped; a running one stops at its next chunk.
+            if self._futures[job_id].cancel():
+                job['status'] = 'Cancelled'
+                job['finished'] = datetime.now()
+            return True
+
+    def list(self):
+        with self._lock:
+            return [dict(job) for job in self.jobs.values()]
+
+    def active(self):
+        with self._lock:
+            return [job_id for job_id, job in self.jobs.items() if job['status'] in self.ACTIVE]
+
+    def shutdown(self, cancel=False):
+        # Waits for running jobs; cancel=True asks them to stop first.
+        if cancel:
+            for job_id in self.active():
+                self.cancel(job_id)
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._worker_db is not None and self._worker_db is not self.db:
+            self._worker_db.close()
+        self._worker_db = None
 
 
 class ConductManagementSystem:
     def __init__(self, db):
         self.db = db
-        self.db.create_tables()
+        self.db.migrate()
+        self.exports = ExportJobs(db)
 
     def display_menu(self):
         print("\n" + "="*60)
@@ -577,13 +1983,20 @@ class ConductManagementSystem:
         print("13. Export Individual Student Card (CSV)")
         print("14. Export All Students Summary (CSV)")
         print("15. Export Monthly Report (CSV)")
-        print("16. Exit")
+        print("16. Export All Student Cards (CSV/ZIP)")
+        print("\n--- BULK OPERATIONS ---")
+        print("17. Import Students (CSV/JSONL)")
+        print("18. Rebuild Conduct Summaries")
+        print("19. Archive Closed Academic Years")
+        print("20. List My Exports")
+        print("21. Search Students")
+        print("22. Exit")
         print("="*60)
 
     def run(self):
         while True:
             self.display_menu()
-            choice = input("Enter your choice (1-16): ").strip()
+            choice = input("Enter your choice (1-22): ").strip()
 
             if choice == '1':
                 self.add_student_menu()
@@ -616,12 +2029,51 @@ class ConductManagementSystem:
             elif choice == '15':
                 self.export_monthly_report()
             elif choice == '16':
+                self.export_all_cards()
+            elif choice == '17':
+                self.import_students()
+            elif choice == '18':
+                self.db.rebuild_summaries()
+            elif choice == '19':
+                self.archive_incidents()
+            elif choice == '20':
+                self.list_exports()
+            elif choice == '21':
+                self.search_students()
+            elif choice == '22':
+                self.finish_exports()
                 print("\nThank you for using the system!")
                 self.db.close()
                 break
             else:
                 print("✗ Invalid choice. Please try again.")
 
+    PAGE_SIZE = 20
+
+    def page_through(self, fetch_page, cursor_of, headers):
+        # Shows one keyset page at a time. fetch_page(after, limit) returns rows after a cursor and
+        # cursor_of(row) builds that cursor from a page's last row; earlier cursors are kept so
+        # the operator can step back. Returns False when there was nothing to show.
+        cursors = [None]
+        while True:
+            # Ask for one extra row to know whether another page follows.
+            rows = fetch_page(cursors[-1], self.PAGE_SIZE + 1)
+            has_next = len(rows) > self.PAGE_SIZE
+            rows = rows[:self.PAGE_SIZE]
+            if not rows:
+                return len(cursors) > 1
+            print(tabulate(rows, headers=headers, tablefmt='grid'))
+            print(f"Page {len(cursors)}")
+
+            options = (["[n]ext"] if has_next else []) + (["[p]revious"] if len(cursors) > 1 else []) + ["[q]uit"]
+            choice = input(" / ".join(options) + ": ").strip().lower()
+            if choice == 'n' and has_next:
+                cursors.append(cursor_of(rows[-1]))
+            elif choice == 'p' and len(cursors) > 1:
+                cursors.pop()
+            elif choice == 'q' or not has_next:
+                return True
+
     def add_student_menu(self):
         print("\n" + "-"*40)
         print("ADD NEW STUDENT")
@@ -641,7 +2093,9 @@ class ConductManagementSystem:
         print("\n" + "-"*40)
         print("RECORD INCIDENT")
         print("-"*40)
-        student_id = int(input("Student ID: "))
+        student_id = self.ask_student_id("Student ID or name: ")
+        if student_id is None:
+            return
         incident_type = input("Incident Type: ").strip()
         print("\nCategory: Attendance | Academic Dishonesty | Behavior | Bullying | Violence | Substance | Other")
         category = input("Select Category: ").strip()
@@ -657,28 +2111,67 @@ class ConductManagementSystem:
 
     def view_student_record(self):
         print("\n" + "-"*40)
-        student_id = int(input("Enter Student ID: "))
-        record = self.db.get_student_record(student_id)
+        student_id = self.ask_student_id()
+        if student_id is None:
+            return
+        dossier = self.db.get_student_dossier(student_id)
         
-        if record:
-            s = record['student']
+        if dossier:
+            s = dossier['student']
+            stats = dossier['stats']
             print(f"\nStudent: {s['name']} (ID: {s['student_id']}, Roll: {s['roll_number']})")
             print(f"Grade: {s['grade']}-{s['class_section']} | Email: {s['email']}")
             print(f"Parent: {s['parent_name']} | Phone: {s['parent_phone']}")
-            print(f"Status: {s['status']}\n")
+            print(f"Status: {s['status']}")
+            print(f"Incidents: {stats['total_incidents']} | Avg Severity: {stats['avg_score']}/10 | "
+                  f"Worst: {stats['worst_incident']}/10\n")
             
-            if record['incidents']:
-                headers = ['ID', 'Type', 'Category', 'Severity', 'Date', 'Status']
+            if dossier['incidents']:
+                headers = ['ID', 'Type', 'Category', 'Severity', 'Date', 'Status', 'Actions']
                 data = [[i['incident_id'], i['incident_type'], i['category'], 
-                        i['severity_score'], i['incident_date'], i['status']] 
-                       for i in record['incidents']]
+                        i['severity_score'], i['incident_date'], i['status'],
+                        ', '.join(a['action_type'] or '' for a in i['actions']) or '-'] 
+                       for i in dossier['incidents']]
                 print(tabulate(data, headers=headers, tablefmt='grid'))
             else:
                 print("No incidents recorded.")
 
+    SEARCH_HEADERS = ['ID', 'Roll', 'Name', 'Grade', 'Section', 'Parent', 'Status', 'Incidents']
+
+    def ask_student_id(self, prompt="Enter Student ID or name: "):
+        # Takes a numeric ID as before; anything else is searched and, if several students
+        # match, the operator picks one by ID. Returns None when nothing was chosen.
+        answer = input(prompt).strip()
+        if answer.isdigit():
+            return int(answer)
+        students = self.db.search_students(answer)
+        if not students:
+            print(f"✗ No students match '{answer}'\n")
+            return None
+        if len(students) == 1:
+            s = students[0]
+            print(f"→ {s['name']} (ID: {s['student_id']}, Roll: {s['roll_number']})")
+            return s['student_id']
+        print(tabulate([list(s.values()) for s in students], headers=self.SEARCH_HEADERS, tablefmt='grid'))
+        choice = input("Student ID from the list (or press Enter to cancel): ").strip()
+        return int(choice) if choice else None
+
+    def search_students(self):
+        print("\n" + "-"*40)
+        print("SEARCH STUDENTS")
+        print("-"*40)
+        query = input("Name, roll number or parent name: ").strip()
+        students = self.db.search_students(query, limit=20)
+        if students:
+            print(tabulate([list(s.values()) for s in students], headers=self.SEARCH_HEADERS, tablefmt='grid'))
+        else:
+            print(f"No students match '{query}'.")
+
     def view_student_stats(self):
         print("\n" + "-"*40)
-        student_id = int(input("Enter Student ID: "))
+        student_id = self.ask_student_id()
+        if student_id is None:
+            return
         stats = self.db.get_student_stats(student_id)
         
         if stats:
@@ -695,12 +2188,13 @@ class ConductManagementSystem:
     def list_students(self):
         print("\n" + "-"*40)
         status = input("Filter by Status (Active/Suspended/Expelled) [Leave empty for Active]: ").strip() or 'Active'
-        students = self.db.list_all_students(status)
-        
-        if students:
-            headers = ['ID', 'Roll', 'Name', 'Grade', 'Section', 'Status', 'Incidents', 'Avg Severity']
-            print(tabulate(students, headers=headers, tablefmt='grid'))
-        else:
+        headers = ['ID', 'Roll', 'Name', 'Grade', 'Section', 'Status', 'Incidents', 'Avg Severity']
+        shown = self.page_through(
+            lambda after, limit: self.db.list_all_students(status, after_id=after, limit=limit),
+            lambda row: row['student_id'],
+            headers
+        )
+        if not shown:
             print("No students found.")
 
     def high_risk_report(self):
@@ -717,13 +2211,14 @@ class ConductManagementSystem:
 
     def pending_incidents(self):
         print("\n" + "-"*40)
-        pending = self.db.get_pending_incidents()
-        
-        if pending:
-            headers = ['ID', 'Student ID', 'Student', 'Type', 'Severity', 'Date', 'Status']
-            print("\nPending & Escalated Incidents:")
-            print(tabulate(pending, headers=headers, tablefmt='grid'))
-        else:
+        headers = ['ID', 'Student ID', 'Student', 'Type', 'Severity', 'Date', 'Status']
+        print("\nPending & Escalated Incidents:")
+        shown = self.page_through(
+            self.db.get_pending_incidents,
+            lambda row: (row['severity_score'], row['incident_date'], row['incident_id']),
+            headers
+        )
+        if not shown:
             print("No pending incidents.")
 
     def monthly_report(self):
@@ -759,14 +2254,18 @@ class ConductManagementSystem:
 
     def manage_student_status(self):
         print("\n" + "-"*40)
-        student_id = int(input("Enter Student ID: "))
+        student_id = self.ask_student_id()
+        if student_id is None:
+            return
         print("Status: Active | Suspended | Expelled")
         status = input("New Status: ").strip()
         self.db.update_student_status(student_id, status)
 
     def delete_student(self):
         print("\n" + "-"*40)
-        student_id = int(input("Enter Student ID: "))
+        student_id = self.ask_student_id()
+        if student_id is None:
+            return
         confirm = input("Are you sure? (yes/no): ").strip().lower()
         if confirm == 'yes':
             self.db.delete_student(student_id)
@@ -775,8 +2274,10 @@ class ConductManagementSystem:
         print("\n" + "-"*40)
         print("EXPORT STUDENT CARD")
         print("-"*40)
-        student_id = int(input("Enter Student ID: "))
-        self.db.export_student_card_csv(student_id)
+        student_id = self.ask_student_id()
+        if student_id is None:
+            return
+        self.queue_export(f"Student card {student_id}", 'export_student_card_csv', student_id)
 
     def export_all_students(self):
         print("\n" + "-"*40)
@@ -784,7 +2285,8 @@ class ConductManagementSystem:
         print("-"*40)
         confirm = input("Export all students to CSV? (yes/no): ").strip().lower()
         if confirm == 'yes':
-            self.db.export_all_students_csv()
+            compress = input("Compress with gzip? (yes/no) [Default: no]: ").strip().lower() == 'yes'
+            self.queue_export("All students summary", 'export_all_students_csv', stream=True, compress=compress)
 
     def export_monthly_report(self):
         print("\n" + "-"*40)
@@ -792,18 +2294,162 @@ class ConductManagementSystem:
         print("-"*40)
         month = int(input("Enter Month (1-12): "))
         year = int(input("Enter Year: "))
-        self.db.export_monthly_report_csv(month, year)
+        compress = input("Compress with gzip? (yes/no) [Default: no]: ").strip().lower() == 'yes'
+        self.queue_export(f"Monthly report {month:02d}/{year}", 'export_monthly_report_csv', month, year,
+                          stream=True, compress=compress)
+
+    def queue_export(self, description, export, *args, **kwargs):
+        job_id = self.exports.submit(description, export, *args, **kwargs)
+        print(f"✓ Export job #{job_id} queued; it runs in the background (see 'List My Exports')\n")
+
+    def list_exports(self):
+        print("\n" + "-"*40)
+        print("MY EXPORTS")
+        print("-"*40)
+        jobs = self.exports.list()
+        if not jobs:
+            print("No exports this session.\n")
+            return
+        table_data = []
+        for job in jobs:
+            if job['total']:
+                progress = f"{job['done']}/{job['total']} ({job['done'] * 100 // job['total']}%)"
+            else:
+                progress = job['done'] or '-'
+            table_data.append([job['job_id'], job['description'], job['status'], progress,
+                               job['file'] or job['error'] or '-', job['submitted'].strftime('%H:%M:%S')])
+        print(tabulate(table_data, headers=['Job', 'Export', 'Status', 'Progress', 'File', 'Queued'],
+                       tablefmt='grid'))
+        if self.exports.active():
+            job_id = input("\nEnter a job ID to cancel (or press Enter to go back): ").strip()
+            if job_id:
+                if self.exports.cancel(int(job_id)):
+                    print(f"✓ Cancellation requested for export job #{job_id}\n")
+                else:
+                    print(f"✗ Export job #{job_id} is not queued or running\n")
+
+    def finish_exports(self):
+        active = self.exports.active()
+        cancel = False
+        if active:
+            cancel = input(f"{len(active)} export job(s) still running. Cancel them? (yes/no): ").strip().lower() == 'yes'
+            if not cancel:
+                print("Waiting for exports to finish...")
+        self.exports.shutdown(cancel=cancel)
+
+    def export_all_cards(self):
+        print("\n" + "-"*40)
+        print("EXPORT ALL STUDENT CARDS")
+        print("-"*40)
+        output_dir = input("Output folder [Default: student_cards]: ").strip() or 'student_cards'
+        workers = int(input("Worker threads [Default: 4]: ") or 4)
+        as_zip = input("Pack into a single zip? (yes/no) [Default: no]: ").strip().lower() == 'yes'
+        self.db.export_all_student_cards(output_dir, workers=workers, as_zip=as_zip)
+
+    def archive_incidents(self):
+        print("\n" + "-"*40)
+        print("ARCHIVE CLOSED ACADEMIC YEARS")
+        print("-"*40)
+        cutoff = input("Archive incidents dated before (YYYY-MM-DD, start of the open academic year): ").strip()
+        confirm = input(f"Move all incidents before {cutoff} to the archive? (yes/no): ").strip().lower()
+        if confirm == 'yes':
+            self.db.archive_incidents_before(cutoff)
+
+    def import_students(self):
+        print("\n" + "-"*40)
+        print("IMPORT STUDENTS")
+        print("-"*40)
+        filepath = input("File path (.csv or .jsonl): ").strip()
+        batch_size = int(input("Batch size [Default: 1000]: ") or 1000)
+        result = self.db.import_students_file(filepath, batch_size)
+
+        if result and result['rejected']:
+            headers = ['Row', 'Roll', 'Reason']
+            print(tabulate(result['rejected'], headers=headers, tablefmt='grid'))
+
+
+def cli(argv):
+    # Non-interactive commands for scripts and cron, e.g. `python main.py export-monthly 9 2026`.
+    # Returns the process exit status.
+    import argparse
+    parser = argparse.ArgumentParser(description="Student Conduct Management System commands "
+                                                 "(run without arguments for the interactive menu)")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default='your_password')
+    parser.add_argument('--database', default='student_conduct_db')
+    parser.add_argument('--sqlite', metavar='PATH', help="use an SQLite file instead of MySQL")
+    commands = parser.add_subparsers(dest='command', required=True)
+    card = commands.add_parser('export-card', help="export one student's conduct card")
+    card.add_argument('student_id', type=int)
+    students = commands.add_parser('export-students', help="export the all-students summary")
+    students.add_argument('--compress', action='store_true', help="write .csv.gz")
+    monthly = commands.add_parser('export-monthly', help="export the incident report for a month")
+    monthly.add_argument('month', type=int)
+    monthly.add_argument('year', type=int)
+    monthly.add_argument('--compress', action='store_true', help="write .csv.gz")
+    commands.add_parser('migrate', help="apply pending schema migrations")
+    commands.add_parser('rebuild-summaries', help="recompute student_conduct_summary")
+    notify = commands.add_parser('notify-parents', help="send pending parent notifications")
+    notify.add_argument('--outbox', default='notifications_outbox.jsonl',
+                        help="JSON-lines file to write messages to when no SMS gateway is given")
+    notify.add_argument('--sms-gateway', metavar='DOMAIN', help="email-to-SMS gateway domain; sends over SMTP")
+    notify.add_argument('--smtp-host', default='localhost')
+    notify.add_argument('--smtp-port', type=int, default=25)
+    notify.add_argument('--sender', default='conduct-office@localhost')
+    notify.add_argument('--workers', type=int, default=4)
+    notify.add_argument('--rate', type=float, default=10, help="messages per second (default: 10)")
+    notify.add_argument('--limit', type=int)
+    prune = commands.add_parser('prune-changes', help="delete old change feed entries")
+    prune.add_argument('--days', type=int, default=30, help="keep this many days (default: 30)")
+    args = parser.parse_args(argv)
+
+    db = StudentConductDB(host=args.host, user=args.user, password=args.password, database=args.database,
+                          backend=SQLiteBackend(args.sqlite) if args.sqlite else None)
+    if not db.connected:
+        print("Failed to connect to database.")
+        return 1
+    try:
+        ok = db.migrate()
+        if ok and args.command == 'export-card':
+            ok = db.export_student_card_csv(args.student_id)
+        elif ok and args.command == 'export-students':
+            ok = db.export_all_students_csv(stream=True, compress=args.compress)
+        elif ok and args.command == 'export-monthly':
+            ok = db.export_monthly_report_csv(args.month, args.year, stream=True, compress=args.compress)
+        elif ok and args.command == 'rebuild-summaries':
+            ok = db.rebuild_summaries() is not None
+        elif ok and args.command == 'notify-parents':
+            from notifications import NotificationDispatcher, OutboxTransport, SMTPTransport
+            if args.sms_gateway:
+                transport = SMTPTransport(args.sms_gateway, args.smtp_host, args.smtp_port, args.sender)
+            else:
+                transport = OutboxTransport(args.outbox)
+            try:
+                result = NotificationDispatcher(db, transport, workers=args.workers, rate=args.rate).run(args.limit)
+            finally:
+                transport.close()
+            ok = result is not None and not result['failed']
+        elif ok and args.command == 'prune-changes':
+            ok = db.prune_changes(args.days) is not None
+        return 0 if ok else 1
+    finally:
+        db.close()
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(cli(sys.argv[1:]))
+
     db = StudentConductDB(
         host='localhost',
         user='root',
         password='your_password',
-        database='student_conduct_db'
+        database='student_conduct_db',
+        cache_size=256
     )
     
-    if db.conn:
+    if db.connected:
         system = ConductManagementSystem(db)
         system.run()
     else:
@@ -0,0 +1,209 @@
+import json
+import threading
+import time
+
+from backends import errors
+
+
+class DeliveryError(Exception):
+    # Raised by a transport when a message could not be handed over; the dispatcher retries it.
+    pass
+
+
+class OutboxTransport:
+    # Local sink: appends each message to a JSON-lines file instead of sending it. Use it for dry
+    # runs, for an SMS gateway that collects messages from a file, or as the stub in tests.
+    def __init__(self, path='notifications_outbox.jsonl'):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        line = json.dumps(message, default=str)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+    def close(self):
+        pass
+
+
+class SMTPTransport:
+    # SMS through an email-to-SMS gateway: each message is mailed to <parent_phone digits>@gateway.
+    # Every worker thread keeps its own SMTP connection open across messages; a connection that
+    # fails is dropped so the retry reconnects.
+    def __init__(self, gateway, host='localhost', port=25, sender='conduct-office@localhost',
+                 user=None, password=None, starttls=False, timeout=10):
+        self.gateway = gateway
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        import smtplib
+        smtp = getattr(self._local, 'smtp', None)
+        if smtp is None:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                smtp.starttls()
+            if self.user:
+                smtp.login(self.user, self.password)
+            self._local.smtp = smtp
+            with self._lock:
+                self._connections.append(smtp)
+        return smtp
+
+    def send(self, message):
+        from email.message import EmailMessage
+        digits = ''.join(c for c in message['to'] if c.isdigit())
+        if not digits:
+            raise DeliveryError(f"no phone number in '{message['to']}'")
+        email = EmailMessage()
+        email['From'] = self.sender
+        email['To'] = f"{digits}@{self.gateway}"
+        email['Subject'] = f"Conduct incident {message['incident_id']}"
+        email.set_content(message['body'])
+        try:
+            self._connection().send_message(email)
+        except OSError:
+            self._local.smtp = None
+            raise
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for smtp in connections:
+            try:
+                smtp.quit()
+            except OSError:
+                pass
+
+
+class RateLimiter:
+    # Token bucket shared by the worker threads: at most `rate` sends per second, with bursts of
+    # up to `burst` after a quiet spell.
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class NotificationDispatcher:
+    # Sends parents a message for every incident with parent_notified = FALSE. Incidents are read
+    # in batches of batch_size; each batch is rendered, sent through the transport by `workers`
+    # threads (rate limited, each message retried with exponential backoff), and its delivered
+    # incidents are marked with one UPDATE before the next batch is read. A crash therefore
+    # re-sends at most one batch. Incidents whose student has no parent phone are skipped and
+    # stay pending.
+    MESSAGE = ("Dear {parent_name}, {name} was involved in an incident on {incident_date}: {incident_type} "
+               "({category}, severity {severity_score}/10). Please contact the school office.")
+
+    PENDING_SQL = """SELECT c.incident_id, c.incident_type, c.category, c.severity_score, c.incident_date,
+                            s.student_id, s.name, s.parent_name, s.parent_phone
+                     FROM conduct_incidents c
+                     JOIN students s ON c.student_id = s.student_id
+                     WHERE c.parent_notified = FALSE AND c.incident_id > %s
+                     ORDER BY c.incident_id
+                     LIMIT %s"""
+
+    def __init__(self, db, transport, workers=4, rate=10, retries=3, backoff=0.5, batch_size=200,
+                 message=None):
+        self.db = db
+        self.transport = transport
+        self.workers = workers
+        self.limiter = RateLimiter(rate) if rate else None
+        self.retries = retries
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.message = message or self.MESSAGE
+
+    def pending(self, after=0, limit=None):
+        try:
+            with self.db._session('notifications.pending') as (conn, cursor):
+                cursor.execute(self.PENDING_SQL, (after, limit or self.batch_size))
+                return cursor.fetchall()
+        except errors.Error as e:
+            print(f"✗ Error reading pending notifications: {e}\n")
+            return None
+
+    def render(self, row):
+        return {
+            'incident_id': row['incident_id'],
+            'student_id': row['student_id'],
+            'to': row['parent_phone'],
+            'body': self.message.format(**dict(row, parent_name=row['parent_name'] or 'Parent/Guardian')),
+        }
+
+    def _deliver(self, message):
+        # None once sent, otherwise the last error.
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            if self.limiter:
+                self.limiter.acquire()
+            try:
+                self.transport.send(message)
+                return None
+            except (DeliveryError, OSError) as e:
+                error = str(e) or type(e).__name__
+        return error
+
+    def run(self, limit=None):
+        # Returns {'sent': count, 'failed': [(incident_id, error)], 'skipped': [incident_id]}, or
+        # None if the database could not be read or updated.
+        from concurrent.futures import ThreadPoolExecutor
+        result = {'sent': 0, 'failed': [], 'skipped': []}
+        after = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while limit is None or result['sent'] + len(result['failed']) < limit:
+                size = self.batch_size
+                if limit is not None:
+                    size = min(size, limit - result['sent'] - len(result['failed']))
+                rows = self.pending(after, size)
+                if rows is None:
+                    return None
+                if not rows:
+                    break
+                after = rows[-1]['incident_id']
+
+                messages = []
+                for row in rows:
+                    if row['parent_phone']:
+                        messages.append(self.render(row))
+                    else:
+                        result['skipped'].append(row['incident_id'])
+                delivered = []
+                for message, error in zip(messages, pool.map(self._deliver, messages)):
+                    if error is None:
+                        delivered.append(message['incident_id'])
+                    else:
+                        result['failed'].append((message['incident_id'], error))
+                if delivered and self.db.mark_parents_notified(delivered) is None:
+                    return None
+                result['sent'] += len(delivered)
+
+        for incident_id, error in result['failed']:
+            print(f"✗ Incident {incident_id}: {error}")
+        print(f"✓ {result['sent']} parent notifications sent, {len(result['failed'])} failed, "
+              f"{len(result['skipped'])} skipped (no parent phone)\n")
+        return result
@@ -0,0 +1,75 @@
+from array import array
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache, partial
+
+
+SHAPES = ('dict', 'record', 'columns')
+
+# A column whose values repeat (category, status, grade, dates) keeps one object per distinct
+# value; once a column shows more distinct values than this it is left alone. Only types whose
+# equal values also print the same are shared (Decimal('7.5') == Decimal('7.50'), for instance).
+SHARED_VALUES_LIMIT = 1024
+# A column is checked chunk by chunk until its first non-NULL value settles its type.
+SHAREABLE_TYPES = {str, int, date, datetime, time, timedelta}
+
+@lru_cache(maxsize=64)
+def record_type(columns):
+    # One namedtuple class per column list. Its instances are plain tuples (__slots__ = ()), so a
+    # row costs one tuple rather than a dict with its own key table.
+    return namedtuple('Record', columns, rename=True)
+
+
+def compact_rows(cursor, shape, chunk_size=10000):
+    # Builds the result of a plain (tuple) cursor in the requested shape:
+    #   'record'  - list of namedtuples: row.name, row[2], row._asdict()
+    #   'columns' - {column: values}, integer columns as array('q'), the rest as lists
+    # Rows are read chunk_size at a time and repeated values are shared between rows. shape is
+    # checked by the public methods (check_shape).
+    return _build(cursor.column_names, iter(lambda: cursor.fetchmany(chunk_size), []), shape)
+
+
+def compact_fetched(names, rows, shape, chunk_size=10000):
+    # compact_rows for rows that are already fetched, e.g. from an aiomysql cursor.
+    return _build(names, (rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)), shape)
+
+
+def check_shape(shape):
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown row shape '{shape}' (expected one of {', '.join(SHAPES)})")
+
+
+def _build(names, chunks, shape):
+    names = tuple(names)
+    shared = [{} for _ in names]
+    settled = [False] * len(names)
+    columns = [[] for _ in names]
+    records = []
+    # tuple.__new__ builds the namedtuples in C; the generated __new__ is a Python function.
+    make = partial(tuple.__new__, record_type(names))
+    for rows in chunks:
+        chunk = list(zip(*rows))
+        for i, values in enumerate(chunk):
+            if not settled[i] and shared[i] is not None:
+                kinds = set(map(type, values))
+                kinds.discard(type(None))
+                if not SHAREABLE_TYPES.issuperset(kinds):
+                    shared[i] = None
+                settled[i] = bool(kinds)
+            memo = shared[i]
+            if memo is not None:
+                values = chunk[i] = list(map(memo.setdefault, values, values))
+                if len(memo) > SHARED_VALUES_LIMIT:
+                    shared[i] = None
+            if shape == 'columns':
+                columns[i].extend(values)
+        if shape == 'record':
+            records.extend(map(make, zip(*chunk)))
+    if shape == 'record':
+        return records
+    result = {}
+    for name, values in zip(names, columns):
+        if values and all(type(value) is int for value in values):
+            values = array('q', values)
+        result[name] = values
+    return result
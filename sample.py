@@ -7,7 +7,7 @@ db = StudentConductDB(
     database='student_conduct_db'
 )
 
-db.create_tables()
+db.migrate()
 
 print("\n" + "="*70)
 print("STUDENT CONDUCT MANAGEMENT SYSTEM - SAMPLE USAGE")
@@ -0,0 +1,191 @@
+import re
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from heapq import merge, nsmallest
+
+from backends import errors
+
+
+EXACT, PREFIX, TYPO = 3, 2, 1
+
+
+def tokenize(text):
+    # Case- and accent-insensitive words: "José O'Brien" -> ['jose', 'o', 'brien'].
+    text = unicodedata.normalize('NFKD', text or '')
+    return re.findall(r'\w+', ''.join(c for c in text if not unicodedata.combining(c)).casefold())
+
+
+def deletions(token):
+    # Every way of dropping one character. Two words within one edit (insert, delete, replace,
+    # swap) share at least one of these variants, so typos are found with dict lookups alone.
+    # Short words and identifiers with digits (roll numbers) are matched exactly or by prefix only.
+    if len(token) <= 3 or not token.isalpha():
+        return set()
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+class StudentSearchIndex:
+    # In-process word index over students.name, roll_number and parent_name. Each distinct word
+    # is stored once with the students (slots) it occurs in; queries match words exactly, by
+    # prefix (the last query word, so partly typed names work) or within one typo, and a student
+    # must match every query word. refresh() only fetches students above the student_id
+    # watermark, since names never change after insert. If the number of students at or below
+    # the watermark no longer matches the index (a lower id committed late, or students were
+    # deleted by another process) it reloads everything, as ConductAnalytics.refresh does.
+    def __init__(self, db):
+        self.db = db
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.student_ids = array('q')
+        self.watermark = 0
+        self._slots = {}
+        self._removed = set()
+        self._word_ids = {}
+        self._postings = []
+        self._sorted_words = []
+        self._variants = {}
+        self._doc_words = []
+
+    def __len__(self):
+        return len(self.student_ids) - len(self._removed)
+
+    LOAD_SQL = "SELECT student_id, roll_number, name, parent_name FROM students"
+
+    def refresh(self):
+        # A primary key range COUNT() and an indexed MAX() when nothing has changed.
+        try:
+            with self._lock, self.db._session('search.refresh') as (conn, cursor):
+                cursor.execute("SELECT COUNT(*) as n FROM students WHERE student_id <= %s", (self.watermark,))
+                if cursor.fetchone()['n'] != len(self):
+                    self._reset()
+                cursor.execute("SELECT MAX(student_id) as last_id FROM students")
+                last_id = cursor.fetchone()['last_id'] or 0
+                if last_id > self.watermark:
+                    cursor.execute(self.LOAD_SQL + " WHERE student_id > %s ORDER BY student_id", (self.watermark,))
+                    self._add(cursor.fetchall())
+                return len(self)
+        except errors.Error as e:
+            print(f"✗ Error refreshing search index: {e}\n")
+            return None
+
+    def _add(self, rows):
+        initial = not self._sorted_words
+        for row in rows:
+            slot = len(self.student_ids)
+            self.student_ids.append(row['student_id'])
+            self._slots[row['student_id']] = slot
+            word_ids = []
+            for word in set(tokenize(f"{row['name']} {row['roll_number']} {row['parent_name'] or ''}")):
+                word_id = self._word_ids.get(word)
+                if word_id is None:
+                    word_id = self._word_ids[word] = len(self._postings)
+                    self._postings.append(array('l'))
+                    for variant in deletions(word) | {word}:
+                        self._variants.setdefault(variant, []).append(word_id)
+                    if not initial:
+                        insort(self._sorted_words, word)
+                self._postings[word_id].append(slot)
+                word_ids.append(word_id)
+            self._doc_words.append(tuple(word_ids))
+        if initial:
+            self._sorted_words = sorted(self._word_ids)
+        if rows:
+            self.watermark = rows[-1]['student_id']
+
+    def remove(self, student_id):
+        # Called by delete_student so deleted students stop taking result slots.
+        with self._lock:
+            slot = self._slots.pop(student_id, None)
+            if slot is not None:
+                self._removed.add(slot)
+
+    def _match(self, token, prefix):
+        # word_id -> EXACT, PREFIX or TYPO for one query word.
+        matches = {}
+        for word_id in self._variants.get(token, ()):
+            matches[word_id] = TYPO
+        for variant in deletions(token):
+            for word_id in self._variants.get(variant, ()):
+                matches[word_id] = TYPO
+        if prefix:
+            words = self._sorted_words
+            i = bisect_left(words, token)
+            while i < len(words) and words[i].startswith(token):
+                matches[self._word_ids[words[i]]] = PREFIX
+                i += 1
+        word_id = self._word_ids.get(token)
+        if word_id is not None:
+            matches[word_id] = EXACT
+        return matches
+
+    def search(self, query, limit=10):
+        # student_ids ranked by match quality (exact > prefix > typo, summed over query words),
+        # then by student_id.
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            matches = [self._match(token, i == len(tokens) - 1) for i, token in enumerate(tokens)]
+            if len(matches) == 1:
+                ranked = self._rank_single(matches[0], limit)
+            else:
+                ranked = self._rank_all(matches, limit)
+            return [self.student_ids[slot] for slot in ranked]
+
+    def _rank_single(self, matches, limit):
+        # Walks each quality tier's postings in slot order and stops after limit students.
+        tiers = {}
+        for word_id, quality in matches.items():
+            tiers.setdefault(quality, []).append(self._postings[word_id])
+        ranked = []
+        seen = set(self._removed)
+        for quality in sorted(tiers, reverse=True):
+            for slot in merge(*tiers[quality]):
+                if slot not in seen:
+                    seen.add(slot)
+                    ranked.append(slot)
+                    if len(ranked) == limit:
+                        return ranked
+        return ranked
+
+    def _rank_all(self, matches, limit):
+        # Students matching every word at its best available quality are the top scorers; for
+        # full names there are usually enough of them, found with set intersections alone.
+        # Otherwise every student matching all words in any way is scored.
+        if not all(matches):
+            return []
+        best = []
+        for m in matches:
+            top_quality = max(m.values())
+            best.append([word_id for word_id, quality in m.items() if quality == top_quality])
+        top = self._students_matching(best)
+        if len(top) >= limit:
+            return nsmallest(limit, top)
+        scores = {}
+        for slot in self._students_matching(matches):
+            words = self._doc_words[slot]
+            scores[slot] = sum(max([m.get(word_id, 0) for word_id in words], default=0) for m in matches)
+        return nsmallest(limit, scores, key=lambda slot: (-scores[slot], slot))
+
+    def _students_matching(self, word_groups):
+        # Slots containing a word from every group. The rarest group seeds the candidates; a
+        # group much larger than them is checked through each candidate's own word list instead
+        # of being turned into a set.
+        groups = sorted(word_groups, key=self._group_size)
+        candidates = set().union(*(self._postings[word_id] for word_id in groups[0]))
+        for words in groups[1:]:
+            if not candidates:
+                break
+            if self._group_size(words) <= 8 * len(candidates):
+                candidates &= set().union(*(self._postings[word_id] for word_id in words))
+            else:
+                words = set(words)
+                candidates = {slot for slot in candidates if not words.isdisjoint(self._doc_words[slot])}
+        return candidates - self._removed
+
+    def _group_size(self, words):
+        return sum(len(self._postings[word_id]) for word_id in words)
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backends import SQLiteBackend
+from main import StudentConductDB
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = StudentConductDB(backend=SQLiteBackend(tmp_path / 'db.sqlite'))
+    db.migrate()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def student_ids(db):
+    db.bulk_add_students([(f"R{i:03d}", f"Student {i}", f"s{i}@school.com", "9876543210", "9", "A",
+                           f"Parent {i}", f"555-01{i:02d}") for i in range(20)])
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT student_id FROM students ORDER BY student_id")
+        return [r['student_id'] for r in cursor.fetchall()]
+
+
+def incident(student_id, **fields):
+    row = {'student_id': student_id, 'incident_type': 'Late arrival', 'category': 'Attendance',
+           'description': 'Arrived after the bell', 'severity_score': 3, 'location': 'Gate',
+           'witnesses': 'N/A', 'reported_by': 'Ms. Rao'}
+    row.update(fields)
+    return row
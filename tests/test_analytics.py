@@ -0,0 +1,61 @@
+from datetime import date
+
+import pytest
+
+from analytics import CATEGORIES, ConductAnalytics
+from conftest import incident
+
+
+@pytest.fixture
+def analytics(db, student_ids):
+    db.record_incidents_bulk([incident(student_ids[i % 7], severity_score=(i * 3) % 10 + 1,
+                                       category=CATEGORIES[i % len(CATEGORIES)],
+                                       incident_date=date(2025, 9, 1 + i % 30))
+                              for i in range(90)])
+    analytics = ConductAnalytics(db, chunk_size=16)
+    assert analytics.refresh() == 90
+    return analytics
+
+
+def test_distribution_matches_sql(db, analytics):
+    assert analytics.severity_distribution() == {k: int(v) for k, v in db.get_severity_distribution().items()}
+    in_range = db.get_incidents_between(date(2025, 9, 5), date(2025, 9, 12))
+    expected = {'minor': 0, 'moderate': 0, 'serious': 0, 'critical': 0}
+    for row in in_range:
+        score = row['severity_score']
+        expected['minor' if score <= 3 else 'moderate' if score <= 6 else 'serious' if score <= 9 else 'critical'] += 1
+    assert analytics.severity_distribution('2025-09-05', date(2025, 9, 12)) == expected
+
+
+def test_student_stats_and_high_risk_match_sql(db, analytics, student_ids):
+    for student_id in student_ids[:8]:
+        stats = db.get_student_stats(student_id)
+        ours = analytics.student_stats(student_id)
+        assert sorted(ours.pop('category_breakdown'), key=lambda r: r['category']) == \
+            sorted(stats.pop('category_breakdown'), key=lambda r: r['category'])
+        assert ours == stats
+    for threshold in (1, 5, 6, 10):
+        assert analytics.high_risk_students(threshold) == db.get_high_risk_students(threshold)
+
+
+def test_filters_match_sql(db, analytics):
+    rows = db.get_incidents_between(date(2025, 9, 10), date(2025, 9, 20))
+    expected = sorted(r['incident_id'] for r in rows if r['severity_score'] >= 7 and r['category'] == 'Bullying')
+    assert analytics.filter_incidents(min_severity=7, category='Bullying', start='2025-09-10', end='2025-09-20') == \
+        expected
+    assert len(analytics.filter_incidents()) == 90
+
+
+def test_refresh_after_insert_and_delete(db, analytics, student_ids):
+    db.record_incidents_bulk([incident(student_ids[10], severity_score=10)])
+    assert analytics.refresh() == 1
+    assert analytics.student_stats(student_ids[10])['worst_incident'] == 10
+
+    db.delete_student(student_ids[0])
+    analytics.refresh()
+    assert analytics.student_stats(student_ids[0])['total_incidents'] == 0
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT incident_id FROM conduct_incidents ORDER BY incident_id")
+        assert analytics.filter_incidents() == [r['incident_id'] for r in cursor.fetchall()]
+    assert analytics.severity_distribution() == {k: int(v) for k, v in db.get_severity_distribution().items()}
+    assert analytics.high_risk_students(5) == db.get_high_risk_students(5)
@@ -0,0 +1,49 @@
+from datetime import date
+
+from analytics import ConductAnalytics
+from conftest import incident
+
+
+def archive_first_year(db, student_ids):
+    # student 0: one archived and one live incident; student 1: archived history only.
+    db.record_incidents_bulk([incident(student_ids[0], severity_score=9, incident_date=date(2024, 5, 1)),
+                              incident(student_ids[0], severity_score=3, incident_date=date(2025, 9, 1)),
+                              incident(student_ids[1], severity_score=8, incident_date=date(2024, 5, 2))])
+    assert db.archive_incidents_before(date(2025, 1, 1)) == 2
+
+
+def test_per_student_views_cover_live_incidents_only(db, student_ids, tmp_path, monkeypatch):
+    archive_first_year(db, student_ids)
+
+    stats = db.get_student_stats(student_ids[0])
+    assert (stats['total_incidents'], stats['worst_incident']) == (1, 3)
+    assert db.get_student_stats(student_ids[1])['total_incidents'] == 0
+    dossier = db.get_student_dossier(student_ids[0])
+    assert [i['incident_date'] for i in dossier['incidents']] == [date(2025, 9, 1)]
+    assert db.get_student_dossier(student_ids[1])['incidents'] == []
+
+    listed = {s['student_id']: s['incident_count'] for s in db.list_all_students()}
+    assert (listed[student_ids[0]], listed[student_ids[1]]) == (1, 0)
+    assert db.get_high_risk_students(threshold=7) == []
+
+    monkeypatch.chdir(tmp_path)
+    card = open(db.export_student_card_csv(student_ids[0]), encoding='utf-8').read()
+    assert '2025-09-01' in card and '2024-05-01' not in card
+
+    analytics = ConductAnalytics(db)
+    analytics.refresh()
+    assert analytics.student_stats(student_ids[0])['total_incidents'] == 1
+
+
+def test_date_range_reports_read_the_archive(db, student_ids):
+    archive_first_year(db, student_ids)
+    between = db.get_incidents_between(date(2024, 1, 1), date(2025, 12, 31))
+    assert sorted(r['incident_date'] for r in between) == [date(2024, 5, 1), date(2024, 5, 2), date(2025, 9, 1)]
+    assert len(db.get_monthly_report(5, 2024)) == 2
+
+
+def test_rebuilt_summaries_match_live_incidents_after_archiving(db, student_ids):
+    archive_first_year(db, student_ids)
+    before = [db.get_student_stats(student_id) for student_id in student_ids[:2]]
+    db.rebuild_summaries()
+    assert [db.get_student_stats(student_id) for student_id in student_ids[:2]] == before
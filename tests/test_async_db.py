@@ -0,0 +1,131 @@
+import asyncio
+import inspect
+from contextlib import asynccontextmanager
+from datetime import date
+
+import pytest
+
+aiomysql = pytest.importorskip('aiomysql')
+
+from async_db import AsyncStudentConductDB
+from conftest import incident
+from main import StudentConductDB
+
+
+class AsyncCursor:
+    # aiomysql cursor API over a SQLite cursor, so the async class runs its real SQL in tests.
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    async def execute(self, sql, params=()):
+        self._cursor.execute(sql, params)
+
+    async def executemany(self, sql, seq_params):
+        self._cursor.executemany(sql, seq_params)
+
+    async def fetchone(self):
+        return self._cursor.fetchone()
+
+    async def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+
+class AsyncConnection:
+    def __init__(self, conn):
+        self._conn = conn
+
+    @asynccontextmanager
+    async def cursor(self, cursor_class=None):
+        cursor = self._conn.cursor(dictionary=cursor_class is aiomysql.DictCursor)
+        try:
+            yield AsyncCursor(cursor)
+        finally:
+            cursor.close()
+
+    async def begin(self):
+        pass
+
+    async def commit(self):
+        self._conn.commit()
+
+
+class SQLitePool:
+    def __init__(self, db):
+        self._db = db
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield AsyncConnection(self._db.conn)
+
+
+@pytest.fixture
+def async_db(db):
+    return AsyncStudentConductDB(SQLitePool(db))
+
+
+@pytest.mark.parametrize('name', ['list_all_students', 'get_high_risk_students', 'get_incidents_by_category',
+                                  'get_pending_incidents', 'get_monthly_report', 'get_incidents_between',
+                                  'get_student_dossier'])
+def test_async_signatures_match(name):
+    assert inspect.signature(getattr(AsyncStudentConductDB, name)) == \
+        inspect.signature(getattr(StudentConductDB, name))
+
+
+def test_async_reports_match_sync(db, async_db, student_ids):
+    db.record_incidents_bulk([incident(student_ids[i % 5], status='Pending', severity_score=i % 10 + 1,
+                                       incident_date=date(2025, 9, i % 28 + 1))
+                              for i in range(40)])
+    for shape in ('dict', 'record', 'columns'):
+        assert asyncio.run(async_db.list_all_students(after_id=student_ids[3], limit=5, shape=shape)) == \
+            db.list_all_students(after_id=student_ids[3], limit=5, shape=shape)
+        pending = db.get_pending_incidents(limit=10, shape='record')
+        after = (pending[-1].severity_score, pending[-1].incident_date, pending[-1].incident_id)
+        assert asyncio.run(async_db.get_pending_incidents(after=after, limit=10, shape=shape)) == \
+            db.get_pending_incidents(after=after, limit=10, shape=shape)
+        assert asyncio.run(async_db.get_monthly_report(9, 2025, shape=shape)) == \
+            db.get_monthly_report(9, 2025, shape=shape)
+
+    with pytest.raises(ValueError):
+        asyncio.run(async_db.get_high_risk_students(shape='rows'))
+
+
+def test_async_dossier(db, async_db, student_ids):
+    first = db.record_incidents_bulk([incident(student_ids[0], incident_date=date(2025, 9, 2)),
+                                      incident(student_ids[0], incident_date=date(2025, 9, 1))])['incident_ids'][0]
+    db.add_action_to_incident(first, 'Detention', 1, 'Days', 'After school', 'Ms. Rao')
+    dossier = asyncio.run(async_db.get_student_dossier(student_ids[0]))
+    assert dossier == db.get_student_dossier(student_ids[0])
+    assert [len(i['actions']) for i in dossier['incidents']] == [1, 0]
+
+
+def test_async_student_card_lists_actions(db, async_db, student_ids, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first = db.record_incidents_bulk([incident(student_ids[0], incident_date=date(2025, 9, 2)),
+                                      incident(student_ids[0], incident_date=date(2025, 9, 1))])['incident_ids'][0]
+    db.add_action_to_incident(first, 'Detention', 1, 'Days', 'After school', 'Ms. Rao')
+    assert asyncio.run(async_db.export_student_card_csv(student_ids[0]))
+    card = (tmp_path / 'student_cards' / f"{student_ids[0]}_R000.csv").read_text(encoding='utf-8')
+    assert 'Detention' in card
+    assert card.count('Late arrival') == 2
+
+
+def test_async_writes_reach_the_change_feed(db, async_db, student_ids):
+    cursor = db.get_changes()['cursor']
+    incident_id = db.record_incidents_bulk([incident(student_ids[0])])['incident_ids'][0]
+    assert asyncio.run(async_db.add_action_to_incident(incident_id, 'Detention', 1, 'Days', 'After school',
+                                                       'Ms. Rao'))
+    changes = db.get_changes(since=cursor, with_rows=False)['changes']
+    assert [(c['table_name'], c['operation']) for c in changes] == \
+        [('conduct_incidents', 'insert'), ('conduct_actions', 'insert')]
@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+
+from backends import MySQLBackend
+
+
+class FakeCursor:
+    def __init__(self, server, prepared):
+        self.server = server
+        self.prepared = prepared
+        self.closed = False
+        self.with_rows = False
+
+    def execute(self, sql, params=()):
+        self.server.statements.append(sql)
+
+    def fetchall(self):
+        return [(connection_id,) for connection_id in sorted(self.server.alive)]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    # Stands in for a (pooled wrapper around a) mysql.connector connection.
+    def __init__(self, server, connection_id):
+        self.server = server
+        self.connection_id = connection_id
+
+    def cursor(self, prepared=False, dictionary=False):
+        cursor = FakeCursor(self.server, prepared)
+        self.server.cursors.append(cursor)
+        return cursor
+
+
+class FakeServer:
+    def __init__(self):
+        self.alive = set()
+        self.statements = []
+        self.cursors = []
+
+    def connect(self, connection_id):
+        self.alive.add(connection_id)
+        return FakeConnection(self, connection_id)
+
+
+def test_prepared_statements_of_live_sessions_are_kept():
+    server = FakeServer()
+    backend = MySQLBackend()
+    for connection_id in range(MySQLBackend.PREPARED_SESSIONS):
+        backend.prepared_cursor(server.connect(connection_id)).execute("SELECT 1")
+
+    backend.prepared_cursor(server.connect(100))
+    assert len(backend._prepared) == MySQLBackend.PREPARED_SESSIONS + 1
+
+    # Sessions 0-59 ended (say the connections reconnected): only their entries go, and no
+    # COM_STMT_CLOSE is sent for them.
+    server.alive -= set(range(60))
+    backend.prepared_cursor(server.connect(101))
+    assert sorted(backend._prepared) == [60, 61, 62, 63, 100, 101]
+    assert not any(cursor.closed for cursor in server.cursors if cursor.prepared)
+
+
+def test_prepared_statements_follow_the_current_pooled_wrapper():
+    server = FakeServer()
+    backend = MySQLBackend()
+    first = backend.prepared_cursor(server.connect(7))
+    first.execute("SELECT 1")
+    borrowed_again = FakeConnection(server, 7)
+    statements = backend.prepared_cursor(borrowed_again)
+    assert statements is first
+    assert statements.conn is borrowed_again
+
+
+def test_importing_the_application_does_not_load_the_mysql_driver():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    loaded = subprocess.run(
+        [sys.executable, '-c', "import sys, main, search, analytics, notifications; "
+                               "print(sorted(m for m in sys.modules if m.startswith('mysql')))"],
+        cwd=root, capture_output=True, text=True, check=True
+    ).stdout.strip()
+    assert loaded == '[]'
@@ -0,0 +1,129 @@
+import json
+from datetime import date
+
+from backends import SQLiteCursor, errors
+from conftest import incident
+
+
+def test_bulk_incidents_accept_mixed_date_types(db, student_ids):
+    student_id = student_ids[0]
+    result = db.record_incidents_bulk([incident(student_id, incident_date='2026-09-01'),
+                                       incident(student_id)])
+    assert result['rejected'] == []
+    assert None not in result['incident_ids']
+    stats = db.get_student_stats(student_id)
+    assert stats['total_incidents'] == 2
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT last_incident_date FROM student_conduct_summary WHERE student_id = %s",
+                       (student_id,))
+        assert cursor.fetchone()['last_incident_date'] == max(date(2026, 9, 1), date.today())
+
+
+def test_bulk_incidents_reject_unparseable_dates(db, student_ids):
+    result = db.record_incidents_bulk([incident(student_ids[0], incident_date='01/09/2026'),
+                                       incident(student_ids[0], incident_date=date(2026, 9, 2))])
+    assert result['rejected'] == [(1, "Invalid incident date '01/09/2026'")]
+    assert result['incident_ids'][0] is None and result['incident_ids'][1] is not None
+
+
+def test_bulk_incidents_report_each_rejected_row_s_own_error(db, student_ids):
+    result = db.record_incidents_bulk([incident(student_ids[0]),
+                                       incident(student_ids[0], category='Gossip'),
+                                       incident(student_ids[1])])
+    assert [row_number for row_number, _ in result['rejected']] == [2]
+    assert 'CHECK constraint failed' in result['rejected'][0][1]
+    assert result['incident_ids'][1] is None and None not in result['incident_ids'][::2]
+    assert db.get_student_stats(student_ids[0])['total_incidents'] == 1
+
+
+def test_bulk_incidents_fall_back_to_single_rows_on_data_errors(db, student_ids, monkeypatch):
+    # MySQL in strict mode rejects a whole multi-row INSERT with a DataError when one value
+    # does not fit its column.
+    def too_long(params):
+        return any(isinstance(value, str) and len(value) > 255 for value in params)
+
+    execute, executemany = SQLiteCursor.execute, SQLiteCursor.executemany
+
+    def strict_execute(self, operation, params=None):
+        if params and too_long(params):
+            raise errors.DataError(msg="Data too long for column 'description' at row 1")
+        execute(self, operation, params)
+
+    def strict_executemany(self, operation, seq_params):
+        for row, params in enumerate(seq_params, start=1):
+            if too_long(params):
+                raise errors.DataError(msg=f"Data too long for column 'description' at row {row}")
+        executemany(self, operation, seq_params)
+
+    monkeypatch.setattr(SQLiteCursor, 'execute', strict_execute)
+    monkeypatch.setattr(SQLiteCursor, 'executemany', strict_executemany)
+    result = db.record_incidents_bulk([incident(student_ids[0]),
+                                       incident(student_ids[0], description='x' * 300),
+                                       incident(student_ids[0])])
+    assert result['rejected'] == [(2, "Data too long for column 'description' at row 1")]
+    assert None not in result['incident_ids'][::2]
+    assert db.get_student_stats(student_ids[0])['total_incidents'] == 2
+
+
+def student(roll_number, name='Asha Rao', **fields):
+    row = {'roll_number': roll_number, 'name': name, 'email': f"{roll_number.lower()}@school.com",
+           'phone': '9876543210', 'grade': '9', 'class_section': 'A', 'parent_name': 'Parent',
+           'parent_phone': '555-0100'}
+    row.update(fields)
+    return row
+
+
+def students_by_roll(db):
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT * FROM students ORDER BY student_id")
+        return {row['roll_number']: row for row in cursor.fetchall()}
+
+
+def test_bulk_students_commit_once_per_batch(db):
+    rows = [student(f"B{i:03d}", f"Student {i}") for i in range(7)]
+    rows[3] = tuple(rows[3].values())
+    statements = []
+    db.conn._raw.set_trace_callback(statements.append)
+    result = db.bulk_add_students(rows, batch_size=3)
+    db.conn._raw.set_trace_callback(None)
+
+    assert result == {'inserted': 7, 'rejected': []}
+    assert sum(sql.startswith('COMMIT') for sql in statements) == 3
+    stored = students_by_roll(db)
+    assert [stored[f"B{i:03d}"]['name'] for i in range(7)] == [f"Student {i}" for i in range(7)]
+    assert stored['B003']['parent_phone'] == '555-0100'
+    assert stored['B003']['enrollment_date'] == date.today()
+    changes = db.get_changes(with_rows=False)['changes']
+    assert sorted(c['row_id'] for c in changes) == sorted(s['student_id'] for s in stored.values())
+
+
+def test_bulk_students_reject_bad_rows_individually(db):
+    db.add_student('B000', 'Existing', None, None, '9', 'A', None, None)
+    result = db.bulk_add_students([student('B001'), student('', 'No Roll'), student('B002', '  '),
+                                   student('B000'), student('B001', 'Twin'), student('b003'),
+                                   student('B003', 'Case Twin'), student('B004')], batch_size=4)
+    assert result['inserted'] == 3
+    assert result['rejected'] == [(2, None, 'Missing roll number'),
+                                  (3, 'B002', 'Student name cannot be empty'),
+                                  (4, 'B000', 'Roll number already exists'),
+                                  (5, 'B001', 'Roll number already exists'),
+                                  (7, 'B003', 'Roll number already exists')]
+    assert sorted(students_by_roll(db)) == ['B000', 'B001', 'B004', 'b003']
+
+
+def test_import_students_from_csv_and_jsonl(db, tmp_path):
+    fields = db.STUDENT_FIELDS
+    csv_path = tmp_path / 'students.csv'
+    csv_path.write_text(','.join(fields) + '\n' +
+                        '\n'.join(','.join(student(f"C{i}", f"Csv {i}")[f] for f in fields) for i in range(3)) + '\n',
+                        encoding='utf-8')
+    jsonl_path = tmp_path / 'students.jsonl'
+    jsonl_path.write_text('\n'.join(json.dumps(student(f"J{i}", f"Jsonl {i}")) for i in range(2)) + '\n\n',
+                          encoding='utf-8')
+
+    assert db.import_students_file(str(csv_path), batch_size=2) == {'inserted': 3, 'rejected': []}
+    assert db.import_students_file(str(jsonl_path)) == {'inserted': 2, 'rejected': []}
+    assert db.import_students_file(str(csv_path))['rejected'] == [
+        (i + 1, f"C{i}", 'Roll number already exists') for i in range(3)]
+    assert sorted(students_by_roll(db)) == ['C0', 'C1', 'C2', 'J0', 'J1']
+    assert db.import_students_file(str(tmp_path / 'missing.csv')) is None
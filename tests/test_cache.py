@@ -0,0 +1,99 @@
+from datetime import date
+
+import pytest
+
+from conftest import incident
+from main import RecordCache
+
+
+@pytest.fixture
+def cached(db, student_ids):
+    db.cache = RecordCache(max_size=64, ttl=60)
+    return db
+
+
+def read_all(db, student_id):
+    # Reads every cached view twice, so the second read of each must be a hit (stats of a
+    # student without incidents are not cached).
+    views = [db.get_student_record(student_id), db.get_student_stats(student_id),
+             db.get_student_dossier(student_id)]
+    hits = db.cache.info()['hits']
+    assert [db.get_student_record(student_id), db.get_student_stats(student_id),
+            db.get_student_dossier(student_id)] == views
+    assert db.cache.info()['hits'] == hits + (3 if views[1]['total_incidents'] else 2)
+    return views
+
+
+def test_recording_an_incident_refreshes_every_view(cached, student_ids):
+    student_id = student_ids[0]
+    read_all(cached, student_id)
+    cached.record_incident(student_id, 'Fight', 'Behavior', 'Pushed a classmate', 6, 'Yard', 'N/A', 'Mr. Lee')
+    record, stats, dossier = read_all(cached, student_id)
+    assert [i['incident_type'] for i in record['incidents']] == ['Fight']
+    assert (stats['total_incidents'], stats['worst_incident']) == (1, 6)
+    assert dossier['stats']['total_incidents'] == 1
+
+
+def test_actions_and_status_changes_refresh_record_and_dossier(cached, student_ids):
+    student_id = student_ids[0]
+    first, second = cached.record_incidents_bulk([incident(student_id), incident(student_id)])['incident_ids']
+    read_all(cached, student_id)
+
+    cached.add_action_to_incident(first, 'Detention', 1, 'Days', 'After school', 'Ms. Rao')
+    dossier = cached.get_student_dossier(student_id)
+    assert {i['incident_id']: len(i['actions']) for i in dossier['incidents']} == {first: 1, second: 0}
+
+    read_all(cached, student_id)
+    cached.update_incident_status(first, 'Resolved')
+    assert {i['incident_id']: i['status'] for i in cached.get_student_record(student_id)['incidents']} == \
+        {first: 'Resolved', second: 'Pending'}
+
+    read_all(cached, student_id)
+    cached.mark_parent_notified(first)
+    cached.mark_parents_notified([second])
+    assert all(i['parent_notified'] for i in cached.get_student_record(student_id)['incidents'])
+    assert all(i['parent_notified'] for i in cached.get_student_dossier(student_id)['incidents'])
+
+
+def test_student_status_change_and_delete_refresh_the_student(cached, student_ids):
+    student_id = student_ids[0]
+    read_all(cached, student_id)
+    cached.update_student_status(student_id, 'Suspended')
+    assert cached.get_student_record(student_id)['student']['status'] == 'Suspended'
+    assert cached.get_student_dossier(student_id)['student']['status'] == 'Suspended'
+
+    read_all(cached, student_id)
+    cached.delete_student(student_id)
+    assert cached.get_student_record(student_id) is None
+    assert cached.get_student_dossier(student_id) is None
+
+
+def test_bulk_writes_refresh_the_students_they_touch(cached, student_ids):
+    read_all(cached, student_ids[0])
+    read_all(cached, student_ids[1])
+    cached.record_incidents_bulk([incident(student_ids[0], incident_date=date(2024, 5, 1)),
+                                  incident(student_ids[1], severity_score=8)])
+    assert cached.get_student_stats(student_ids[0])['total_incidents'] == 1
+    assert cached.get_student_stats(student_ids[1])['worst_incident'] == 8
+
+    read_all(cached, student_ids[0])
+    cached.archive_incidents_before(date(2025, 1, 1))
+    assert cached.get_student_record(student_ids[0])['incidents'] == []
+    assert cached.get_student_stats(student_ids[0])['total_incidents'] == 0
+
+    read_all(cached, student_ids[1])
+    with cached._session() as (conn, cursor):
+        cursor.execute("UPDATE student_conduct_summary SET max_severity = 1 WHERE student_id = %s",
+                       (student_ids[1],))
+        conn.commit()
+    cached.rebuild_summaries()
+    assert cached.get_student_stats(student_ids[1])['worst_incident'] == 8
+
+
+def test_a_read_that_overlaps_an_invalidation_is_not_cached():
+    cache = RecordCache(max_size=4, ttl=60)
+    value, token = cache.get(('stats', 1))
+    assert value is None
+    cache.invalidate_student(1)
+    cache.put(('stats', 1), {'total_incidents': 0}, token)
+    assert cache.get(('stats', 1))[0] is None
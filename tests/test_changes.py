@@ -0,0 +1,111 @@
+from datetime import date
+
+from conftest import incident
+from main import StudentConductDB
+from test_transactions import BROKEN_UPSERT
+
+
+def read_feed(db, since=0, limit=1000, **kwargs):
+    changes = []
+    while True:
+        feed = db.get_changes(since=since, limit=limit, with_rows=False, **kwargs)
+        if not feed['changes']:
+            return changes, since
+        changes += feed['changes']
+        since = feed['cursor']
+
+
+def entries(changes):
+    return [(c['table_name'], c['row_id'], c['operation']) for c in changes]
+
+
+def test_feed_pages_through_every_write_in_order(db, student_ids):
+    _, cursor = read_feed(db)
+    first, second = db.record_incidents_bulk([incident(student_ids[0]), incident(student_ids[1])])['incident_ids']
+    student_id = db.add_student('R900', 'New Student', 'n@school.com', '9876543210', '9', 'B', 'Parent', '555-0199')
+    db.add_action_to_incident(first, 'Detention', 1, 'Days', 'After school', 'Ms. Rao')
+    db.update_incident_status(second, 'Resolved')
+    db.mark_parents_notified([first, second])
+    db.update_student_status(student_id, 'Suspended')
+
+    changes, end = read_feed(db, since=cursor, limit=2)
+    assert [c['change_id'] for c in changes] == sorted({c['change_id'] for c in changes})
+    assert end == changes[-1]['change_id']
+    action = [c['row_id'] for c in changes if c['table_name'] == 'conduct_actions']
+    assert entries(changes) == [
+        ('conduct_incidents', first, 'insert'), ('conduct_incidents', second, 'insert'),
+        ('students', student_id, 'insert'),
+        ('conduct_actions', action[0], 'insert'),
+        ('conduct_incidents', second, 'update'),
+        ('conduct_incidents', first, 'update'), ('conduct_incidents', second, 'update'),
+        ('students', student_id, 'update'),
+    ]
+    assert entries(read_feed(db, since=cursor, tables=['students'])[0]) == [
+        ('students', student_id, 'insert'), ('students', student_id, 'update')]
+    assert read_feed(db, since=end) == ([], end)
+
+
+def test_feed_carries_current_rows(db, student_ids):
+    _, cursor = read_feed(db)
+    incident_id = db.record_incidents_bulk([incident(student_ids[0])])['incident_ids'][0]
+    db.update_incident_status(incident_id, 'Resolved')
+    feed = db.get_changes(since=cursor)
+    assert [c['row']['status'] for c in feed['changes']] == ['Resolved', 'Resolved']
+
+
+def test_rolled_back_writes_never_reach_the_feed(db, student_ids, monkeypatch):
+    _, cursor = read_feed(db)
+    monkeypatch.setattr(db.backend, 'SUMMARY_UPSERT', BROKEN_UPSERT)
+    assert db.record_incident(student_ids[0], 'Fight', 'Behavior', 'Pushed a classmate', 6,
+                              'Yard', 'N/A', 'Mr. Lee') is False
+    monkeypatch.undo()
+    db.update_student_status(student_ids[1], 'Suspended')
+    assert entries(read_feed(db, since=cursor)[0]) == [('students', student_ids[1], 'update')]
+
+
+def test_student_delete_and_archive_log_removed_rows(db, student_ids):
+    old, new = db.record_incidents_bulk([incident(student_ids[0], incident_date=date(2024, 5, 1)),
+                                         incident(student_ids[1], incident_date=date(2025, 9, 1))])['incident_ids']
+    db.add_action_to_incident(old, 'Detention', 1, 'Days', 'After school', 'Ms. Rao')
+    db.add_action_to_incident(new, 'Warning', 0, 'Days', 'Verbal', 'Ms. Rao')
+    actions = [c['row_id'] for c in read_feed(db, tables=['conduct_actions'])[0]]
+    _, cursor = read_feed(db)
+
+    assert db.archive_incidents_before(date(2025, 1, 1)) == 1
+    assert db.delete_student(student_ids[1])
+    assert entries(read_feed(db, since=cursor)[0]) == [
+        ('conduct_actions', actions[0], 'archive'), ('conduct_incidents', old, 'archive'),
+        ('conduct_actions', actions[1], 'delete'), ('conduct_incidents', new, 'delete'),
+        ('students', student_ids[1], 'delete'),
+    ]
+
+
+def test_changes_are_logged_last_under_the_change_lock(db, student_ids):
+    # Between taking the change lock and committing, a transaction only appends log entries, so
+    # change_ids become visible in commit order and no writer waits while holding the lock.
+    statements = []
+    db.conn._raw.set_trace_callback(statements.append)
+    first = db.record_incident(student_ids[0], 'Fight', 'Behavior', 'Pushed a classmate', 6,
+                               'Yard', 'N/A', 'Mr. Lee')
+    db.record_incidents_bulk([incident(student_ids[1], incident_date=date(2024, 5, 1))])
+    db.add_student('R900', 'New Student', 'n@school.com', '9876543210', '9', 'B', 'Parent', '555-0199')
+    db.add_action_to_incident(first, 'Detention', 1, 'Days', 'After school', 'Ms. Rao')
+    db.update_incident_status(first, 'Resolved')
+    db.mark_parents_notified([first])
+    db.archive_incidents_before(date(2025, 1, 1))
+    db.delete_student(student_ids[0])
+    db.conn._raw.set_trace_callback(None)
+
+    locked = False
+    logged = 0
+    for sql in statements:
+        if sql == StudentConductDB.CHANGE_LOCK_SQL:
+            locked = True
+        elif sql.startswith('COMMIT'):
+            locked = False
+        elif sql.startswith('INSERT INTO conduct_changes'):
+            assert locked
+            logged += 1
+        elif sql != 'SELECT last_insert_rowid()':
+            assert not locked, sql
+    assert logged >= 8
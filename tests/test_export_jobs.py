@@ -0,0 +1,104 @@
+import builtins
+import os
+import threading
+from datetime import date
+
+import pytest
+
+from conftest import incident
+from main import ExportJobs, StudentConductDB
+
+
+@pytest.fixture
+def jobs(db, student_ids, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db.record_incidents_bulk([incident(student_ids[i % 5], incident_date=date(2025, 9, i % 28 + 1))
+                              for i in range(30)])
+    jobs = ExportJobs(db, workers=1)
+    yield jobs
+    jobs.shutdown(cancel=True)
+
+
+@pytest.fixture
+def paused(monkeypatch):
+    # Holds every streamed export after its first row until released.
+    started, release = threading.Event(), threading.Event()
+    with_progress = StudentConductDB._with_progress
+
+    def pausing(rows, total, progress, chunk_size):
+        for n, row in enumerate(with_progress(rows, total, progress, chunk_size)):
+            if n == 1:
+                started.set()
+                release.wait(10)
+            yield row
+
+    monkeypatch.setattr(StudentConductDB, '_with_progress', staticmethod(pausing))
+    return started, release
+
+
+def job(jobs, job_id):
+    return next(j for j in jobs.list() if j['job_id'] == job_id)
+
+
+def test_jobs_report_through_their_status_only(jobs, student_ids, monkeypatch):
+    printed = []
+    print_ = builtins.print
+
+    def recording_print(*args, **kwargs):
+        printed.append(threading.current_thread().name)
+        print_(*args, **kwargs)
+
+    monkeypatch.setattr(builtins, 'print', recording_print)
+    card = jobs.submit("Card", 'export_student_card_csv', student_ids[0])
+    report = jobs.submit("Report", 'export_monthly_report_csv', 9, 2025, stream=True, chunk_size=7)
+    missing = jobs.submit("Missing", 'export_student_card_csv', 9999)
+    jobs.shutdown()
+
+    assert job(jobs, card)['status'] == 'Done'
+    assert os.path.exists(job(jobs, card)['file'])
+    done = job(jobs, report)
+    assert (done['status'], done['done'], done['total'], done['error']) == ('Done', 30, 30, None)
+    assert done['file'] == os.path.join('student_cards', 'monthly_report_09_2025.csv')
+    failed = job(jobs, missing)
+    assert (failed['status'], failed['file'], failed['error']) == ('Failed', None, 'Student ID 9999 not found')
+    assert all(j['finished'] for j in jobs.list())
+    assert jobs.active() == []
+    assert not [name for name in printed if name.startswith('export')]
+
+
+def test_unknown_export_is_rejected(jobs):
+    with pytest.raises(ValueError):
+        jobs.submit("Drop", 'delete_student', 1)
+    assert jobs.list() == []
+
+
+def test_cancel_queued_and_running_jobs(jobs, paused):
+    started, release = paused
+    running = jobs.submit("Students", 'export_all_students_csv', stream=True, chunk_size=1)
+    queued = jobs.submit("Report", 'export_monthly_report_csv', 9, 2025, stream=True)
+    assert started.wait(10)
+    assert jobs.active() == [running, queued]
+
+    assert jobs.cancel(queued)
+    assert job(jobs, queued)['status'] == 'Cancelled'
+    assert jobs.cancel(running)
+    assert job(jobs, running)['status'] == 'Running'
+    release.set()
+    jobs.shutdown()
+
+    assert [j['status'] for j in jobs.list()] == ['Cancelled', 'Cancelled']
+    assert [j['file'] for j in jobs.list()] == [None, None]
+    assert os.listdir('student_cards') == []
+    assert not jobs.cancel(running)
+
+
+def test_shutdown_with_cancel_stops_unfinished_jobs(jobs, paused):
+    started, release = paused
+    first = jobs.submit("Students", 'export_all_students_csv', stream=True, chunk_size=1)
+    second = jobs.submit("Students again", 'export_all_students_csv', stream=True, chunk_size=1)
+    assert started.wait(10)
+    # The cancel requests are made before shutdown starts waiting for the paused job.
+    threading.Timer(0.2, release.set).start()
+    jobs.shutdown(cancel=True)
+    assert [job(jobs, first)['status'], job(jobs, second)['status']] == ['Cancelled', 'Cancelled']
+    assert jobs.active() == []
@@ -0,0 +1,69 @@
+import gzip
+import os
+from datetime import date
+
+import pytest
+
+from backends import SQLiteCursor
+from conftest import incident
+from main import ExportCancelled
+
+
+@pytest.fixture
+def school(db, student_ids, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db.record_incidents_bulk([incident(student_ids[i % 9], severity_score=i % 10 + 1,
+                                       incident_date=date(2025, 9, i % 28 + 1))
+                              for i in range(45)])
+    return db
+
+
+def read(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', newline='', encoding='utf-8') as f:
+        # The export timestamp is the only line that differs between two runs.
+        return [line for line in f.read().splitlines() if not line.startswith('Export Date')]
+
+
+@pytest.mark.parametrize('export, args', [('export_all_students_csv', ()),
+                                          ('export_monthly_report_csv', (9, 2025))])
+def test_streamed_and_gzipped_exports_match_the_buffered_one(school, export, args):
+    buffered = read(getattr(school, export)(*args))
+    streamed = getattr(school, export)(*args, stream=True, chunk_size=4)
+    assert read(streamed) == buffered
+    gzipped = getattr(school, export)(*args, stream=True, compress=True, chunk_size=4)
+    assert gzipped.endswith('.csv.gz')
+    assert read(gzipped) == buffered
+    assert len(buffered) > 20
+
+
+def test_streaming_never_buffers_the_result(school, monkeypatch):
+    def fetchall(self):
+        raise AssertionError("streamed export fetched the whole result")
+
+    monkeypatch.setattr(SQLiteCursor, 'fetchall', fetchall)
+    assert school.export_all_students_csv(stream=True, chunk_size=3)
+    assert school.export_monthly_report_csv(9, 2025, stream=True, chunk_size=3)
+
+
+def test_streaming_reports_progress_per_chunk(school):
+    calls = []
+    school.export_all_students_csv(stream=True, chunk_size=8, progress=lambda done, total: calls.append((done, total)))
+    assert calls == [(0, 20), (8, 20), (16, 20), (20, 20)]
+    calls = []
+    school.export_monthly_report_csv(9, 2025, stream=True, chunk_size=20,
+                                     progress=lambda done, total: calls.append((done, total)))
+    assert calls == [(0, 45), (20, 45), (40, 45), (45, 45)]
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_cancelled_stream_leaves_no_partial_file(school, compress):
+    def progress(done, total):
+        if done >= 10:
+            raise ExportCancelled()
+
+    assert school.export_monthly_report_csv(9, 2025, stream=True, compress=compress, chunk_size=5,
+                                            progress=progress) is False
+    assert os.listdir('student_cards') == []
+    # The shared connection is usable again afterwards.
+    assert school.export_monthly_report_csv(9, 2025, stream=True, compress=compress)
@@ -0,0 +1,24 @@
+from datetime import date
+
+from backends import SQLiteBackend
+from conftest import incident
+from main import QueryInstrumentation, StudentConductDB
+
+
+def test_events_are_labelled_with_the_public_method(tmp_path):
+    metrics = QueryInstrumentation()
+    db = StudentConductDB(backend=SQLiteBackend(tmp_path / 'db.sqlite'), instrumentation=metrics)
+    try:
+        db.migrate()
+        db.bulk_add_students([("R001", "Student 1", "s1@school.com", "9876543210", "9", "A", "Parent 1",
+                               "555-0101")])
+        db.record_incidents_bulk([incident(1, incident_date=date(2025, 9, 1))])
+        db.get_monthly_report(9, 2025, shape='record')
+        db.get_student_dossier(1)
+        methods = {row['method'] for row in metrics.stats()}
+    finally:
+        db.close()
+    assert {'migrate', 'bulk_add_students', 'record_incidents_bulk', 'get_monthly_report',
+            'get_student_dossier'} <= methods
+    assert not methods - {'migrate', 'schema_version', 'bulk_add_students', 'record_incidents_bulk',
+                          'get_monthly_report', 'get_student_dossier'}
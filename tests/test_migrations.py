@@ -0,0 +1,147 @@
+import threading
+
+from backends import SQLiteBackend, errors
+from main import StudentConductDB
+
+
+def applied(db):
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT version FROM schema_migrations ORDER BY version")
+        return [row['version'] for row in cursor.fetchall()]
+
+
+def open_db(path, cls=StudentConductDB, backend_cls=SQLiteBackend):
+    return cls(backend=backend_cls(path))
+
+
+class CountingDB(StudentConductDB):
+    # Appends migrations after the real ones and counts how often each runs.
+    MIGRATIONS = StudentConductDB.MIGRATIONS + (
+        (8, 'Add students.nickname', '_migrate_nickname'),
+        (9, 'Index students.nickname', '_migrate_nickname_index'),
+    )
+    SCHEMA_VERSION = 9
+    runs = []
+
+    def _migrate_nickname(self, cursor):
+        self.runs.append(8)
+        cursor.execute("SELECT COUNT(*) as found FROM pragma_table_info('students') WHERE name = 'nickname'")
+        if not cursor.fetchone()['found']:
+            cursor.execute("ALTER TABLE students ADD COLUMN nickname TEXT")
+
+    def _migrate_nickname_index(self, cursor):
+        self.runs.append(9)
+        self._ensure_index(cursor, 'students', 'idx_nickname', 'nickname')
+
+
+def test_fresh_database_gets_every_migration_in_order(tmp_path):
+    db = open_db(tmp_path / 'db.sqlite')
+    assert db.schema_version() == 0
+    assert db.migrate()
+    assert applied(db) == [version for version, _, _ in StudentConductDB.MIGRATIONS]
+    assert db.schema_version() == StudentConductDB.SCHEMA_VERSION
+    with db._session() as (conn, cursor):
+        for index_name in ('idx_incident_date', 'idx_category_date', 'idx_status_severity_date',
+                           'idx_parent_notified'):
+            assert db.backend.has_index(cursor, 'conduct_incidents', index_name)
+    db.close()
+
+
+def test_migrate_is_idempotent_and_keeps_data(tmp_path):
+    db = open_db(tmp_path / 'db.sqlite')
+    db.migrate()
+    student_id = db.add_student('R001', 'Asha Rao', None, None, '9', 'A', None, None)
+    statements = []
+    db.conn._raw.set_trace_callback(statements.append)
+    assert db.migrate()
+    db.conn._raw.set_trace_callback(None)
+    # Up to date: one version lookup and no DDL.
+    assert len(statements) == 1 and statements[0].startswith('SELECT MAX(version)')
+    assert db.get_student_record(student_id)['student']['name'] == 'Asha Rao'
+
+    # A step interrupted before its version was recorded is simply run again.
+    with db._session() as (conn, cursor):
+        cursor.execute("DELETE FROM schema_migrations WHERE version >= 4")
+        conn.commit()
+    assert db.migrate()
+    assert applied(db) == [version for version, _, _ in StudentConductDB.MIGRATIONS]
+    assert db.get_student_record(student_id)['student']['name'] == 'Asha Rao'
+    db.close()
+
+
+def test_only_newer_migrations_run_on_an_existing_database(tmp_path):
+    open_db(tmp_path / 'db.sqlite').migrate()
+    CountingDB.runs = []
+    db = open_db(tmp_path / 'db.sqlite', CountingDB)
+    assert db.migrate()
+    assert CountingDB.runs == [8, 9]
+    assert applied(db)[-2:] == [8, 9]
+    assert db.migrate()
+    assert CountingDB.runs == [8, 9]
+    db.close()
+
+
+def test_failed_step_stops_migrating_and_keeps_earlier_steps(tmp_path, monkeypatch):
+    db = open_db(tmp_path / 'db.sqlite', CountingDB)
+    CountingDB.runs = []
+
+    def broken(self, cursor):
+        raise errors.ProgrammingError(msg="simulated failure")
+
+    monkeypatch.setattr(CountingDB, '_migrate_nickname_index', broken)
+    assert not db.migrate()
+    assert applied(db)[-1] == 8
+    monkeypatch.undo()
+    assert db.migrate()
+    assert CountingDB.runs == [8, 9]
+    db.close()
+
+
+class LockingBackend(SQLiteBackend):
+    # Stands in for MySQL's GET_LOCK: one migrating process at a time, with a timeout.
+    lock = threading.Lock()
+    timeout_seconds = 10
+    events = []
+
+    def acquire_migration_lock(self, cursor):
+        locked = self.lock.acquire(timeout=self.timeout_seconds)
+        self.events.append('acquire' if locked else 'timeout')
+        return locked
+
+    def release_migration_lock(self, cursor):
+        self.events.append('release')
+        self.lock.release()
+
+
+def test_concurrent_startups_run_each_step_once(tmp_path):
+    CountingDB.runs = []
+    LockingBackend.events = []
+    results = []
+
+    def start_up():
+        db = open_db(tmp_path / 'db.sqlite', CountingDB, LockingBackend)
+        results.append(db.migrate())
+        db.close()
+
+    threads = [threading.Thread(target=start_up) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [True] * 4
+    assert CountingDB.runs == [8, 9]
+    assert LockingBackend.events.count('acquire') == LockingBackend.events.count('release')
+
+
+def test_lock_timeout_applies_nothing(tmp_path):
+    db = open_db(tmp_path / 'db.sqlite', backend_cls=LockingBackend)
+    LockingBackend.lock.acquire()
+    LockingBackend.timeout_seconds = 0.1
+    try:
+        assert not db.migrate()
+    finally:
+        LockingBackend.timeout_seconds = 10
+        LockingBackend.lock.release()
+    assert db.schema_version() == 0
+    assert db.migrate()
+    db.close()
@@ -0,0 +1,102 @@
+import json
+
+import notifications
+from conftest import incident
+from main import QueryInstrumentation
+from notifications import DeliveryError, NotificationDispatcher, OutboxTransport
+
+
+def notified_updates(db, since):
+    changes = db.get_changes(since, tables=['conduct_incidents'], with_rows=False)['changes']
+    return [change['row_id'] for change in changes if change['operation'] == 'update']
+
+
+def test_mark_parents_notified_logs_only_rows_it_changed(db, student_ids):
+    ids = db.record_incidents_bulk([incident(student_ids[i]) for i in range(3)])['incident_ids']
+    assert db.mark_parents_notified(ids[:2]) == 2
+    since = db.get_changes(0, limit=10000, with_rows=False)['cursor']
+
+    assert db.mark_parents_notified(ids) == 1
+    assert notified_updates(db, since) == [ids[2]]
+    assert db.mark_parents_notified(ids) == 0
+    assert notified_updates(db, since) == [ids[2]]
+
+
+class FlakyTransport:
+    # Fails the first `failures[incident_id]` sends of an incident, then accepts it.
+    def __init__(self, failures=None):
+        self.failures = dict(failures or {})
+        self.attempts = []
+        self.sent = []
+
+    def send(self, message):
+        self.attempts.append(message['incident_id'])
+        if self.failures.get(message['incident_id'], 0):
+            self.failures[message['incident_id']] -= 1
+            raise DeliveryError('gateway busy')
+        self.sent.append(message)
+
+
+def pending_ids(db):
+    with db._session() as (conn, cursor):
+        cursor.execute("SELECT incident_id FROM conduct_incidents WHERE parent_notified = FALSE ORDER BY incident_id")
+        return [row['incident_id'] for row in cursor.fetchall()]
+
+
+def test_dispatcher_marks_each_batch_with_one_update(db, student_ids, tmp_path):
+    ids = db.record_incidents_bulk([incident(student_ids[i % 5]) for i in range(7)])['incident_ids']
+    db.instrumentation = QueryInstrumentation()
+    outbox = tmp_path / 'outbox.jsonl'
+    dispatcher = NotificationDispatcher(db, OutboxTransport(outbox), workers=2, rate=None, batch_size=3)
+
+    result = dispatcher.run()
+
+    assert result == {'sent': 7, 'failed': [], 'skipped': []}
+    messages = [json.loads(line) for line in outbox.read_text(encoding='utf-8').splitlines()]
+    assert sorted(m['incident_id'] for m in messages) == ids
+    assert messages[0]['to'].startswith('555-01')
+    updates = [row for row in db.instrumentation.stats()
+               if row['method'] == 'mark_parents_notified' and row['fingerprint'].startswith('UPDATE conduct_incidents')]
+    assert sum(row['calls'] for row in updates) == 3
+    assert pending_ids(db) == []
+
+
+def test_dispatcher_retries_with_exponential_backoff(db, student_ids, monkeypatch):
+    ids = db.record_incidents_bulk([incident(student_ids[0]), incident(student_ids[1])])['incident_ids']
+    sleeps = []
+    monkeypatch.setattr(notifications.time, 'sleep', sleeps.append)
+    transport = FlakyTransport({ids[0]: 2, ids[1]: 5})
+    dispatcher = NotificationDispatcher(db, transport, workers=1, rate=None, retries=3, backoff=0.1)
+
+    result = dispatcher.run()
+
+    assert result['sent'] == 1
+    assert result['failed'] == [(ids[1], 'gateway busy')]
+    assert transport.attempts == [ids[0]] * 3 + [ids[1]] * 4
+    assert sleeps == [0.1, 0.2] + [0.1, 0.2, 0.4]
+    assert pending_ids(db) == [ids[1]]
+
+
+def test_dispatcher_skips_students_without_parent_phone(db, student_ids):
+    ids = db.record_incidents_bulk([incident(student_ids[0]), incident(student_ids[1])])['incident_ids']
+    with db._session() as (conn, cursor):
+        cursor.execute("UPDATE students SET parent_phone = NULL WHERE student_id = %s", (student_ids[1],))
+        conn.commit()
+    transport = FlakyTransport()
+
+    result = NotificationDispatcher(db, transport, rate=None).run()
+
+    assert result == {'sent': 1, 'failed': [], 'skipped': [ids[1]]}
+    assert [m['incident_id'] for m in transport.sent] == [ids[0]]
+    assert pending_ids(db) == [ids[1]]
+
+
+def test_dispatcher_stops_at_limit(db, student_ids):
+    ids = db.record_incidents_bulk([incident(student_ids[i]) for i in range(7)])['incident_ids']
+    transport = FlakyTransport()
+
+    result = NotificationDispatcher(db, transport, workers=1, rate=None, batch_size=2).run(limit=5)
+
+    assert result['sent'] == 5
+    assert [m['incident_id'] for m in transport.sent] == ids[:5]
+    assert pending_ids(db) == ids[5:]
@@ -0,0 +1,35 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+import records
+from conftest import incident
+
+
+def test_compact_shapes_match_dict_rows(db, student_ids):
+    db.record_incidents_bulk([incident(student_id, severity_score=1 + i % 10, incident_date=date(2026, 3, 1 + i % 28))
+                              for i, student_id in enumerate(student_ids * 5)])
+    for report in (lambda shape: db.list_all_students(shape=shape),
+                   lambda shape: db.get_high_risk_students(3, shape=shape),
+                   lambda shape: db.get_pending_incidents(limit=30, shape=shape),
+                   lambda shape: db.get_incidents_between('2026-03-01', '2026-04-01', shape=shape)):
+        rows = report('dict')
+        assert rows
+        assert [row._asdict() for row in report('record')] == rows
+        columns = report('columns')
+        assert [dict(zip(columns, values)) for values in zip(*columns.values())] == rows
+
+
+def test_unknown_shape_is_rejected_before_querying(db):
+    for call in (lambda: db.list_all_students(shape='rows'),
+                 lambda: db.get_monthly_report(3, 2026, shape='rows')):
+        with pytest.raises(ValueError, match="Unknown row shape 'rows'"):
+            call()
+
+
+def test_values_are_not_shared_once_a_column_turns_out_to_be_decimal():
+    chunks = [[(None,)] * 3, [(Decimal('7.5'),), (Decimal('7.50'),)]]
+    rows = records._build(['avg_score'], chunks, 'record')
+    assert [str(row.avg_score) for row in rows] == ['None', 'None', 'None', '7.5', '7.50']
+
@@ -0,0 +1,57 @@
+from datetime import date, timedelta
+
+from conftest import incident
+
+
+def test_monthly_report_uses_incident_date_index(db, student_ids):
+    first_day = date(2024, 1, 1)
+    db.record_incidents_bulk([incident(student_ids[i % len(student_ids)],
+                                       incident_date=first_day + timedelta(days=i % 700))
+                              for i in range(2000)])
+    start, end = db._month_range(9, 2025)
+    with db._session() as (conn, cursor):
+        cursor.execute(db.backend.ANALYZE_SQL)
+        sql, params = db._range_query(cursor, db.MONTHLY_REPORT_COLUMNS, start, end)
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        plan = [row['detail'] for row in cursor.fetchall()]
+
+    incidents = [step for step in plan if step.split()[1] == 'c']
+    assert any('idx_incident_date' in step for step in incidents), plan
+    assert not any(step.startswith('SCAN') for step in incidents), plan
+
+
+def test_monthly_report_rows(db, student_ids):
+    db.record_incidents_bulk([incident(student_ids[0], incident_date=date(2025, 9, 30)),
+                              incident(student_ids[1], incident_date=date(2025, 9, 1)),
+                              incident(student_ids[2], incident_date=date(2025, 10, 1))])
+    report = db.get_monthly_report(9, 2025)
+    assert [row['incident_date'] for row in report] == [date(2025, 9, 30), date(2025, 9, 1)]
+
+
+def test_pending_incidents_are_read_in_index_order(db, student_ids):
+    db.record_incidents_bulk([incident(student_ids[i % len(student_ids)], severity_score=i % 10 + 1,
+                                       incident_date=date(2025, 1, 1) + timedelta(days=i % 50))
+                              for i in range(600)])
+    with db._session() as (conn, cursor):
+        cursor.execute("UPDATE conduct_incidents SET status = 'Resolved' WHERE incident_id % 3 = 0")
+        cursor.execute("UPDATE conduct_incidents SET status = 'Escalated' WHERE incident_id % 3 = 1")
+        conn.commit()
+        cursor.execute(db.backend.ANALYZE_SQL)
+        for after in (None, (5, date(2025, 1, 20), 100)):
+            sql, params = db._pending_query(after, 20, db.backend.UNION_ARM_LIMITS)
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            plan = [row['detail'] for row in cursor.fetchall()]
+            assert not any('TEMP B-TREE' in step for step in plan), plan
+            assert sum('idx_status_severity_date' in step for step in plan) == 2, plan
+
+    everything = db.get_pending_incidents(shape='record')
+    assert everything == sorted(everything, key=lambda r: (-r.severity_score, r.incident_date, r.incident_id))
+    pages, after = [], None
+    while True:
+        page = db.get_pending_incidents(after=after, limit=7, shape='record')
+        if not page:
+            break
+        pages.extend(page)
+        after = (page[-1].severity_score, page[-1].incident_date, page[-1].incident_id)
+    assert pages == everything
+    assert len(everything) == 400
@@ -0,0 +1,82 @@
+import pytest
+
+from search import tokenize
+
+
+@pytest.fixture
+def names(db, student_ids):
+    added = {}
+    for roll_number, name, parent in [('R100', 'John Smith', 'Mary Smith'),
+                                      ('R101', 'Johanna Smythe', 'Paul Smythe'),
+                                      ('R102', 'José Núñez', "Ana O'Brien")]:
+        added[name] = db.add_student(roll_number, name, None, None, '9', 'A', parent, None)
+    return added
+
+
+def found(db, query, limit=10):
+    return [row['student_id'] for row in db.search_students(query, limit)]
+
+
+def insert_raw(db, student_id, roll_number, name):
+    # Another process's insert, invisible to this one's change tracking.
+    with db._session() as (conn, cursor):
+        cursor.execute("INSERT INTO students (student_id, roll_number, name) VALUES (%s, %s, %s)",
+                       (student_id, roll_number, name))
+        conn.commit()
+
+
+def test_tokenize_folds_case_and_accents():
+    assert tokenize("José O'Brien") == ['jose', 'o', 'brien']
+
+
+def test_search_matches_exact_prefix_typo_and_accents(db, names):
+    assert found(db, 'john smith') == [names['John Smith']]
+    assert found(db, 'joh') == [names['John Smith'], names['Johanna Smythe']]
+    assert found(db, 'jonh sm') == [names['John Smith']]
+    # Prefix of "smythe" ranks above one typo away from "smith".
+    assert found(db, 'smyth') == [names['Johanna Smythe'], names['John Smith']]
+    assert found(db, 'JOSE NUNEZ') == found(db, 'josé núñez') == [names['José Núñez']]
+    assert found(db, 'obrien') == [names['José Núñez']]
+    assert found(db, "o'brien") == [names['José Núñez']]
+    assert found(db, 'mary') == [names['John Smith']]
+    assert found(db, 'nobody') == []
+
+
+def test_exact_matches_rank_above_typos(db, names):
+    # "john" is exact for John Smith and one letter away from Jon Smith.
+    johns = db.add_student('R103', 'Jon Smith', None, None, '9', 'A', None, None)
+    assert found(db, 'john smith') == [names['John Smith'], johns]
+
+
+def test_search_by_roll_number(db, student_ids, names):
+    assert found(db, 'R007') == [student_ids[7]]
+    assert found(db, 'r10') == [names['John Smith'], names['Johanna Smythe'], names['José Núñez']]
+    assert found(db, 'R1O0') == []
+
+
+def test_refresh_after_insert_update_and_delete(db, student_ids, names):
+    assert found(db, 'priya') == []
+    priya = db.add_student('R200', 'Priya Raman', None, None, '9', 'A', None, None)
+    assert found(db, 'priya') == [priya]
+
+    db.update_student_status(priya, 'Suspended')
+    assert [row['status'] for row in db.search_students('priya')] == ['Suspended']
+
+    db.delete_student(names['John Smith'])
+    assert found(db, 'smith') == []
+    assert len(db.search_index) == 23
+
+
+def test_refresh_picks_up_late_commits_and_foreign_deletes(db, student_ids):
+    found(db, 'student')
+    insert_raw(db, 50, 'R050', 'Late Comer')
+    assert found(db, 'late') == [50]
+    # An id below the index's watermark becomes visible after it was passed.
+    insert_raw(db, 40, 'R040', 'Latecomer Earlier')
+    assert found(db, 'latecomer') == [40]
+
+    with db._session() as (conn, cursor):
+        cursor.execute("DELETE FROM students WHERE student_id = %s", (student_ids[0],))
+        conn.commit()
+    assert student_ids[0] not in found(db, 'student', limit=30)
+    assert len(db.search_index) == 21
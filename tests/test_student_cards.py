@@ -0,0 +1,70 @@
+import os
+import zipfile
+from datetime import date
+
+import pytest
+
+from conftest import incident
+from main import ConductManagementSystem
+
+
+@pytest.fixture
+def school(db, student_ids, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ids = db.record_incidents_bulk([incident(student_ids[i % 13], severity_score=i % 10 + 1,
+                                             incident_date=date(2025, 9, i % 28 + 1))
+                                    for i in range(40)])['incident_ids']
+    for incident_id in ids[:5]:
+        db.add_action_to_incident(incident_id, 'Detention', 1, 'Days', 'After school', 'Ms. Rao')
+        db.add_action_to_incident(incident_id, 'Parent meeting', None, None, None, 'Mr. Lee')
+    return db
+
+
+def lines(content):
+    return [line for line in content.splitlines() if not line.startswith('Export Date')]
+
+
+def single_cards(db, student_ids):
+    # What export_student_card_csv writes for each student, keyed by file name.
+    cards = {}
+    for student_id in student_ids:
+        path = db.export_student_card_csv(student_id)
+        with open(path, encoding='utf-8', newline='') as f:
+            cards[os.path.basename(path)] = lines(f.read())
+    return cards
+
+
+def test_batch_export_writes_the_same_cards_as_single_exports(school, student_ids):
+    expected = single_cards(school, student_ids)
+    assert school.export_all_student_cards('batch', workers=3, chunk_size=6) == 20
+    assert sorted(os.listdir('batch')) == sorted(expected)
+    for name, content in expected.items():
+        with open(os.path.join('batch', name), encoding='utf-8', newline='') as f:
+            assert lines(f.read()) == content, name
+    assert 'ACTIONS TAKEN' in '\n'.join(expected[f"{student_ids[0]}_R000.csv"])
+
+
+def test_batch_export_to_zip(school, student_ids):
+    expected = single_cards(school, student_ids)
+    assert school.export_all_student_cards('cards', workers=2, as_zip=True, chunk_size=7) == 20
+    assert not os.path.exists('cards')
+    with zipfile.ZipFile('cards.zip') as archive:
+        assert sorted(archive.namelist()) == sorted(expected)
+        for name, content in expected.items():
+            assert lines(archive.read(name).decode('utf-8')) == content, name
+
+
+def test_batch_export_of_an_empty_school(db, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert db.export_all_student_cards('empty') == 0
+    assert os.listdir('empty') == []
+
+
+def test_actions_without_a_type_still_display_and_export(school, student_ids, monkeypatch, capsys):
+    incident_id = school.record_incidents_bulk([incident(student_ids[19])])['incident_ids'][0]
+    school.add_action_to_incident(incident_id, None, None, None, None, None)
+    school.add_action_to_incident(incident_id, 'Detention', 1, 'Days', None, 'Ms. Rao')
+    monkeypatch.setattr('builtins.input', lambda prompt='': str(student_ids[19]))
+    ConductManagementSystem(school).view_student_record()
+    assert ', Detention' in capsys.readouterr().out
+    assert school.export_student_card_csv(student_ids[19])
@@ -0,0 +1,38 @@
+from conftest import incident
+
+
+def table_counts(db):
+    with db._session() as (conn, cursor):
+        counts = {}
+        for table in ('conduct_incidents', 'student_conduct_summary'):
+            cursor.execute(f"SELECT COUNT(*) as n FROM {table}")
+            counts[table] = cursor.fetchone()['n']
+        cursor.execute("SELECT COUNT(*) as n FROM conduct_changes WHERE table_name = 'conduct_incidents'")
+        counts['changes'] = cursor.fetchone()['n']
+        return counts
+
+
+BROKEN_UPSERT = "INSERT INTO no_such_table VALUES (%s, %s, %s, %s, %s, %s)"
+
+
+def test_failed_incident_write_leaves_nothing_behind(db, student_ids, monkeypatch):
+    # The INSERT succeeds, the summary upsert fails: the method must not leave the incident
+    # on the connection for the next write to commit.
+    monkeypatch.setattr(db.backend, 'SUMMARY_UPSERT', BROKEN_UPSERT, raising=False)
+    assert db.record_incident(student_ids[0], 'Late arrival', 'Attendance', 'Late', 3, 'Gate',
+                              'N/A', 'Ms. Rao') is False
+    monkeypatch.undo()
+
+    assert db.update_student_status(student_ids[2], 'Suspended')
+    assert table_counts(db) == {'conduct_incidents': 0, 'student_conduct_summary': 0, 'changes': 0}
+    assert db.get_student_stats(student_ids[0])['total_incidents'] == 0
+    assert db.get_student_record(student_ids[0])['incidents'] == []
+
+
+def test_failed_bulk_incident_write_leaves_nothing_behind(db, student_ids, monkeypatch):
+    monkeypatch.setattr(db.backend, 'SUMMARY_UPSERT', BROKEN_UPSERT, raising=False)
+    db.record_incidents_bulk([incident(student_ids[0]), incident(student_ids[1])])
+    monkeypatch.undo()
+
+    assert db.update_student_status(student_ids[2], 'Suspended')
+    assert table_counts(db) == {'conduct_incidents': 0, 'student_conduct_summary': 0, 'changes': 0}